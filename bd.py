@@ -0,0 +1,48 @@
+import importlib
+import sys
+
+# Command name -> (module with a main(argv, prog) function, help text). Modules
+# are imported only when their command runs, so every command starts quickly.
+COMMANDS = {
+    "fetch": ("people_fetch", "Fetch contacts with birthdays from the People API"),
+    "filter": ("filter_contacts", "Remove contacts without birthdays from the export"),
+    "store": ("contact_store", "Import the export into a SQLite contact store"),
+    "index": ("row_index", "Build or use the byte-offset row index of the export"),
+    "diff": ("export_diff", "Show the birthdays that changed between two exports"),
+    "calendar": ("create_birthday_calendar", "Create the birthday calendar"),
+    "json": ("json_export", "Write the birthday data as NDJSON or jCal"),
+    "stats": ("contact_stats", "Show statistics about contacts and birthdays"),
+    "serve": ("reminder_daemon", "Run the local reminder daemon"),
+    "remind": ("smtp_delivery", "Email today's birthday reminders"),
+    "sync": ("caldav_sync", "Push the calendar to a CalDAV server"),
+}
+
+
+def usage():
+    """Return the top-level help text."""
+    lines = ["usage: bd <command> [options]", "", "commands:"]
+    for name, (_, help_text) in COMMANDS.items():
+        lines.append(f"  {name:<10}{help_text}")
+    lines += ["", "Run 'bd <command> --help' for the options of a command."]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """Dispatch to a command and return the process exit status."""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0 if argv else 2
+
+    name, *rest = argv
+    if name not in COMMANDS:
+        print(f"bd: unknown command '{name}'\n\n{usage()}", file=sys.stderr)
+        return 2
+
+    module = importlib.import_module(COMMANDS[name][0])
+    module.main(rest, prog=f"bd {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
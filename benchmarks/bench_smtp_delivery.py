@@ -0,0 +1,51 @@
+"""Compare pooled SMTP delivery with one connection per message.
+
+Run with: uv run python benchmarks/bench_smtp_delivery.py [messages]
+"""
+
+import asyncio
+import os
+import smtplib
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smtp_delivery import deliver_messages  # noqa: E402
+from tests.standins import SMTPStandIn  # noqa: E402
+from tests.test_smtp_delivery import make_messages  # noqa: E402
+
+
+def start_standin():
+    """Run an SMTP stand-in on a background event loop."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(SMTPStandIn().start(), loop).result()
+
+
+def one_connection_per_message(messages, port):
+    """Baseline: open a fresh smtplib connection for every message."""
+    for message in messages:
+        with smtplib.SMTP("127.0.0.1", port) as server:
+            server.send_message(message)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    messages = make_messages(count)
+    server = start_standin()
+
+    start = time.perf_counter()
+    one_connection_per_message(messages, server.port)
+    baseline = time.perf_counter() - start
+    print(f"one connection per message: {count / baseline:8.0f} msg/s")
+
+    for pool_size in (1, 4, 8):
+        start = time.perf_counter()
+        sent, failed = asyncio.run(
+            deliver_messages(messages, "127.0.0.1", server.port, pool_size=pool_size)
+        )
+        elapsed = time.perf_counter() - start
+        assert sent == count and not failed
+        print(f"pooled, {pool_size} connection(s):   {count / elapsed:8.0f} msg/s")
@@ -0,0 +1,60 @@
+"""Measure the cold start time of the bd commands against a budget.
+
+Each command is started with --help in a fresh interpreter, which costs its
+imports but no work. Times are the best of several runs minus a bare
+interpreter start; any command over budget makes the script exit with 1.
+
+Run with: uv run python benchmarks/bench_startup.py [runs]
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Milliseconds allowed on top of a bare interpreter start
+BUDGETS_MS = {
+    "--help": 10,
+    "fetch": 150,
+    "filter": 60,
+    "store": 100,
+    "index": 100,
+    "diff": 100,
+    "calendar": 100,
+    "json": 100,
+    "stats": 60,
+    "serve": 100,
+    "remind": 200,
+    "sync": 150,
+}
+
+
+def best_start_time(args, runs):
+    """Return the fastest of several cold starts of python with args, in ms."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *args], cwd=ROOT, check=True, capture_output=True
+        )
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    baseline = best_start_time(["-c", "pass"], runs)
+    print(f"bare interpreter: {baseline:6.1f} ms")
+
+    over_budget = []
+    for command, budget in BUDGETS_MS.items():
+        args = ["bd.py", "--help"] if command == "--help" else ["bd.py", command, "-h"]
+        overhead = best_start_time(args, runs) - baseline
+        status = "ok" if overhead <= budget else "OVER BUDGET"
+        print(f"bd {command:<10} +{overhead:6.1f} ms (budget {budget} ms) {status}")
+        if overhead > budget:
+            over_budget.append(command)
+
+    sys.exit(1 if over_budget else 0)
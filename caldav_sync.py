@@ -0,0 +1,283 @@
+import argparse
+import base64
+import hashlib
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import quote
+
+from create_birthday_calendar import (
+    DEFAULT_TEMPLATES,
+    ICS_HEADER,
+    iter_birthday_events,
+    render_event,
+)
+from event_templates import LOCALES, load_templates
+from keep_alive import CONNECTION_ERRORS, KeepAliveClient
+
+DEFAULT_STATE_FILE = ".caldav-sync.json"
+
+
+class CalDAVClient(KeepAliveClient):
+    """Gets, puts and deletes resources of one CalDAV collection.
+
+    Requests share a keep-alive connection per thread (see KeepAliveClient).
+    """
+
+    def __init__(self, url, username=None, password=None, timeout=30):
+        super().__init__(url, timeout)
+        if not self.path.endswith("/"):
+            self.path += "/"
+        if username is not None:
+            credentials = f"{username}:{password or ''}".encode("utf-8")
+            self.headers["Authorization"] = (
+                f"Basic {base64.b64encode(credentials).decode('ascii')}"
+            )
+
+    def request(self, method, name, body=None, headers=()):
+        """Send one request for a resource and return (status, etag, body)."""
+        response, content = self.send(method, self.path + quote(name), body, headers)
+        return response.status, response.getheader("ETag"), content
+
+    def get(self, name):
+        """Fetch a resource, returning (status, etag, body)."""
+        return self.request("GET", name)
+
+    def put(self, name, body, etag=None, create=False):
+        """Replace a resource if it still has the given ETag, or create it.
+
+        With create, the resource must not exist yet. Without either, it is
+        written unconditionally.
+        """
+        headers = {"Content-Type": "text/calendar; charset=utf-8"}
+        if etag:
+            headers["If-Match"] = etag
+        elif create:
+            headers["If-None-Match"] = "*"
+        return self.request("PUT", name, body, headers)
+
+    def delete(self, name, etag=None):
+        """Delete a resource, only if it still has the given ETag if any."""
+        return self.request("DELETE", name, headers={"If-Match": etag} if etag else {})
+
+
+def event_resource(event, templates=DEFAULT_TEMPLATES):
+    """Return (content_hash, body) of the CalDAV resource of one event.
+
+    The hash leaves DTSTAMP out, so it only changes with the event itself.
+    """
+    lines = render_event(event, templates=templates)
+    content = "\n".join(line for line in lines if not line.startswith("DTSTAMP:"))
+    content_hash = hashlib.sha1(content.encode("utf-8")).hexdigest()
+    body = "\r\n".join([*ICS_HEADER, *lines, "END:VCALENDAR", ""])
+    return content_hash, body.encode("utf-8")
+
+
+def same_resource(body, other):
+    """Tell whether two resource bodies only differ in their DTSTAMP."""
+
+    def lines(content):
+        return [
+            line for line in content.splitlines() if not line.startswith(b"DTSTAMP:")
+        ]
+
+    return lines(body) == lines(other)
+
+
+def load_state(state_file, url):
+    """Return {uid: [content_hash, etag]} recorded by the last sync of url."""
+    if not os.path.exists(state_file):
+        return {}
+    with open(state_file, "r", encoding="utf-8") as file:
+        state = json.load(file)
+    if state.get("url") != url:
+        return {}
+    return state["events"]
+
+
+def save_state(state_file, url, events):
+    """Record the synced events, replacing the state file atomically."""
+    temp_file = f"{state_file}.tmp"
+    with open(temp_file, "w", encoding="utf-8") as file:
+        json.dump({"url": url, "events": events}, file)
+    os.replace(temp_file, state_file)
+
+
+def sync_events(
+    client, events, state, concurrency=4, templates=DEFAULT_TEMPLATES, force=False
+):
+    """Push events to a CalDAV collection, sending only what changed.
+
+    state maps the UID of each event synced before to [content_hash, etag].
+    Unchanged events cost no request; changed ones are PUT with If-Match and
+    new ones with If-None-Match, and events no longer present are deleted.
+    Up to concurrency requests run at once. A 412 reply means the server copy
+    was changed by someone else: it is left alone and counted as a conflict.
+    A new event that already exists, e.g. after the state was lost, is
+    fetched instead: it is adopted if it only differs in DTSTAMP, and is a
+    conflict otherwise, recorded with the server's ETag so that later
+    changes are sent with If-Match. With force, conflicting events are
+    replaced with the server's current ETag instead. Returns (counts,
+    new_state).
+    """
+    counts = {"unchanged": 0, "uploaded": 0, "deleted": 0, "conflicts": 0, "failed": 0}
+    new_state = {}
+    pending = set()
+    seen = set()
+
+    def send(method, uid, *args):
+        try:
+            return method(f"{uid}.ics", *args)
+        except CONNECTION_ERRORS:
+            return None, None, None
+
+    def upload(uid, content_hash, body, etag, create):
+        status, etag, _ = send(client.put, uid, body, etag, create)
+        if status == 412 and (create or force):
+            status, etag, current = send(client.get, uid)
+            if status == 200 and same_resource(current, body):
+                # Nothing to send: reported as Not Modified
+                return uid, content_hash, 304, etag
+            if status == 200 and force:
+                status, etag, _ = send(client.put, uid, body, etag)
+            elif status == 200:
+                # Keep the server's copy, and its ETag for the next sync
+                status = 412
+        return uid, content_hash, status, etag
+
+    def remove(uid, etag):
+        status, etag, _ = send(client.delete, uid, etag)
+        return uid, None, status, etag
+
+    def collect(done):
+        for future in done:
+            uid, content_hash, status, etag = future.result()
+            if content_hash is not None and status == 304:
+                # Already on the server as it would be written
+                counts["unchanged"] += 1
+                new_state[uid] = [content_hash, etag]
+            elif content_hash is None and status in (200, 204, 404):
+                counts["deleted"] += 1
+            elif content_hash is not None and status in (200, 201, 204):
+                counts["uploaded"] += 1
+                new_state[uid] = [content_hash, etag]
+            elif status == 412:
+                # Changed on the server since our last sync: leave it alone
+                counts["conflicts"] += 1
+                if content_hash is not None and uid in state:
+                    new_state[uid] = state[uid]
+                elif content_hash is not None and etag:
+                    new_state[uid] = [content_hash, etag]
+            else:
+                # Keep what we knew so the next sync tries again
+                counts["failed"] += 1
+                if uid in state:
+                    new_state[uid] = state[uid]
+
+    def submit(function, *args):
+        nonlocal pending
+        if len(pending) >= concurrency * 4:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+        pending.add(executor.submit(function, *args))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for event in events:
+            seen.add(event.uid)
+            content_hash, body = event_resource(event, templates)
+            known = state.get(event.uid)
+            if known is not None and known[0] == content_hash:
+                counts["unchanged"] += 1
+                new_state[event.uid] = known
+                continue
+            if known is None:
+                submit(upload, event.uid, content_hash, body, None, True)
+            else:
+                submit(upload, event.uid, content_hash, body, known[1], False)
+
+        for uid, (_, etag) in state.items():
+            if uid not in seen:
+                submit(remove, uid, etag)
+
+        collect(wait(pending).done)
+
+    return counts, new_state
+
+
+def sync_birthdays(
+    csv_file,
+    url,
+    state_file=DEFAULT_STATE_FILE,
+    username=None,
+    password=None,
+    concurrency=4,
+    templates=DEFAULT_TEMPLATES,
+    force=False,
+):
+    """Push the birthday events of an export to a CalDAV collection.
+
+    With force, events changed on the server are overwritten rather than
+    left alone as conflicts.
+    """
+    client = CalDAVClient(url, username, password)
+    try:
+        counts, new_state = sync_events(
+            client,
+            iter_birthday_events(csv_file),
+            load_state(state_file, url),
+            concurrency,
+            templates,
+            force,
+        )
+    finally:
+        client.close()
+    save_state(state_file, url, new_state)
+
+    print(
+        f"Synced birthday calendar: {counts['uploaded']} uploaded, "
+        f"{counts['deleted']} deleted, {counts['unchanged']} unchanged, "
+        f"{counts['conflicts']} conflicts, {counts['failed']} failed"
+    )
+    if counts["conflicts"]:
+        print("Conflicting events were changed on the server and left untouched")
+
+    return counts
+
+
+def main(argv=None, prog=None):
+    """Run the command line interface."""
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Push the birthday calendar to a CalDAV server"
+    )
+    parser.add_argument("csv_file", nargs="?", default="export.csv")
+    parser.add_argument("--url", required=True, help="URL of the calendar collection")
+    parser.add_argument("--user", help="User name for basic authentication")
+    parser.add_argument(
+        "--state",
+        default=DEFAULT_STATE_FILE,
+        help="File remembering what was uploaded by the last sync",
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--locale", default="en", choices=sorted(LOCALES))
+    parser.add_argument("--templates", metavar="FILE")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Overwrite events changed on the server instead of leaving them",
+    )
+    args = parser.parse_args(argv)
+
+    sync_birthdays(
+        args.csv_file,
+        args.url,
+        args.state,
+        args.user,
+        os.environ.get("CALDAV_PASSWORD"),
+        args.concurrency,
+        load_templates(args.locale, args.templates),
+        args.force,
+    )
+
+
+if __name__ == "__main__":
+    main()
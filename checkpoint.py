@@ -0,0 +1,152 @@
+import os
+import pickle
+import re
+
+# Input rows read between two checkpoints
+CHECKPOINT_EVERY = 100_000
+
+# Bumped whenever what a checkpoint records changes
+CHECKPOINT_VERSION = 1
+
+# Line ends of text-mode reading, once "\r\n" has been turned into "\n"
+LINE_END = re.compile(r"(?<=\n)")
+
+
+class CheckpointMismatchError(ValueError):
+    """A checkpoint was written for another input, or another version."""
+
+
+def checkpoint_path(output_file):
+    """Return where the checkpoints of a run writing output_file are kept."""
+    return f"{output_file}.checkpoint"
+
+
+def input_identity(input_file):
+    """Return what tells whether an input changed since a checkpoint."""
+    stat = os.stat(input_file)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class OffsetLines:
+    """Iterate over the decoded lines of a binary file, tracking the byte offset.
+
+    Lines come out as text-mode reading would give them ("\\r\\n" and lone
+    "\\r" read as "\\n"), so csv.reader parses them the same. The csv reader
+    asks for lines only until it has a whole record, so after each row,
+    offset is where the next record starts. For streams that cannot seek,
+    such as pipes, offsets count from where reading started.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.offset = file.tell() if file.seekable() else 0
+
+    def __iter__(self):
+        for line in self.file:
+            self.offset += len(line)
+            text = line.decode("utf-8")
+            if "\r" not in text:
+                yield text
+                continue
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+            yield from filter(None, LINE_END.split(text))
+
+
+class Checkpoint:
+    """Records how far a streaming pipeline got, so that it can resume.
+
+    Every `every` input rows, the partial output is flushed to disk and the
+    byte offset of the next input row, the size of the partial output and the
+    state each stage registered with track() are written, atomically, to
+    path. A run created with resume starts from the saved checkpoint, if
+    there is one: the input is read from the saved offset, the partial
+    output is truncated to the saved size and the stages take their state
+    back from restored(). That makes the final output exactly what an
+    uninterrupted run writes.
+    """
+
+    def __init__(self, path, input_file, every=CHECKPOINT_EVERY, resume=False):
+        self.path = path
+        self.input = input_identity(input_file)
+        self.every = every
+        self.due = every
+        self.rows = 0
+        self.trackers = {}
+        self.output = None
+        self.saved = None
+        if resume and os.path.exists(path):
+            with open(path, "rb") as file:
+                saved = pickle.load(file)
+            if saved["version"] != CHECKPOINT_VERSION:
+                raise CheckpointMismatchError(f"{path} was written by another version")
+            if saved["input"] != self.input:
+                raise CheckpointMismatchError(
+                    f"{input_file} changed since {path} was written"
+                )
+            self.saved = saved
+            self.rows = self.due = saved["rows"]
+            self.due += every
+
+    @property
+    def offset(self):
+        """Byte offset of the input to resume from, None when starting over."""
+        return self.saved["offset"] if self.saved is not None else None
+
+    def restored(self, name, default):
+        """Return the state a stage saved under name, or default."""
+        if self.saved is None:
+            return default
+        return self.saved["state"].get(name, default)
+
+    def track(self, name, get):
+        """Save the value returned by get under name with every checkpoint."""
+        self.trackers[name] = get
+
+    def open_output(self, output_file, mode="wb", **options):
+        """Open the partial output, cut back to the saved size when resuming.
+
+        mode and options are passed to open, with "w" turned into "a" when
+        resuming.
+        """
+        if self.saved is not None:
+            if not os.path.exists(output_file):
+                raise CheckpointMismatchError(
+                    f"{output_file} is missing, cannot resume"
+                )
+            with open(output_file, "r+b") as file:
+                file.truncate(self.saved["output_size"])
+            mode = mode.replace("w", "a")
+        self.output = open(output_file, mode, **options)
+        return self.output
+
+    def reached(self, offset, rows=1):
+        """Note that everything before offset has been written, maybe saving.
+
+        rows is the number of input rows read since the last call.
+        """
+        self.rows += rows
+        if self.rows >= self.due:
+            self.save(offset)
+            self.due = self.rows + self.every
+
+    def save(self, offset):
+        """Write a checkpoint for the input read up to offset."""
+        self.output.flush()
+        os.fsync(self.output.fileno())
+        checkpoint = {
+            "version": CHECKPOINT_VERSION,
+            "input": self.input,
+            "offset": offset,
+            "rows": self.rows,
+            "output_size": self.output.tell(),
+            "state": {name: get() for name, get in self.trackers.items()},
+        }
+        temp_file = f"{self.path}.tmp"
+        with open(temp_file, "wb") as file:
+            pickle.dump(checkpoint, file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, self.path)
+
+    def remove(self):
+        """Delete the checkpoint once the output is complete."""
+        if os.path.exists(self.path):
+            os.unlink(self.path)
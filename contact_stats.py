@@ -0,0 +1,67 @@
+import argparse
+import csv
+import os
+from datetime import date
+
+
+def count_contacts(csv_file):
+    """Count the contact records of a CSV export, without its header."""
+    with open(csv_file, "r", encoding="utf-8", newline="") as file:
+        return max(sum(1 for _ in csv.reader(file)) - 1, 0)
+
+
+def count_events(ics_file):
+    """Count the events of an ICS calendar by streaming its lines."""
+    with open(ics_file, "r", encoding="utf-8") as file:
+        return sum(1 for line in file if line.rstrip("\r\n") == "BEGIN:VEVENT")
+
+
+def print_stats(
+    csv_file="export.csv",
+    backup_file="export_backup.csv",
+    ics_file="birthdays.ics",
+    store=None,
+):
+    """Print statistics about contacts and birthdays.
+
+    Given a contact store, contacts are counted from it instead of csv_file,
+    along with the birthdays of the current month.
+    """
+    print("📊 Contact Statistics:")
+    print("=" * 20)
+    if store is not None and os.path.exists(store):
+        from contact_store import birthdays_on, count_stored_contacts
+
+        print(f"📊 Total contacts with birthdays: {count_stored_contacts(store)}")
+        this_month = birthdays_on(store, date.today().month)
+        print(f"📊 Birthdays this month: {len(this_month)}")
+    elif store is not None:
+        print(f"❌ No {store} file found")
+    elif os.path.exists(csv_file):
+        print(f"📊 Total contacts with birthdays: {count_contacts(csv_file)}")
+    else:
+        print(f"❌ No {csv_file} file found")
+    if os.path.exists(backup_file):
+        print(f"📊 Original total contacts: {count_contacts(backup_file)}")
+    if os.path.exists(ics_file):
+        print(f"📅 Calendar events created: {count_events(ics_file)}")
+
+
+def main(argv=None, prog=None):
+    """Run the command line interface."""
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Show statistics about contacts and birthdays"
+    )
+    parser.add_argument("csv_file", nargs="?", default="export.csv")
+    parser.add_argument("ics_file", nargs="?", default="birthdays.ics")
+    parser.add_argument("--backup", default="export_backup.csv")
+    parser.add_argument(
+        "--store", metavar="FILE", help="Count contacts from this contact store"
+    )
+    args = parser.parse_args(argv)
+
+    print_stats(args.csv_file, args.backup, args.ics_file, args.store)
+
+
+if __name__ == "__main__":
+    main()
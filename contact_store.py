@@ -0,0 +1,241 @@
+import argparse
+import os
+import sqlite3
+from datetime import date
+from itertools import islice
+from pathlib import Path
+
+from create_birthday_calendar import (
+    BirthdayEvent,
+    iter_birthday_events,
+    yearless_birthday,
+)
+
+DEFAULT_STORE = "contacts.db"
+
+SCHEMA = """
+PRAGMA journal_mode = WAL;
+PRAGMA synchronous = NORMAL;
+PRAGMA temp_store = MEMORY;
+CREATE TABLE IF NOT EXISTS contacts (
+    uid TEXT PRIMARY KEY,
+    source_hash TEXT NOT NULL,
+    full_name TEXT NOT NULL,
+    birthday TEXT NOT NULL,
+    year_known INTEGER NOT NULL,
+    labels TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    occasion TEXT NOT NULL,
+    month INTEGER NOT NULL,
+    day INTEGER NOT NULL
+);
+"""
+
+# Serves month-day lookups and sorted reads without a sort step
+INDEX = """
+CREATE INDEX IF NOT EXISTS contacts_by_day ON contacts (month, day, full_name, uid)
+"""
+
+# Inserts a contact, or updates it only if something about it changed
+UPSERT = """
+INSERT INTO contacts (
+    uid, source_hash, full_name, birthday, year_known, labels, kind, occasion,
+    month, day
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (uid) DO UPDATE SET
+    source_hash = excluded.source_hash,
+    full_name = excluded.full_name,
+    birthday = excluded.birthday,
+    year_known = excluded.year_known,
+    labels = excluded.labels,
+    kind = excluded.kind,
+    occasion = excluded.occasion,
+    month = excluded.month,
+    day = excluded.day
+WHERE source_hash != excluded.source_hash
+    OR year_known != excluded.year_known
+    OR labels != excluded.labels
+"""
+
+COLUMNS = "uid, source_hash, full_name, birthday, year_known, labels, kind, occasion"
+
+
+def open_store(store_file, create=True):
+    """Open a contact store, creating it, its table and index if needed.
+
+    Without create, the store is opened read-only, and must already exist.
+    """
+    if not create:
+        if not os.path.exists(store_file):
+            raise FileNotFoundError(f"No contact store at {store_file}")
+        uri = Path(os.path.abspath(store_file)).as_uri()
+        return sqlite3.connect(f"{uri}?mode=ro", uri=True)
+    connection = sqlite3.connect(store_file)
+    connection.executescript(SCHEMA)
+    connection.execute(INDEX)
+    return connection
+
+
+def contact_row(event):
+    """Return the store row of a BirthdayEvent."""
+    birthday_date = event.birthday_date
+    return (
+        event.uid,
+        event.source_hash,
+        event.full_name,
+        birthday_date.isoformat(),
+        int(event.year_known),
+        event.labels,
+        event.kind,
+        event.occasion,
+        birthday_date.month,
+        birthday_date.day,
+    )
+
+
+def row_event(row, year=None):
+    """Return the BirthdayEvent of a store row.
+
+    Birthdays without a year are moved to the current year (see
+    yearless_birthday), as parse_birthday does for the export.
+    """
+    uid, source_hash, full_name, birthday, year_known, labels, kind, occasion = row
+    birthday_date = date.fromisoformat(birthday)
+    if not year_known:
+        birthday_date = yearless_birthday(birthday_date, year or date.today().year)
+    return BirthdayEvent(
+        uid,
+        source_hash,
+        full_name,
+        birthday_date,
+        bool(year_known),
+        labels,
+        kind,
+        occasion,
+    )
+
+
+def import_contacts(store_file, csv_file, batch_size=1000):
+    """Upsert the birthdays and other events of an export into a contact store.
+
+    Contacts are keyed by their event UID, so a contact keeps its row across
+    exports. Rows are written in batches of batch_size, one transaction per
+    batch; unchanged contacts are not rewritten, and contacts missing from
+    the export are deleted. Returns the counts of inserted, updated,
+    unchanged and deleted contacts.
+    """
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+    connection = open_store(store_file)
+    try:
+        connection.execute("CREATE TEMP TABLE seen (uid TEXT)")
+        (before,) = connection.execute("SELECT COUNT(*) FROM contacts").fetchone()
+        if not before:
+            # Bulk load: building the index once afterwards is much cheaper
+            connection.execute("DROP INDEX contacts_by_day")
+        received = changed = 0
+        rows = (contact_row(event) for event in iter_birthday_events(csv_file))
+        while batch := list(islice(rows, batch_size)):
+            with connection:
+                changes = connection.total_changes
+                connection.executemany(UPSERT, batch)
+                changed += connection.total_changes - changes
+                connection.executemany(
+                    "INSERT INTO seen VALUES (?)", ((row[0],) for row in batch)
+                )
+            received += len(batch)
+
+        # Only inserts change the row count until stale contacts are deleted
+        (after,) = connection.execute("SELECT COUNT(*) FROM contacts").fetchone()
+        if not before:
+            with connection:
+                connection.execute(INDEX)
+        counts["inserted"] = after - before
+        counts["updated"] = changed - counts["inserted"]
+        counts["unchanged"] = received - changed
+
+        with connection:
+            counts["deleted"] = connection.execute(
+                "DELETE FROM contacts WHERE uid NOT IN (SELECT uid FROM seen)"
+            ).rowcount
+    finally:
+        connection.close()
+
+    print(
+        f"Imported {csv_file} into {store_file}: {counts['inserted']} new, "
+        f"{counts['updated']} updated, {counts['unchanged']} unchanged, "
+        f"{counts['deleted']} deleted"
+    )
+
+    return counts
+
+
+def iter_stored_events(store_file, sort=False):
+    """Yield a BirthdayEvent for every contact of a store.
+
+    With sort, events come in month-day and then name order, read straight
+    from the index.
+    """
+    connection = open_store(store_file, create=False)
+    try:
+        query = f"SELECT {COLUMNS} FROM contacts"
+        if sort:
+            query += " ORDER BY month, day, full_name, uid"
+        year = date.today().year
+        for row in connection.execute(query):
+            yield row_event(row, year)
+    finally:
+        connection.close()
+
+
+def birthdays_on(store_file, month, day=None, kind="birthday"):
+    """Return the events of the contacts born in a month, or on a month-day.
+
+    Other kinds of events can be asked for with kind, or all with None.
+    """
+    connection = open_store(store_file, create=False)
+    try:
+        query = f"SELECT {COLUMNS} FROM contacts WHERE month = ?"
+        params = [month]
+        if kind is not None:
+            query += " AND kind = ?"
+            params.append(kind)
+        if day is not None:
+            query += " AND day = ?"
+            params.append(day)
+        query += " ORDER BY month, day, full_name, uid"
+        return [row_event(row) for row in connection.execute(query, params)]
+    finally:
+        connection.close()
+
+
+def count_stored_contacts(store_file, kind="birthday"):
+    """Count the birthdays of a store, or its events of another kind."""
+    connection = open_store(store_file, create=False)
+    try:
+        query = "SELECT COUNT(*) FROM contacts WHERE kind = ?"
+        return connection.execute(query, [kind]).fetchone()[0]
+    finally:
+        connection.close()
+
+
+def main(argv=None, prog=None):
+    """Run the command line interface."""
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Import the birthdays of an export into a contact store"
+    )
+    parser.add_argument("csv_file", nargs="?", default="export.csv")
+    parser.add_argument("store_file", nargs="?", default=DEFAULT_STORE)
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Contacts written per transaction",
+    )
+    args = parser.parse_args(argv)
+
+    import_contacts(args.store_file, args.csv_file, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,126 +1,1162 @@
+import argparse
+import calendar
+import contextlib
 import csv
-from datetime import datetime, date
+import hashlib
+import io
+import os
+import re
+from collections import namedtuple
+from datetime import datetime, date, timezone
 import uuid
 
+from checkpoint import (
+    CHECKPOINT_EVERY,
+    Checkpoint,
+    CheckpointMismatchError,
+    OffsetLines,
+    checkpoint_path,
+)
+from event_templates import DEFAULT_TEMPLATES, LOCALES, load_templates
+from validation import Quarantine, ValidationReport
 
-def create_birthday_ics(csv_file, output_file):
-    """Create an ICS calendar file with birthday events from Google Contacts CSV export."""
+# ICS file header
+ICS_HEADER = [
+    "BEGIN:VCALENDAR",
+    "VERSION:2.0",
+    "PRODID:-//Google Birthday Liberator//Birthday Events//EN",
+    "CALSCALE:GREGORIAN",
+    "METHOD:PUBLISH",
+]
 
-    # ICS file header
-    ics_content = [
-        "BEGIN:VCALENDAR",
-        "VERSION:2.0",
-        "PRODID:-//Google Birthday Liberator//Birthday Events//EN",
-        "CALSCALE:GREGORIAN",
-        "METHOD:PUBLISH",
+# Namespace for stable event UIDs derived from contact names
+UID_NAMESPACE = uuid.UUID("6f1c2a4e-3b7d-5e8f-9a0b-1c2d3e4f5a6b")
+
+# Custom property recording which contact data an event was rendered from
+SOURCE_HASH_PROPERTY = "X-BIRTHDAY-LIBERATOR-HASH"
+
+# Columns holding the contact's labels, depending on the export's age
+LABEL_COLUMNS = ("Labels", "Group Membership")
+
+# Separator between the labels of a contact
+LABEL_SEPARATOR = ":::"
+
+# Output profiles: full writes every property and both reminders as always;
+# compact leaves out properties clients do not need and keeps one display
+# reminder (optional); minimal writes only what a birthday feed needs
+PROFILES = ("full", "compact", "minimal")
+
+# Longest content line in octets before folding (RFC 5545, section 3.1)
+FOLD_OCTETS = 75
+
+# Columns of the other dated events of a contact, e.g. "Event 1 - Value"
+EVENT_COLUMN = re.compile(r"Event (\d+) - (Label|Type|Value)")
+
+# One contact's birthday (or other dated event of the given kind), ready to be
+# rendered as a calendar event
+BirthdayEvent = namedtuple(
+    "BirthdayEvent",
+    [
+        "uid",
+        "source_hash",
+        "full_name",
+        "birthday_date",
+        "year_known",
+        "labels",
+        "kind",
+        "occasion",
+    ],
+    defaults=["", "birthday", ""],
+)
+
+
+def parse_birthday(birthday_str):
+    """Parse a Google Contacts birthday string, returning None for unknown formats."""
+    # Try YYYY-MM-DD format first
+    if len(birthday_str) == 10 and birthday_str.count("-") == 2:
+        return datetime.strptime(birthday_str, "%Y-%m-%d").date()
+    # Try --MM-DD format (no year)
+    if birthday_str.startswith("--") and len(birthday_str) == 7:
+        # Parsed in a leap year so that --02-29 is valid, then placed in the
+        # current year
+        birthday_date = datetime.strptime(f"2000-{birthday_str[2:]}", "%Y-%m-%d")
+        return yearless_birthday(birthday_date.date(), datetime.now().year)
+    return None
+
+
+def yearless_birthday(birthday_date, year):
+    """Return a birthday without a known year placed in year.
+
+    Feb 29 is placed in the last leap year up to year instead, so the date
+    stays Feb 29; birthday_in_year gives its occurrence in any other year.
+    """
+    if (birthday_date.month, birthday_date.day) == (2, 29):
+        while not calendar.isleap(year):
+            year -= 1
+    return birthday_date.replace(year=year)
+
+
+def birthday_in_year(birthday_date, year):
+    """Return the birthday's occurrence in a given year (Feb 29 falls on Feb 28)."""
+    try:
+        return birthday_date.replace(year=year)
+    except ValueError:
+        return date(year, 2, 28)
+
+
+def parse_labels(labels):
+    """Split a contact's raw labels into names ("* myContacts" is "myContacts")."""
+    names = (label.strip() for label in labels.split(LABEL_SEPARATOR))
+    return list(dict.fromkeys(name.removeprefix("* ") for name in names if name))
+
+
+def event_columns(header):
+    """Return (label_index, value_index) of each "Event N" column pair of a header.
+
+    Older exports name the label column "Event N - Type" instead of
+    "Event N - Label"; label_index is None if there is neither.
+    """
+    columns = {}
+    for index, column in enumerate(header):
+        match = EVENT_COLUMN.fullmatch(column.strip())
+        if match:
+            number, part = match.groups()
+            columns.setdefault(number, {})[part] = index
+    return [
+        (parts.get("Label", parts.get("Type")), parts["Value"])
+        for _, parts in sorted(columns.items(), key=lambda item: int(item[0]))
+        if "Value" in parts
     ]
 
-    contacts_processed = 0
 
-    with open(csv_file, "r", encoding="utf-8") as file:
-        reader = csv.reader(file)
+def event_kind(label):
+    """Return (kind, occasion) of an event column from its label."""
+    occasion = label.strip().removeprefix("* ")
+    if occasion.casefold() == "anniversary":
+        return "anniversary", occasion
+    return "event", occasion or "Event"
+
+
+class EncodedLines:
+    """Iterate over the lines of a text stream encoded back to UTF-8.
+
+    Lets a text stream be read like the binary files OffsetLines reads.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def seekable(self):
+        return False
+
+    def __iter__(self):
+        for line in self.stream:
+            yield line.encode("utf-8")
+
+
+def open_export(source):
+    """Return a context manager giving a binary file of an export to read.
+
+    source is the path of an export, its bytes, or a binary or text stream
+    holding it. Streams are read from where they are and left open; nothing
+    but a path touches the filesystem.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, "rb")
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    if isinstance(source, io.TextIOBase):
+        return contextlib.nullcontext(EncodedLines(source))
+    return contextlib.nullcontext(source)
+
+
+def broken_quoting(row, width):
+    """Tell whether a row not as wide as the header was mangled by quoting.
+
+    Non-empty fields past the header's width, or fewer fields than the header
+    with a line break inside one, come from a stray quote or comma that
+    shifted fields or swallowed the next lines.
+    """
+    if len(row) > width:
+        return any(row[width:])
+    return any("\n" in field for field in row)
+
+
+def iter_dates(
+    csv_file,
+    report=None,
+    birthdays_only=False,
+    checkpoint=None,
+    quarantine=None,
+    with_names=False,
+):
+    """Yield (full_name, date, year_known, labels, kind, occasion) for every valid date.
+
+    The header is read once to find the Birthday column and every "Event N"
+    column pair, so all dates of an export come out of a single pass: each
+    row gives its birthday (kind "birthday"), then its anniversaries (kind
+    "anniversary") and other dated events (kind "event", with the event's
+    label as occasion). With birthdays_only, event columns are ignored.
+    labels is the raw content of the label column, see parse_labels. Skipped
+    dates are recorded in report. Without one, a summary line per reason is
+    printed once the file has been read. Rows mangled by broken quoting
+    (see broken_quoting) are skipped, and so are other rows with fewer
+    fields than the header and no date. Given a Quarantine (or a report with
+    one), skipped rows are written to it. Given with_names, each tuple ends
+    with a seventh item, the contact's (first, middle, last) names.
+
+    csv_file is the path of the export, or the export itself in memory or in
+    a stream (see open_export).
+
+    Given a Checkpoint, each row starts by telling it how far the rows before
+    were read, and a resumed checkpoint's rows are skipped.
+    """
+    log_summary = report is None
+    if report is None:
+        report = ValidationReport(quarantine)
+    elif quarantine is not None:
+        report.quarantine = quarantine
+    first_row = 2
+    if checkpoint is not None:
+        saved = checkpoint.restored("report", None)
+        if saved is not None:
+            saved.quarantine = report.quarantine
+            report = saved
+        first_row = checkpoint.restored("row", first_row)
+        checkpoint.track("report", lambda: report)
+        checkpoint.track("row", lambda: row_number)
+        if report.quarantine is not None:
+            checkpoint.track("quarantine", report.quarantine.state)
+
+    with open_export(csv_file) as file:
+        lines = OffsetLines(file)
+        reader = csv.reader(lines)
         header = next(reader)
 
         # Find column indices
         first_name_idx = header.index("First Name")
         middle_name_idx = header.index("Middle Name")
         last_name_idx = header.index("Last Name")
-        birthday_idx = header.index("Birthday")
+        birthday_idx = header.index("Birthday") if "Birthday" in header else None
+        labels_idx = next(
+            (header.index(column) for column in LABEL_COLUMNS if column in header),
+            None,
+        )
+        events = [] if birthdays_only else event_columns(header)
+        if birthday_idx is None and not events:
+            raise ValueError(f"No Birthday or Event column in {csv_file}")
+        width = len(header)
+        report.columns = header
 
-        for row in reader:
-            if len(row) > birthday_idx and row[birthday_idx].strip():
-                # Extract name components
-                first_name = (
-                    row[first_name_idx].strip() if len(row) > first_name_idx else ""
-                )
-                middle_name = (
-                    row[middle_name_idx].strip() if len(row) > middle_name_idx else ""
-                )
-                last_name = (
-                    row[last_name_idx].strip() if len(row) > last_name_idx else ""
-                )
+        if checkpoint is not None and checkpoint.offset is not None:
+            file.seek(checkpoint.offset)
+            lines.offset = checkpoint.offset
+        row_end = lines.offset
 
-                # Build full name
-                name_parts = [
-                    part for part in [first_name, middle_name, last_name] if part
-                ]
-                full_name = " ".join(name_parts)
+        for row_number, row in enumerate(reader, start=first_row):
+            if checkpoint is not None:
+                # The dates of every previous row have been written by now
+                checkpoint.reached(row_end)
+                row_end = lines.offset
+            if len(row) != width and row and broken_quoting(row, width):
+                report.add(row_number, "", "", "broken_quoting", row)
+                continue
+            dates = []
+            if birthday_idx is not None and len(row) > birthday_idx:
+                birthday_str = row[birthday_idx].strip()
+                if birthday_str:
+                    dates.append(("birthday", "", birthday_str))
+            for label_idx, value_idx in events:
+                if len(row) > value_idx and row[value_idx].strip():
+                    label = ""
+                    if label_idx is not None and len(row) > label_idx:
+                        label = row[label_idx]
+                    dates.append((*event_kind(label), row[value_idx].strip()))
+            if not dates:
+                if row and len(row) < width:
+                    # Maybe cut short before its dates: do not lose it silently
+                    report.add(row_number, "", "", "short_row", row)
+                continue
+
+            # Extract name components
+            first_name = (
+                row[first_name_idx].strip() if len(row) > first_name_idx else ""
+            )
+            middle_name = (
+                row[middle_name_idx].strip() if len(row) > middle_name_idx else ""
+            )
+            last_name = row[last_name_idx].strip() if len(row) > last_name_idx else ""
+
+            # Build full name
+            name_parts = [part for part in [first_name, middle_name, last_name] if part]
+            full_name = " ".join(name_parts)
+            labels = ""
+            if labels_idx is not None and len(row) > labels_idx:
+                labels = row[labels_idx]
 
+            for kind, occasion, date_str in dates:
                 if not full_name:
+                    report.add(row_number, "", date_str, "missing_name", row)
                     continue
 
-                birthday_str = row[birthday_idx].strip()
-
-                # Parse birthday - handle different formats
-                birthday_date = None
+                # Parse the date - handle different formats
                 try:
-                    # Try YYYY-MM-DD format first
-                    if len(birthday_str) == 10 and birthday_str.count("-") == 2:
-                        birthday_date = datetime.strptime(
-                            birthday_str, "%Y-%m-%d"
-                        ).date()
-                    # Try --MM-DD format (no year)
-                    elif birthday_str.startswith("--") and len(birthday_str) == 7:
-                        month_day = birthday_str[2:]
-                        # Use current year as placeholder
-                        current_year = datetime.now().year
-                        birthday_date = datetime.strptime(
-                            f"{current_year}-{month_day}", "%Y-%m-%d"
-                        ).date()
+                    event_date = parse_birthday(date_str)
                 except ValueError:
-                    print(
-                        f"Skipping {full_name} - invalid birthday format: {birthday_str}"
-                    )
+                    report.add(row_number, full_name, date_str, "invalid_date", row)
                     continue
 
-                if birthday_date:
-                    # Create birthday event
-                    event_uid = str(uuid.uuid4())
-                    event_date = birthday_date.strftime("%Y%m%d")
-
-                    # Create event
-                    ics_content.extend(
-                        [
-                            "BEGIN:VEVENT",
-                            f"UID:{event_uid}",
-                            f"DTSTART;VALUE=DATE:{event_date}",
-                            f"DTEND;VALUE=DATE:{event_date}",
-                            f"SUMMARY:🎂 {full_name}'s Birthday",
-                            f"DESCRIPTION:Birthday of {full_name} - Remember to call and congratulate!",
-                            "RRULE:FREQ=YEARLY",
-                            "TRANSP:TRANSPARENT",
-                            "CLASS:PUBLIC",
-                            f"DTSTAMP:{datetime.now().strftime('%Y%m%dT%H%M%SZ')}",
-                            "BEGIN:VALARM",
-                            "TRIGGER:PT0S",
-                            "ACTION:EMAIL",
-                            f"SUMMARY:Today is {full_name}'s Birthday! 🎂",
-                            f"DESCRIPTION:Don't forget to call {full_name} today to wish them a happy birthday! 🎂",
-                            "END:VALARM",
-                            "BEGIN:VALARM",
-                            "TRIGGER:PT0S",
-                            "ACTION:DISPLAY",
-                            f"SUMMARY:🎂 {full_name}'s Birthday!",
-                            f"DESCRIPTION:Don't forget to call {full_name} today to wish them a happy birthday! 🎂",
-                            "END:VALARM",
-                            "END:VEVENT",
-                        ]
-                    )
-
-                    contacts_processed += 1
-
-    # Close calendar
-    ics_content.append("END:VCALENDAR")
-
-    # Write ICS file
-    with open(output_file, "w", encoding="utf-8") as file:
-        file.write("\n".join(ics_content))
+                if event_date:
+                    report.valid += 1
+                    year_known = not date_str.startswith("--")
+                    entry = full_name, event_date, year_known, labels, kind, occasion
+                    if with_names:
+                        entry += ((first_name, middle_name, last_name),)
+                    yield entry
+                else:
+                    report.add(row_number, full_name, date_str, "unknown_format", row)
+
+    if log_summary:
+        report.log_summary()
+
+
+def iter_birthdays(csv_file, report=None):
+    """Yield (full_name, birthday_date, year_known, labels) for every valid birthday.
+
+    Like iter_dates, without the other events.
+    """
+    for entry in iter_dates(csv_file, report, birthdays_only=True):
+        yield entry[:4]
+
+
+def event_identity(full_name, kind, occasion):
+    """Return the identity an event's UID derives from.
+
+    A birthday is identified by the contact name alone, other events by the
+    name, kind and occasion.
+    """
+    if kind == "birthday":
+        return full_name
+    return f"{full_name}\n{kind}\n{occasion}"
+
+
+def iter_contact_keys(birthdays, memory_budget=None, checkpoint=None):
+    """Yield (key, birthday) pairs giving each birthday a unique identity key.
+
+    The key is the first field of the birthday (the contact name, or the
+    event identity), numbered in file order for repeated names. Without a
+    memory_budget every name is tracked in memory; with one, the birthdays
+    are sorted by name on disk instead, so they come out in name order.
+    Given a Checkpoint, the names tracked are saved with it.
+    """
+    if memory_budget is None:
+        name_counts = {}
+        if checkpoint is not None:
+            name_counts = checkpoint.restored("names", name_counts)
+            checkpoint.track("names", lambda: name_counts)
+        for birthday in birthdays:
+            full_name = birthday[0]
+            count = name_counts[full_name] = name_counts.get(full_name, 0) + 1
+            yield full_name if count == 1 else f"{full_name}#{count}", birthday
+        return
+
+    from external_sort import external_sort
+
+    by_name = external_sort(
+        ((birthday[0], row, birthday) for row, birthday in enumerate(birthdays)),
+        key=lambda record: record[:2],
+        memory_budget=memory_budget,
+    )
+    previous_name = None
+    count = 0
+    for full_name, _, birthday in by_name:
+        count = count + 1 if full_name == previous_name else 1
+        previous_name = full_name
+        yield full_name if count == 1 else f"{full_name}#{count}", birthday
+
+
+def iter_birthday_events(
+    csv_file, memory_budget=None, checkpoint=None, quarantine=None, report=None
+):
+    """Yield a BirthdayEvent for every valid birthday, anniversary and other event.
+
+    UIDs are derived from the contact name (and the kind and occasion of
+    events other than birthdays), so regenerating the calendar keeps them
+    stable; repeated identities are numbered in file order. A Checkpoint
+    can only be given without a memory_budget. Skipped rows go to quarantine,
+    and are recorded in report (see iter_dates).
+    """
+    entries = (
+        (event_identity(entry[0], entry[4], entry[5]), entry)
+        for entry in iter_dates(
+            csv_file, report, checkpoint=checkpoint, quarantine=quarantine
+        )
+    )
+    keys = iter_contact_keys(entries, memory_budget, checkpoint)
+    for key, (identity, entry) in keys:
+        full_name, event_date, year_known, labels, kind, occasion = entry
+        event_uid = str(uuid.uuid5(UID_NAMESPACE, key))
+        source_hash = hashlib.sha1(
+            f"{identity}\n{event_date.isoformat()}".encode("utf-8")
+        ).hexdigest()
+        yield BirthdayEvent(
+            event_uid,
+            source_hash,
+            full_name,
+            event_date,
+            year_known,
+            labels,
+            kind,
+            occasion,
+        )
+
+
+def render_event(
+    event,
+    occurrence=None,
+    age=None,
+    templates=DEFAULT_TEMPLATES,
+    profile="full",
+    alarms=True,
+    dtstamp=None,
+):
+    """Return the ICS lines of a birthday event with its reminders.
+
+    By default the event repeats yearly from the birthday. Given an occurrence
+    date it is rendered as that single year's instance instead, mentioning the
+    age the contact turns if known. The wording comes from the templates of
+    the event's kind. The compact profile drops DTEND (implied for all-day
+    events), CLASS:PUBLIC (the default), the source hash, the email reminder
+    and the repeated reminder texts, keeping one display reminder unless
+    alarms is false; minimal also drops the description and reminders.
+    DTSTAMP is the current time unless a fixed dtstamp is given.
+    """
+    summary, description, email_summary, display_summary, alarm_description = (
+        templates.kinds[event.kind](event.full_name, age, event.occasion)
+    )
+
+    if occurrence is None:
+        event_uid = event.uid
+        event_date = event.birthday_date.strftime("%Y%m%d")
+        recurrence = ["RRULE:FREQ=YEARLY"]
+    else:
+        event_uid = f"{event.uid}-{occurrence.year}"
+        event_date = occurrence.strftime("%Y%m%d")
+        recurrence = []
+
+    stamp = f"DTSTAMP:{dtstamp or datetime.now().strftime('%Y%m%dT%H%M%SZ')}"
+    if profile != "full":
+        lines = [
+            "BEGIN:VEVENT",
+            f"UID:{event_uid}",
+            stamp,
+            f"DTSTART;VALUE=DATE:{event_date}",
+            *recurrence,
+            f"SUMMARY:{summary}",
+            "TRANSP:TRANSPARENT",
+        ]
+        if profile == "compact":
+            lines.append(f"DESCRIPTION:{description}")
+            if alarms:
+                lines += [
+                    "BEGIN:VALARM",
+                    "TRIGGER:PT0S",
+                    "ACTION:DISPLAY",
+                    f"DESCRIPTION:{display_summary}",
+                    "END:VALARM",
+                ]
+        lines.append("END:VEVENT")
+        return lines
+
+    return [
+        "BEGIN:VEVENT",
+        f"UID:{event_uid}",
+        f"DTSTART;VALUE=DATE:{event_date}",
+        f"DTEND;VALUE=DATE:{event_date}",
+        f"SUMMARY:{summary}",
+        f"DESCRIPTION:{description}",
+        *recurrence,
+        "TRANSP:TRANSPARENT",
+        "CLASS:PUBLIC",
+        stamp,
+        f"{SOURCE_HASH_PROPERTY}:{event.source_hash}",
+        "BEGIN:VALARM",
+        "TRIGGER:PT0S",
+        "ACTION:EMAIL",
+        f"SUMMARY:{email_summary}",
+        f"DESCRIPTION:{alarm_description}",
+        "END:VALARM",
+        "BEGIN:VALARM",
+        "TRIGGER:PT0S",
+        "ACTION:DISPLAY",
+        f"SUMMARY:{display_summary}",
+        f"DESCRIPTION:{alarm_description}",
+        "END:VALARM",
+        "END:VEVENT",
+    ]
+
+
+def render_block(
+    event, templates=DEFAULT_TEMPLATES, profile="full", alarms=True, dtstamp=None
+):
+    """Return the bytes of an event as written in a calendar of a profile.
+
+    Profiles other than full are folded with CRLF line ends, as write_ics
+    writes them.
+    """
+    lines = render_event(
+        event, templates=templates, profile=profile, alarms=alarms, dtstamp=dtstamp
+    )
+    if profile != "full":
+        return "\r\n".join(map(fold_line, lines)).encode("utf-8")
+    return "\n".join(lines).encode("utf-8")
+
+
+def iter_instances(
+    event, first_year, last_year, with_ages=False, templates=DEFAULT_TEMPLATES
+):
+    """Lazily yield the ICS lines of each yearly instance in a window of years.
+
+    Feb 29 birthdays fall on Feb 28 in non-leap years, and no instances are
+    produced before a known birth year.
+    """
+    if event.year_known:
+        first_year = max(first_year, event.birthday_date.year + 1)
+
+    for year in range(first_year, last_year + 1):
+        age = None
+        if with_ages and event.year_known:
+            age = year - event.birthday_date.year
+        occurrence = birthday_in_year(event.birthday_date, year)
+        yield render_event(event, occurrence, age, templates)
+
+
+def event_sort_key(event):
+    """Sort key ordering events by month and day, then by name."""
+    return (
+        event.birthday_date.month,
+        event.birthday_date.day,
+        event.full_name,
+        event.uid,
+    )
+
+
+def fold_line(line):
+    """Fold a content line into lines of at most 75 octets (RFC 5545, section 3.1).
+
+    Continuation lines start with a space; UTF-8 sequences are never split.
+    """
+    if len(line) * 4 <= FOLD_OCTETS:
+        return line
+    data = line.encode("utf-8")
+    if len(data) <= FOLD_OCTETS:
+        return line
+
+    parts = []
+    start = 0
+    limit = FOLD_OCTETS
+    while len(data) - start > limit:
+        end = start + limit
+        while data[end] & 0xC0 == 0x80:
+            # Back up to the first byte of a multi-byte character
+            end -= 1
+        parts.append(data[start:end].decode("utf-8"))
+        start = end
+        limit = FOLD_OCTETS - 1
+    parts.append(data[start:].decode("utf-8"))
+    return "\r\n ".join(parts)
+
+
+def component_size(lines):
+    """Return the bytes the lines of a component take in a full-profile file."""
+    return len(("\n" + "\n".join(lines)).encode("utf-8"))
+
+
+def iter_profile_components(events, profile, alarms, templates, sizes, dtstamp=None):
+    """Yield the lines of each event in a profile other than full.
+
+    sizes["full"] grows by what each event takes in the full profile, so the
+    saving can be reported.
+    """
+    for event in events:
+        full_lines = render_event(event, templates=templates, dtstamp=dtstamp)
+        sizes["full"] += component_size(full_lines)
+        yield render_event(
+            event,
+            templates=templates,
+            profile=profile,
+            alarms=alarms,
+            dtstamp=dtstamp,
+        )
+
+
+def reproducible_stamp(source_file):
+    """Return a DTSTAMP value derived from the input rather than the clock.
+
+    SOURCE_DATE_EPOCH is used when set, as for reproducible builds, else the
+    modification time of source_file; both are written in UTC.
+    """
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    timestamp = int(epoch) if epoch else os.path.getmtime(source_file)
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def hash_file(path):
+    """Return a SHA-256 hash of the content of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest
+
+
+def calendar_digest(path):
+    """Return the SHA-256 digest of an ICS file's lines other than DTSTAMP.
+
+    DTSTAMP only says when the file was written, so two calendars that hash
+    the same here hold the same events.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for line in file:
+            if not line.startswith(b"DTSTAMP:"):
+                digest.update(line)
+    return digest.digest()
+
+
+def write_ics(output_file, components, fold=False, checkpoint=None):
+    """Stream lists of component lines into an ICS file.
+
+    With fold, lines end with CRLF and long lines are folded, as RFC 5545
+    requires. The file is written under a temporary name and only replaces
+    output_file once complete, so an aborted run leaves the previous
+    calendar in place. If the content hashes the same as the existing
+    output_file apart from DTSTAMP lines (see calendar_digest), that file is
+    left untouched. Returns (component count, whether output_file was
+    written).
+
+    Given a Checkpoint, the temporary file is the partial output it saves, so
+    it is kept when the run is interrupted, and a resumed run appends to it.
+    """
+    newline = "\r\n" if fold else "\n"
+    count = 0
+    temp_file = f"{output_file}.tmp"
+    try:
+        if checkpoint is None:
+            file = open(temp_file, "wb")
+        else:
+            file = checkpoint.open_output(temp_file)
+            count = checkpoint.restored("components", count)
+            checkpoint.track("components", lambda: count)
+        with file:
+            size = file.tell()
+
+            def write(text):
+                nonlocal size
+                data = text.encode("utf-8")
+                file.write(data)
+                size += len(data)
+
+            if not size:
+                write(newline.join(ICS_HEADER))
+            for lines in components:
+                if fold:
+                    lines = map(fold_line, lines)
+                write(newline + newline.join(lines))
+                count += 1
+            write(f"{newline}END:VCALENDAR{newline if fold else ''}")
+    except BaseException:
+        if checkpoint is None and os.path.exists(temp_file):
+            os.unlink(temp_file)
+        raise
+
+    if checkpoint is not None:
+        checkpoint.remove()
+    if (
+        os.path.exists(output_file)
+        and os.path.getsize(output_file) == size
+        and calendar_digest(output_file) == calendar_digest(temp_file)
+    ):
+        os.unlink(temp_file)
+        return count, False
+    os.replace(temp_file, output_file)
+    return count, True
+
+
+def create_birthday_ics(
+    csv_file,
+    output_file,
+    sort=False,
+    memory_budget=None,
+    templates=DEFAULT_TEMPLATES,
+    store=None,
+    profiler=None,
+    profile="full",
+    alarms=True,
+    dtstamp=None,
+    checkpoint=None,
+    quarantine=None,
+):
+    """Create an ICS calendar file with birthday events from Google Contacts CSV export.
+
+    With sort, events are ordered by month-day and then name. Exports that do
+    not fit memory_budget (64 MiB by default) are sorted in runs spilled to
+    temporary files. Given a contact store, events are read from it instead
+    of csv_file, already sorted by its month-day index. Given a
+    MemoryProfiler, memory is measured per phase (read, sort, render, write)
+    and reported at the end. Profiles other than full (see render_event) are
+    written with folded CRLF lines, and the bytes saved over full reported.
+    With a fixed dtstamp and sort, the same input always gives the same
+    bytes, and an unchanged calendar is not rewritten. Given a Checkpoint
+    (only for unsorted exports), the run can be resumed if interrupted.
+    Rows skipped while reading the export are written to quarantine.
+    """
+    if checkpoint is not None and (sort or store is not None):
+        raise ValueError("Checkpoints need an unsorted run reading csv_file")
+    if profiler is not None:
+        profiler.start()
+    try:
+        if store is not None:
+            from contact_store import iter_stored_events
+
+            events = iter_stored_events(store, sort)
+            if profiler is not None:
+                events = profiler.iter_phase("read", events)
+        elif sort:
+            from external_sort import DEFAULT_MEMORY_BUDGET, external_sort
+
+            if memory_budget is None:
+                memory_budget = DEFAULT_MEMORY_BUDGET
+            # Numbering repeated names and ordering by date are two sorts,
+            # both buffering at once: each gets half the budget
+            memory_budget //= 2
+            events = iter_birthday_events(
+                csv_file, memory_budget, quarantine=quarantine
+            )
+            if profiler is not None:
+                events = profiler.iter_phase("read", events)
+            events = external_sort(events, event_sort_key, memory_budget)
+            if profiler is not None:
+                events = profiler.iter_phase("sort", events)
+        else:
+            events = iter_birthday_events(
+                csv_file, checkpoint=checkpoint, quarantine=quarantine
+            )
+            if profiler is not None:
+                events = profiler.iter_phase("read", events)
+
+        # Create one birthday event per contact
+        fold = profile != "full"
+        sizes = {"full": component_size(ICS_HEADER) + len("\nEND:VCALENDAR") - 1}
+        if checkpoint is not None:
+            sizes = checkpoint.restored("sizes", sizes)
+            checkpoint.track("sizes", lambda: sizes)
+        if fold:
+            components = iter_profile_components(
+                events, profile, alarms, templates, sizes, dtstamp
+            )
+        else:
+            components = (
+                render_event(event, templates=templates, dtstamp=dtstamp)
+                for event in events
+            )
+        if profiler is None:
+            contacts_processed, written = write_ics(
+                output_file, components, fold, checkpoint
+            )
+        else:
+            components = profiler.iter_phase("render", components)
+            with profiler.phase("write"):
+                contacts_processed, written = write_ics(
+                    output_file, components, fold, checkpoint
+                )
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            profiler.print_report()
 
     print(f"Created birthday calendar with {contacts_processed} events")
-    print(f"Calendar saved as: {output_file}")
+    if written:
+        print(f"Calendar saved as: {output_file}")
+    else:
+        print(f"Calendar unchanged, left {output_file} as it was")
+    if fold:
+        size = os.path.getsize(output_file)
+        saved = sizes["full"] - size
+        print(
+            f"Profile {profile}: {size} bytes, {saved} bytes "
+            f"({saved / sizes['full']:.0%}) less than full"
+        )
 
     return contacts_processed
 
 
+def render_ics(
+    source,
+    sort=False,
+    templates=DEFAULT_TEMPLATES,
+    profile="full",
+    alarms=True,
+    dtstamp=None,
+    report=None,
+    cache=None,
+):
+    """Render the calendar of an export held in memory and return its bytes.
+
+    source is the export's bytes, or a binary or text stream of it (see
+    open_export). The result is what create_birthday_ics writes for the same
+    options, built in a memory buffer instead: nothing touches the
+    filesystem and nothing is shared between calls, so many uploads can be
+    rendered at once by a pool of threads. With sort, events are sorted in
+    memory. Skipped rows are recorded in report rather than printed. Given
+    a RenderCache (see render_cache.py), events rendered by earlier calls
+    are taken from it.
+    """
+    if report is None:
+        report = ValidationReport()
+    events = iter_birthday_events(source, report=report)
+    if sort:
+        events = sorted(events, key=event_sort_key)
+    render = render_block if cache is None else cache.render
+    fold = profile != "full"
+    newline = "\r\n" if fold else "\n"
+    separator = newline.encode("utf-8")
+
+    buffer = io.BytesIO()
+    buffer.write(newline.join(ICS_HEADER).encode("utf-8"))
+    for event in events:
+        buffer.write(separator)
+        buffer.write(render(event, templates, profile, alarms, dtstamp))
+    buffer.write(f"{newline}END:VCALENDAR{newline if fold else ''}".encode("utf-8"))
+    return buffer.getvalue()
+
+
+def create_expanded_ics(
+    csv_file,
+    output_file,
+    first_year,
+    last_year,
+    with_ages=False,
+    templates=DEFAULT_TEMPLATES,
+):
+    """Create an ICS calendar with one concrete event per birthday and year.
+
+    For clients that ignore RRULE. Events are streamed to the file as they are
+    rendered, so memory use does not depend on the size of the year window.
+    """
+    instances_created, _ = write_ics(
+        output_file,
+        (
+            lines
+            for event in iter_birthday_events(csv_file)
+            for lines in iter_instances(
+                event, first_year, last_year, with_ages, templates
+            )
+        ),
+    )
+
+    print(
+        f"Created birthday calendar with {instances_created} events "
+        f"for {first_year}-{last_year}"
+    )
+    print(f"Calendar saved as: {output_file}")
+
+    return instances_created
+
+
+def validate_birthdays(csv_file, report_file=None, quarantine=None):
+    """Check every birthday in an export without rendering a calendar.
+
+    Skipped contacts are collected with their row, name, raw value and reason,
+    and written to report_file as JSON (or CSV for a .csv name) in one write.
+    Their whole rows are written to quarantine. Returns the ValidationReport.
+    """
+    report = ValidationReport(quarantine)
+    for _ in iter_birthdays(csv_file, report):
+        pass
+
+    print(
+        f"Validated {report.valid + len(report.errors)} birthdays: "
+        f"{report.valid} valid, {len(report.errors)} skipped"
+    )
+    report.log_summary()
+    if report_file:
+        report.write(report_file)
+        print(f"Report saved as: {report_file}")
+
+    return report
+
+
+def close_quarantine(quarantine):
+    """Close the quarantine file, if any, and say what went into it."""
+    if quarantine is not None:
+        quarantine.close()
+        print(f"Quarantined {quarantine.count} skipped rows in {quarantine.path}")
+
+
+def main(argv=None, prog=None):
+    """Run the command line interface."""
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Create the birthday calendar"
+    )
+    parser.add_argument("csv_file", nargs="?", default="export.csv")
+    parser.add_argument("output_file", nargs="?", default="birthdays.ics")
+    parser.add_argument(
+        "--expand",
+        metavar="FIRST:LAST",
+        help="Write one event per year in this window instead of a yearly RRULE",
+    )
+    parser.add_argument(
+        "--ages",
+        action="store_true",
+        help="With --expand, mention the age each contact turns when known",
+    )
+    parser.add_argument(
+        "--sorted",
+        action="store_true",
+        help="Order events by month-day and then name",
+    )
+    parser.add_argument(
+        "--reproducible",
+        action="store_true",
+        help="Same input, same bytes: sorted events and a DTSTAMP taken from "
+        "SOURCE_DATE_EPOCH or the input's modification time",
+    )
+    parser.add_argument(
+        "--dtstamp",
+        metavar="STAMP",
+        help="Give every event this UTC DTSTAMP (e.g. 20260101T000000Z)",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        default="64M",
+        help="Memory to use for sorting before spilling to disk (e.g. 256M)",
+    )
+    parser.add_argument(
+        "--store",
+        metavar="FILE",
+        help="Read contacts from this store (see contact_store.py) instead",
+    )
+    parser.add_argument(
+        "--output-profile",
+        default="full",
+        choices=PROFILES,
+        help="compact and minimal leave out properties clients do not need",
+    )
+    parser.add_argument(
+        "--no-alarms",
+        action="store_true",
+        help="With --output-profile compact, leave out the reminder",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        metavar="ROWS",
+        help=f"Save a checkpoint every ROWS rows (default {CHECKPOINT_EVERY} "
+        "with --resume)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run from its last checkpoint",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Report memory use per phase and the largest allocation sites",
+    )
+    parser.add_argument(
+        "--memory-ceiling",
+        metavar="SIZE",
+        help="Abort cleanly before the RSS reaches SIZE (e.g. 512M)",
+    )
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help="Update an existing calendar in place, keeping edits and other events",
+    )
+    parser.add_argument(
+        "--by-label",
+        metavar="DIR",
+        help="Write one calendar per contact label into DIR",
+    )
+    parser.add_argument(
+        "--include-label",
+        action="append",
+        metavar="LABEL",
+        help="With --by-label, only create this label's calendar (repeatable)",
+    )
+    parser.add_argument(
+        "--exclude-label",
+        action="append",
+        default=[],
+        metavar="LABEL",
+        help="With --by-label, skip this label's calendar (repeatable)",
+    )
+    parser.add_argument(
+        "--locale",
+        default="en",
+        choices=sorted(LOCALES),
+        help="Language of the event texts",
+    )
+    parser.add_argument(
+        "--templates",
+        metavar="FILE",
+        help="JSON file overriding some of the locale's event texts",
+    )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="Only check the birthdays and report the contacts that would be skipped",
+    )
+    parser.add_argument(
+        "--report",
+        metavar="FILE",
+        help="With --validate, write skipped contacts to FILE (.json or .csv)",
+    )
+    parser.add_argument(
+        "--preview",
+        type=int,
+        metavar="N",
+        help="Only render a random sample of N contacts to a .preview.ics file "
+        "next to the calendar, and print quick statistics",
+    )
+    parser.add_argument(
+        "--preview-first",
+        action="store_true",
+        help="With --preview, take the first N contacts and stop reading there",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="With --preview, seed the random sample to make it repeatable",
+    )
+    parser.add_argument(
+        "--quarantine",
+        metavar="FILE",
+        help="Write the whole rows of skipped contacts, with the reason, to FILE "
+        "(.csv, else NDJSON)",
+    )
+    args = parser.parse_args(argv)
+    if args.dtstamp and not re.fullmatch(r"\d{8}T\d{6}Z", args.dtstamp):
+        parser.error(f"--dtstamp must look like 20260101T000000Z, not {args.dtstamp}")
+    templates = load_templates(args.locale, args.templates)
+
+    if args.quarantine and (args.by_label or args.expand or args.merge):
+        parser.error("--quarantine only works when creating one calendar")
+    if args.merge and args.output_profile != "full":
+        parser.error("--merge needs the full profile, which keeps the source hash")
+    quarantine = None
+    if args.preview:
+        from preview import create_preview, preview_path
+
+        create_preview(
+            args.csv_file,
+            preview_path(args.output_file),
+            args.preview,
+            args.preview_first,
+            args.seed,
+            templates,
+            args.output_profile,
+            not args.no_alarms,
+        )
+    elif args.validate:
+        if args.quarantine:
+            quarantine = Quarantine(args.quarantine)
+        try:
+            validate_birthdays(args.csv_file, args.report, quarantine)
+        finally:
+            close_quarantine(quarantine)
+    elif args.by_label:
+        from group_calendars import create_group_calendars
+
+        create_group_calendars(
+            args.csv_file,
+            args.by_label,
+            args.include_label,
+            args.exclude_label,
+            templates,
+        )
+    elif args.expand:
+        first_year, _, last_year = args.expand.partition(":")
+        create_expanded_ics(
+            args.csv_file,
+            args.output_file,
+            int(first_year),
+            int(last_year or first_year),
+            args.ages,
+            templates,
+        )
+    elif args.merge and os.path.exists(args.output_file):
+        from ics_merge import merge_birthday_ics
+
+        merge_birthday_ics(args.csv_file, args.output_file, args.output_file, templates)
+    else:
+        if args.store and not os.path.exists(args.store):
+            parser.exit(1, f"No contact store at {args.store}\n")
+        sort = args.sorted or args.reproducible
+        dtstamp = args.dtstamp
+        if args.reproducible and not dtstamp:
+            dtstamp = reproducible_stamp(args.store or args.csv_file)
+        memory_budget = None
+        if sort and not args.store:
+            from external_sort import parse_size
+
+            memory_budget = parse_size(args.memory_budget)
+
+        profiler = None
+        ceiling_errors = ()
+        if args.profile_memory or args.memory_ceiling:
+            from external_sort import parse_size
+            from memory_profile import MemoryCeilingExceededError, MemoryProfiler
+
+            ceiling = parse_size(args.memory_ceiling) if args.memory_ceiling else None
+            profiler = MemoryProfiler(ceiling, trace=args.profile_memory)
+            ceiling_errors = MemoryCeilingExceededError
+
+        checkpoint = None
+        if args.checkpoint_every or args.resume:
+            if sort or args.store:
+                parser.error("checkpoints need an unsorted run from the export")
+            try:
+                checkpoint = Checkpoint(
+                    checkpoint_path(args.output_file),
+                    args.csv_file,
+                    args.checkpoint_every or CHECKPOINT_EVERY,
+                    resume=args.resume,
+                )
+            except CheckpointMismatchError as error:
+                parser.exit(1, f"Cannot resume: {error}\n")
+            if checkpoint.offset is not None:
+                print(f"Resuming at byte {checkpoint.offset} of {args.csv_file}")
+        if args.quarantine:
+            state = None
+            if checkpoint is not None:
+                state = checkpoint.restored("quarantine", state)
+            quarantine = Quarantine(args.quarantine, state)
+
+        try:
+            create_birthday_ics(
+                args.csv_file,
+                args.output_file,
+                sort=sort,
+                memory_budget=memory_budget,
+                templates=templates,
+                store=args.store,
+                profiler=profiler,
+                profile=args.output_profile,
+                alarms=not args.no_alarms,
+                dtstamp=dtstamp,
+                checkpoint=checkpoint,
+                quarantine=quarantine,
+            )
+        except CheckpointMismatchError as error:
+            parser.exit(1, f"Cannot resume: {error}\n")
+        except ceiling_errors as error:
+            parser.exit(1, f"Aborted: {error}\n")
+        finally:
+            close_quarantine(quarantine)
+
+
 if __name__ == "__main__":
-    create_birthday_ics("export.csv", "birthdays.ics")
+    main()
@@ -0,0 +1,255 @@
+import hashlib
+import json
+import string
+
+# Wording of an event. Templates can use {name}, the contact's name, {age},
+# the age the contact turns or the years since the first occurrence (when
+# known), {occasion}, the label of the event in the export (e.g. "Name day"),
+# and {title}, the result of the title or age_title template.
+TEMPLATE_KEYS = (
+    "title",
+    "age_title",
+    "summary",
+    "description",
+    "email_summary",
+    "display_summary",
+    "alarm_description",
+)
+
+# Placeholders each template may use; titles are filled before {title} exists
+TITLE_SLOTS = {"name", "age", "occasion"}
+TEXT_SLOTS = {"name", "age", "occasion", "title"}
+
+# Kinds of dated events, each with its own templates. The birthday templates
+# are the top-level keys of a locale, the others are nested under the kind.
+EVENT_KINDS = ("birthday", "anniversary", "event")
+
+LOCALES = {
+    "en": {
+        "title": "{name}'s Birthday",
+        "age_title": "{name}'s Birthday (turns {age})",
+        "summary": "🎂 {title}",
+        "description": "Birthday of {name} - Remember to call and congratulate!",
+        "email_summary": "Today is {title}! 🎂",
+        "display_summary": "🎂 {title}!",
+        "alarm_description": (
+            "Don't forget to call {name} today to wish them a happy birthday! 🎂"
+        ),
+        "anniversary": {
+            "title": "{name}'s Anniversary",
+            "age_title": "{name}'s Anniversary ({age} years)",
+            "summary": "💍 {title}",
+            "description": "Anniversary of {name} - Remember to send your wishes!",
+            "email_summary": "Today is {title}! 💍",
+            "display_summary": "💍 {title}!",
+            "alarm_description": (
+                "Don't forget to congratulate {name} on their anniversary today! 💍"
+            ),
+        },
+        "event": {
+            "title": "{name}: {occasion}",
+            "age_title": "{name}: {occasion} ({age} years)",
+            "summary": "📅 {title}",
+            "description": "{occasion} of {name}",
+            "email_summary": "Today: {title} 📅",
+            "display_summary": "📅 {title}",
+            "alarm_description": "Today is {name}'s {occasion}. 📅",
+        },
+    },
+    "de": {
+        "title": "Geburtstag von {name}",
+        "age_title": "Geburtstag von {name} (wird {age})",
+        "summary": "🎂 {title}",
+        "description": "Geburtstag von {name} - Anrufen und gratulieren!",
+        "email_summary": "Heute: {title}! 🎂",
+        "display_summary": "🎂 {title}!",
+        "alarm_description": (
+            "Vergiss nicht, {name} heute anzurufen und zu gratulieren! 🎂"
+        ),
+        "anniversary": {
+            "title": "Jahrestag von {name}",
+            "age_title": "Jahrestag von {name} ({age} Jahre)",
+            "summary": "💍 {title}",
+            "description": "Jahrestag von {name} - Glückwünsche nicht vergessen!",
+            "email_summary": "Heute: {title}! 💍",
+            "display_summary": "💍 {title}!",
+            "alarm_description": (
+                "Vergiss nicht, {name} heute zum Jahrestag zu gratulieren! 💍"
+            ),
+        },
+        "event": {
+            "title": "{occasion} von {name}",
+            "age_title": "{occasion} von {name} ({age} Jahre)",
+            "summary": "📅 {title}",
+            "description": "{occasion} von {name}",
+            "email_summary": "Heute: {title} 📅",
+            "display_summary": "📅 {title}",
+            "alarm_description": "Heute: {title}. 📅",
+        },
+    },
+    "es": {
+        "title": "Cumpleaños de {name}",
+        "age_title": "Cumpleaños de {name} (cumple {age})",
+        "summary": "🎂 {title}",
+        "description": "Cumpleaños de {name} - ¡Recuerda llamar para felicitar!",
+        "email_summary": "¡Hoy: {title}! 🎂",
+        "display_summary": "🎂 ¡{title}!",
+        "alarm_description": (
+            "¡No olvides llamar hoy a {name} para desearle feliz cumpleaños! 🎂"
+        ),
+        "anniversary": {
+            "title": "Aniversario de {name}",
+            "age_title": "Aniversario de {name} ({age} años)",
+            "summary": "💍 {title}",
+            "description": "Aniversario de {name} - ¡Recuerda felicitar!",
+            "email_summary": "¡Hoy: {title}! 💍",
+            "display_summary": "💍 ¡{title}!",
+            "alarm_description": (
+                "¡No olvides felicitar hoy a {name} por su aniversario! 💍"
+            ),
+        },
+        "event": {
+            "title": "{occasion} de {name}",
+            "age_title": "{occasion} de {name} ({age} años)",
+            "summary": "📅 {title}",
+            "description": "{occasion} de {name}",
+            "email_summary": "Hoy: {title} 📅",
+            "display_summary": "📅 {title}",
+            "alarm_description": "Hoy: {title}. 📅",
+        },
+    },
+    "fr": {
+        "title": "Anniversaire de {name}",
+        "age_title": "Anniversaire de {name} ({age} ans)",
+        "summary": "🎂 {title}",
+        "description": "Anniversaire de {name} - Pensez à appeler pour le fêter !",
+        "email_summary": "Aujourd'hui : {title} ! 🎂",
+        "display_summary": "🎂 {title} !",
+        "alarm_description": (
+            "N'oubliez pas d'appeler {name} aujourd'hui pour lui souhaiter "
+            "un joyeux anniversaire ! 🎂"
+        ),
+        "anniversary": {
+            "title": "Anniversaire de mariage de {name}",
+            "age_title": "Anniversaire de mariage de {name} ({age} ans)",
+            "summary": "💍 {title}",
+            "description": "Anniversaire de mariage de {name} - Pensez à féliciter !",
+            "email_summary": "Aujourd'hui : {title} ! 💍",
+            "display_summary": "💍 {title} !",
+            "alarm_description": (
+                "N'oubliez pas de féliciter {name} pour son anniversaire "
+                "de mariage ! 💍"
+            ),
+        },
+        "event": {
+            "title": "{occasion} de {name}",
+            "age_title": "{occasion} de {name} ({age} ans)",
+            "summary": "📅 {title}",
+            "description": "{occasion} de {name}",
+            "email_summary": "Aujourd'hui : {title} 📅",
+            "display_summary": "📅 {title}",
+            "alarm_description": "Aujourd'hui : {title}. 📅",
+        },
+    },
+}
+
+
+def escape_text(value):
+    """Escape a value for an ICS TEXT property (RFC 5545, section 3.3.11)."""
+    if "\\" in value or ";" in value or "," in value or "\n" in value:
+        return (
+            value.replace("\\", "\\\\")
+            .replace(";", "\\;")
+            .replace(",", "\\,")
+            .replace("\n", "\\n")
+        )
+    return value
+
+
+def template_source(template, slots=TEXT_SLOTS):
+    """Translate a template into the source of an equivalent f-string.
+
+    The literal text is escaped here, once; values must be escaped already.
+    """
+    parts = []
+    for literal, field, format_spec, conversion in string.Formatter().parse(template):
+        parts.append(escape_text(literal).replace("{", "{{").replace("}", "}}"))
+        if field is None:
+            continue
+        if field not in slots or format_spec or conversion:
+            raise ValueError(f"Unknown placeholder {{{field}}} in template: {template}")
+        parts.append(f"{{{field}}}")
+    return f"f{''.join(parts)!r}"
+
+
+def compile_render(templates):
+    """Compile templates into one function of (full_name, age, occasion) filling them.
+
+    The function escapes the values once and builds every text with
+    f-strings alone, so filling the templates costs no parsing. Only the
+    known slot names reach the generated code.
+    """
+    title = template_source(templates["title"], TITLE_SLOTS)
+    age_title = template_source(templates["age_title"], TITLE_SLOTS)
+    texts = ", ".join(template_source(templates[key]) for key in TEMPLATE_KEYS[2:])
+    namespace = {"escape_text": escape_text}
+    exec(
+        "def render(full_name, age=None, occasion=''):\n"
+        "    name = escape_text(full_name)\n"
+        "    occasion = escape_text(occasion)\n"
+        f"    title = {title} if age is None else {age_title}\n"
+        f"    return ({texts})\n",
+        namespace,
+    )
+    return namespace["render"]
+
+
+class EventTemplates:
+    """The wording of events of every kind, compiled once into formatters.
+
+    version is a short hash of the templates, telling apart events rendered
+    with different wording (see render_cache.py).
+    """
+
+    def __init__(self, templates):
+        unknown = set(templates) - set(TEMPLATE_KEYS) - set(EVENT_KINDS[1:])
+        for kind in EVENT_KINDS[1:]:
+            unknown |= set(templates.get(kind, ())) - set(TEMPLATE_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown template keys: {', '.join(sorted(unknown))}")
+        # kinds[kind](full_name, age=None, occasion="") returns the escaped
+        # (summary, description, email_summary, display_summary,
+        # alarm_description) of one event of that kind
+        self.kinds = {"birthday": compile_render(templates)}
+        for kind in EVENT_KINDS[1:]:
+            self.kinds[kind] = compile_render(templates[kind])
+        self.render = self.kinds["birthday"]
+        self.version = hashlib.sha1(
+            json.dumps(templates, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
+
+
+def load_templates(locale="en", template_file=None):
+    """Compile the templates of a locale, overridden by a JSON template file.
+
+    Top-level keys of the file override the birthday templates; objects under
+    "anniversary" or "event" override those of that kind.
+    """
+    if locale not in LOCALES:
+        raise ValueError(f"Unknown locale: {locale}")
+    templates = dict(LOCALES[locale])
+    for kind in EVENT_KINDS[1:]:
+        templates[kind] = dict(templates[kind])
+
+    if template_file:
+        with open(template_file, "r", encoding="utf-8") as file:
+            for key, value in json.load(file).items():
+                if key in templates and isinstance(templates[key], dict):
+                    templates[key].update(value)
+                else:
+                    templates[key] = value
+
+    return EventTemplates(templates)
+
+
+DEFAULT_TEMPLATES = load_templates()
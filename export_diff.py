@@ -0,0 +1,189 @@
+import argparse
+import sys
+from collections import namedtuple
+
+from create_birthday_calendar import event_identity, iter_dates
+from external_sort import DEFAULT_MEMORY_BUDGET, external_sort, parse_size, record_size
+from validation import ValidationReport
+
+# Estimated bytes a dict entry costs beyond its key and value
+DICT_ENTRY_SIZE = 50
+
+# One difference between two exports. key is (identity, number): the event
+# identity (see event_identity) and its number among repeated identities, in
+# file order. old and new are the dates, None for added or removed events.
+Change = namedtuple("Change", ["status", "key", "old", "new"])
+
+
+def iter_keyed_dates(csv_file, report=None, memory_budget=None):
+    """Yield ((identity, number), date) for every valid date of an export.
+
+    Dates are ISO 8601, as "--MM-DD" when the year is unknown, so the value
+    compared is exactly what the export says. Repeated identities are
+    numbered in file order, as for event UIDs. With a memory_budget, the
+    dates come sorted by key, sorted on disk if they do not fit.
+    """
+    dates = (
+        (event_identity(entry[0], entry[4], entry[5]), row, iso_date(entry))
+        for row, entry in enumerate(iter_dates(csv_file, report))
+    )
+    if memory_budget is None:
+        counts = {}
+        for identity, _, value in dates:
+            count = counts[identity] = counts.get(identity, 0) + 1
+            yield (identity, count), value
+        return
+
+    previous = None
+    count = 0
+    by_key = external_sort(dates, lambda date: date[:2], memory_budget)
+    for identity, _, value in by_key:
+        count = count + 1 if identity == previous else 1
+        previous = identity
+        yield (identity, count), value
+
+
+def iso_date(entry):
+    """Return the date of an iter_dates entry as the export wrote it."""
+    value = entry[1].isoformat()
+    return value if entry[2] else f"--{value[5:]}"
+
+
+def build_table(csv_file, report, memory_budget):
+    """Return the dates of an export by key, or None if over memory_budget."""
+    table = {}
+    size = 0
+    for key, value in iter_keyed_dates(csv_file, report):
+        table[key] = value
+        # An entry in the table, and one in the counts of repeated identities
+        size += record_size(key) + sys.getsizeof(value) + 2 * DICT_ENTRY_SIZE
+        if size > memory_budget:
+            return None
+    return table
+
+
+def hash_join(table, csv_file, report):
+    """Yield the Changes from the dates in table to those of an export."""
+    for key, value in iter_keyed_dates(csv_file, report):
+        old = table.pop(key, None)
+        if old is None:
+            yield Change("added", key, None, value)
+        elif old != value:
+            yield Change("changed", key, old, value)
+    for key, old in table.items():
+        yield Change("removed", key, old, None)
+
+
+def merge_join(old_dates, new_dates):
+    """Yield the Changes between two streams of (key, date) sorted by key."""
+    old = next(old_dates, None)
+    new = next(new_dates, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and old[0] < new[0]):
+            yield Change("removed", old[0], old[1], None)
+            old = next(old_dates, None)
+        elif old is None or new[0] < old[0]:
+            yield Change("added", new[0], None, new[1])
+            new = next(new_dates, None)
+        else:
+            if old[1] != new[1]:
+                yield Change("changed", new[0], old[1], new[1])
+            old = next(old_dates, None)
+            new = next(new_dates, None)
+
+
+def diff_exports(
+    old_file,
+    new_file,
+    memory_budget=DEFAULT_MEMORY_BUDGET,
+    sort_merge=False,
+    reports=None,
+):
+    """Compare the dates of two exports, returning (method, iterator of Changes).
+
+    Events are matched by key (see iter_keyed_dates) in linear time with a
+    hash join: the old export's dates are loaded into a table, and the new
+    export is streamed against it. If the table would outgrow memory_budget
+    (or with sort_merge), both exports are sorted by key on disk instead,
+    each within half the budget, and merged. method is "hash join" or
+    "sort-merge". The changes come in new export order then old export order
+    for removed events with a hash join, in key order with sort-merge.
+    reports, a pair of ValidationReports, record the rows skipped.
+    """
+    old_report, new_report = reports or (ValidationReport(), ValidationReport())
+    if not sort_merge:
+        table = build_table(old_file, old_report, memory_budget)
+        if table is not None:
+            return "hash join", hash_join(table, new_file, new_report)
+        # The old export is read again: do not count its skipped rows twice
+        old_report.errors.clear()
+        old_report.valid = 0
+
+    budget = memory_budget // 2
+    changes = merge_join(
+        iter_keyed_dates(old_file, old_report, budget),
+        iter_keyed_dates(new_file, new_report, budget),
+    )
+    return "sort-merge", changes
+
+
+def describe(change):
+    """Return the line describing a Change."""
+    (identity, number), old, new = change.key, change.old, change.new
+    name, _, event = identity.partition("\n")
+    kind, _, occasion = event.partition("\n")
+    label = name if number == 1 else f"{name} (#{number})"
+    label += f" [{occasion or kind}]" if event else ""
+    if change.status == "added":
+        return f"+ {label}: {new}"
+    if change.status == "removed":
+        return f"- {label}: {old}"
+    return f"~ {label}: {old} -> {new}"
+
+
+def main(argv=None, prog=None):
+    """Run the command line interface."""
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Show the birthdays that changed between two exports"
+    )
+    parser.add_argument("old_file")
+    parser.add_argument("new_file", nargs="?", default="export.csv")
+    parser.add_argument(
+        "--memory-budget",
+        default="64M",
+        help="Memory for the hash join before falling back to sorting on disk",
+    )
+    parser.add_argument(
+        "--sort-merge",
+        action="store_true",
+        help="Always sort both exports on disk and merge them",
+    )
+    args = parser.parse_args(argv)
+
+    reports = ValidationReport(), ValidationReport()
+    method, changes = diff_exports(
+        args.old_file,
+        args.new_file,
+        parse_size(args.memory_budget),
+        args.sort_merge,
+        reports,
+    )
+    counts = {"added": 0, "removed": 0, "changed": 0}
+    for change in changes:
+        counts[change.status] += 1
+        print(describe(change))
+
+    print(
+        f"{counts['added']} added, {counts['removed']} removed, "
+        f"{counts['changed']} changed ({method})"
+    )
+    for csv_file, report in zip((args.old_file, args.new_file), reports):
+        if report.errors:
+            skipped = len(report.errors)
+            print(f"Skipped {skipped} unreadable dates or rows in {csv_file}")
+    if any(counts.values()):
+        parser.exit(1)
+
+
+if __name__ == "__main__":
+    main()
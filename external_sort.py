@@ -0,0 +1,103 @@
+import heapq
+import os
+import pickle
+import sys
+import tempfile
+from operator import itemgetter
+
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+# Maximum number of runs merged at once, to stay well below open file limits
+MAX_FAN_IN = 64
+
+SIZE_SUFFIXES = {"K": 1024, "M": 1024**2, "G": 1024**3}
+
+
+def parse_size(size):
+    """Parse a size such as 512K, 64M or 1G into bytes."""
+    size = size.strip().upper().removesuffix("B")
+    if size[-1:] in SIZE_SUFFIXES:
+        return int(float(size[:-1]) * SIZE_SUFFIXES[size[-1]])
+    return int(size)
+
+
+def record_size(record):
+    """Estimate the memory held by a tuple record and its fields.
+
+    Fields that are tuples themselves are measured the same way, so nested
+    records are not underestimated.
+    """
+    size = sys.getsizeof(record) + 8
+    for field in record:
+        if isinstance(field, tuple):
+            size += record_size(field)
+        else:
+            size += sys.getsizeof(field)
+    return size
+
+
+def write_run(records, directory):
+    """Write records to a new temporary run file and return its path."""
+    fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(fd, "wb") as file:
+        for record in records:
+            file.write(pickle.dumps(record, pickle.HIGHEST_PROTOCOL))
+    return path
+
+
+def read_run(path):
+    """Yield the records of a run file one at a time."""
+    with open(path, "rb") as file:
+        while True:
+            try:
+                yield pickle.load(file)
+            except EOFError:
+                return
+
+
+def external_sort(
+    records, key, memory_budget=DEFAULT_MEMORY_BUDGET, temp_dir=None, fan_in=MAX_FAN_IN
+):
+    """Yield records sorted by key while holding about memory_budget bytes at most.
+
+    Records are buffered with their sort keys, which count towards the
+    budget too, until the budget is reached; the buffer is then sorted and
+    spilled to a temporary file as a run. Runs are combined with a k-way
+    merge (in several passes if there are more than fan_in of them), so only
+    one record per run is held in memory while merging.
+    """
+    buffer = []
+    buffered_size = 0
+    runs = []
+    by_key = itemgetter(0)
+
+    with tempfile.TemporaryDirectory(dir=temp_dir) as directory:
+        for record in records:
+            keyed = (key(record), record)
+            buffer.append(keyed)
+            buffered_size += record_size(keyed)
+            if buffered_size >= memory_budget:
+                buffer.sort(key=by_key)
+                runs.append(write_run((record for _, record in buffer), directory))
+                buffer = []
+                buffered_size = 0
+
+        buffer.sort(key=by_key)
+        if not runs:
+            # Everything fitted in the budget: no need to touch the disk
+            for _, record in buffer:
+                yield record
+            return
+
+        if buffer:
+            runs.append(write_run((record for _, record in buffer), directory))
+            buffer = []
+
+        while len(runs) > fan_in:
+            group, runs = runs[:fan_in], runs[fan_in:]
+            merged = heapq.merge(*(read_run(path) for path in group), key=key)
+            runs.append(write_run(merged, directory))
+            for path in group:
+                os.unlink(path)
+
+        yield from heapq.merge(*(read_run(path) for path in runs), key=key)
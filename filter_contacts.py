@@ -1,34 +1,227 @@
+import argparse
 import csv
+import io
 import os
 
+from checkpoint import (
+    CHECKPOINT_EVERY,
+    Checkpoint,
+    CheckpointMismatchError,
+    checkpoint_path,
+)
 
-def filter_contacts_with_birthdays(input_file, output_file):
-    """Filter Google Contacts export to keep only those with birthdays assigned."""
-    contacts_with_birthdays = []
+CHUNK_SIZE = 1 << 20
+
+
+def read_csv_header(file):
+    """Read and parse the header record from a binary CSV file."""
+    lines = [file.readline()]
+    # Keep reading while a quoted header cell spans several lines
+    while ends_in_quoted_field(b"".join(lines)) and lines[-1]:
+        lines.append(file.readline())
+    return next(parse_csv_records(b"".join(lines)))
+
+
+def ends_in_quoted_field(line, quoted=False):
+    """Tell whether a CSV line ends inside a quoted field, as csv.reader reads it.
+
+    quoted says whether the line starts inside one. A quote only opens a
+    quoted field at the start of a field; anywhere else in an unquoted field,
+    like the inch mark of 5" screen, it is an ordinary character.
+    """
+    position = 0
+    while True:
+        if quoted:
+            end = line.find(b'"', position)
+            if end < 0:
+                return True
+            if line[end + 1 : end + 2] == b'"':
+                # An escaped quote inside the field
+                position = end + 2
+                continue
+            quoted = False
+            position = end + 1
+        quote = line.find(b'"', position)
+        while quote > 0 and line[quote - 1 : quote] != b",":
+            quote = line.find(b'"', quote + 1)
+        if quote < 0:
+            return False
+        quoted = True
+        position = quote + 1
+
+
+def parse_csv_records(data):
+    """Parse raw CSV bytes with the real CSV parser, as text-mode reading would."""
+    return csv.reader(io.StringIO(data.decode("utf-8"), newline=None))
+
+
+def prefilter_records(file, index, chunk_size=CHUNK_SIZE, progress=None):
+    """Yield (rejected, candidates) for each chunk of a binary CSV file.
+
+    Records whose field at index is certainly empty are only counted as
+    rejected, without being decoded or fully split. Everything else (records
+    that may survive, or whose field is hidden behind quoting or stray
+    carriage returns) is returned as raw bytes for the real CSV parser.
+    Given a progress dict, progress["offset"] is set to the byte offset
+    where the records yielded so far end.
+    """
+    # Padding turns rows too short to have the field into empty-field rows
+    padding = b"," * (index + 1)
+    maxsplit = index + 1
+    open_record = None
+    keep_open_record = False
+    tail = b""
+
+    while True:
+        chunk = file.read(chunk_size)
+        data = tail + chunk
+        lines = data.split(b"\n") if data else []
+        tail = lines.pop() if chunk else b""
+        lone_cr = data.count(b"\r") != data.count(b"\r\n")
+
+        if open_record is None and not lone_cr and b'"' not in data:
+            # Quote-free chunk: every line is exactly one record
+            candidates = [
+                line
+                for line in lines
+                if (line + padding).split(b",", maxsplit)[index].strip()
+            ]
+            if progress is not None:
+                progress["offset"] = file.tell() - len(tail)
+            yield len(lines) - len(candidates), candidates
+            if not chunk:
+                break
+            continue
+
+        rejected = 0
+        candidates = []
+        for line in lines:
+            if open_record is not None:
+                # Inside a quoted field spanning lines until the quotes balance
+                open_record.append(line)
+                if lone_cr and b"\r" in line[:-1]:
+                    keep_open_record = True
+                if not ends_in_quoted_field(line, quoted=True):
+                    if keep_open_record:
+                        candidates.append(b"\n".join(open_record))
+                    else:
+                        rejected += 1
+                    open_record = None
+                continue
+
+            quote = line.find(b'"')
+            if lone_cr and b"\r" in line[:-1]:
+                # Text-mode reading would split this line into several rows
+                keep = True
+            elif quote < 0:
+                keep = bool((line + padding).split(b",", maxsplit)[index].strip())
+            elif line.count(b",", 0, quote) > index:
+                # Quoting only starts after the field, so it is still plain
+                keep = bool(line[:quote].split(b",", maxsplit)[index].strip())
+            else:
+                keep = True
+
+            if quote >= 0 and ends_in_quoted_field(line):
+                open_record = [line]
+                keep_open_record = keep
+            elif keep:
+                candidates.append(line)
+            else:
+                rejected += 1
+
+        if progress is not None:
+            pending = len(tail)
+            if open_record is not None:
+                # The open record's lines, each but the last one of the file
+                # followed by a newline
+                pending += len(b"\n".join(open_record)) + bool(chunk)
+            progress["offset"] = file.tell() - pending
+        yield rejected, candidates
+        if not chunk:
+            break
+
+    if open_record is not None:
+        if progress is not None:
+            progress["offset"] = file.tell()
+        yield 0, [b"\n".join(open_record)]
+
+
+def filter_contacts_with_birthdays(
+    input_file, output_file, profiler=None, checkpoint=None
+):
+    """Filter Google Contacts export to keep only those with birthdays assigned.
+
+    Contacts are written out chunk by chunk as they are read. Given a
+    MemoryProfiler, memory is measured per phase (read, filter, write) and
+    reported at the end. Given a Checkpoint, output_file is the partial
+    output it saves, and an interrupted run can be resumed.
+    """
+    contacts_kept = 0
     total_contacts = 0
 
-    with open(input_file, "r", encoding="utf-8") as file:
-        reader = csv.reader(file)
-        header = next(reader)
+    if profiler is not None:
+        profiler.start()
+    try:
+        with open(input_file, "rb") as file:
+            header = read_csv_header(file)
+
+            # Find the birthday column index
+            birthday_index = header.index("Birthday")
+
+            options = {"encoding": "utf-8", "newline": ""}
+            resumed = checkpoint is not None and checkpoint.offset is not None
+            if checkpoint is None:
+                output = open(output_file, "w", **options)
+            else:
+                output = checkpoint.open_output(output_file, "w", **options)
+                total_contacts, contacts_kept = checkpoint.restored("counts", (0, 0))
+                checkpoint.track("counts", lambda: (total_contacts, contacts_kept))
+                if resumed:
+                    file.seek(checkpoint.offset)
 
-        # Find the birthday column index
-        birthday_index = header.index("Birthday")
+            with output:
+                writer = csv.writer(output)
+                # Keep the header
+                if not resumed:
+                    writer.writerow(header)
 
-        # Keep the header
-        contacts_with_birthdays.append(header)
+                # Most contacts have no birthday: count those without decoding them
+                progress = {}
+                chunks = prefilter_records(file, birthday_index, progress=progress)
+                if profiler is not None:
+                    chunks = profiler.iter_phase("read", chunks)
+                    profiler.switch("filter")
+                for rejected, candidates in chunks:
+                    total_contacts += rejected
+                    read = rejected + len(candidates)
+                    candidates.append(b"")
 
-        for row in reader:
-            total_contacts += 1
-            # Check if birthday field is not empty
-            if len(row) > birthday_index and row[birthday_index].strip():
-                contacts_with_birthdays.append(row)
+                    rows = parse_csv_records(b"\n".join(candidates))
+                    if profiler is not None:
+                        rows = profiler.iter_phase("read", rows)
+                    contacts_with_birthdays = []
+                    for row in rows:
+                        total_contacts += 1
+                        # Check if birthday field is not empty
+                        if len(row) > birthday_index and row[birthday_index].strip():
+                            contacts_with_birthdays.append(row)
 
-    # Write filtered contacts to output file
-    with open(output_file, "w", encoding="utf-8", newline="") as file:
-        writer = csv.writer(file)
-        writer.writerows(contacts_with_birthdays)
+                    # Write the chunk's contacts with birthdays
+                    if profiler is None:
+                        writer.writerows(contacts_with_birthdays)
+                    else:
+                        with profiler.phase("write"):
+                            writer.writerows(contacts_with_birthdays)
+                    contacts_kept += len(contacts_with_birthdays)
+                    if checkpoint is not None:
+                        checkpoint.reached(progress["offset"], read)
+        if checkpoint is not None:
+            checkpoint.remove()
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            profiler.print_report()
 
-    contacts_kept = len(contacts_with_birthdays) - 1  # Subtract header
     contacts_removed = total_contacts - contacts_kept
 
     print(f"Total contacts processed: {total_contacts}")
@@ -38,12 +231,87 @@ def filter_contacts_with_birthdays(input_file, output_file):
     return contacts_kept, contacts_removed
 
 
-if __name__ == "__main__":
-    input_file = "export.csv"
-    output_file = "export.csv"  # Overwrite the original file
+def main(argv=None, prog=None):
+    """Run the command line interface."""
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Remove contacts without birthdays"
+    )
+    parser.add_argument("input_file", nargs="?", default="export.csv")
+    parser.add_argument(
+        "--backup",
+        default="export_backup.csv",
+        help="Where the original export is moved before filtering",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        metavar="ROWS",
+        help=f"Save a checkpoint every ROWS rows (default {CHECKPOINT_EVERY} "
+        "with --resume)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run from its last checkpoint",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Report memory use per phase and the largest allocation sites",
+    )
+    parser.add_argument(
+        "--memory-ceiling",
+        metavar="SIZE",
+        help="Abort cleanly before the RSS reaches SIZE (e.g. 512M)",
+    )
+    args = parser.parse_args(argv)
+
+    profiler = None
+    ceiling_errors = ()
+    if args.profile_memory or args.memory_ceiling:
+        from external_sort import parse_size
+        from memory_profile import MemoryCeilingExceededError, MemoryProfiler
+
+        ceiling = parse_size(args.memory_ceiling) if args.memory_ceiling else None
+        profiler = MemoryProfiler(ceiling, trace=args.profile_memory)
+        ceiling_errors = MemoryCeilingExceededError
+
+    input_file = args.input_file
+    output_file = input_file  # Overwrite the original file
+    backup_file = args.backup
 
-    # Create backup first
-    backup_file = "export_backup.csv"
-    os.rename(input_file, backup_file)
+    checkpoint = None
+    checkpoint_file = checkpoint_path(output_file)
+    if os.path.exists(checkpoint_file) and not args.resume:
+        # The export is only partly filtered, and the original is the backup
+        parser.error(
+            f"an interrupted run left {checkpoint_file}: continue it with --resume"
+        )
+    if args.resume and os.path.exists(checkpoint_file):
+        print(f"Resuming the run filtering {backup_file}")
+    else:
+        # Create backup first
+        os.rename(input_file, backup_file)
+    if args.checkpoint_every or args.resume:
+        try:
+            checkpoint = Checkpoint(
+                checkpoint_file,
+                backup_file,
+                args.checkpoint_every or CHECKPOINT_EVERY,
+                resume=args.resume,
+            )
+        except CheckpointMismatchError as error:
+            parser.exit(1, f"Cannot resume: {error}\n")
 
-    filter_contacts_with_birthdays(backup_file, output_file)
+    try:
+        filter_contacts_with_birthdays(backup_file, output_file, profiler, checkpoint)
+    except ceiling_errors as error:
+        # Put the original export back in place of the partial output
+        os.replace(backup_file, input_file)
+        if checkpoint is not None:
+            checkpoint.remove()
+        parser.exit(1, f"Aborted: {error}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import os
+import re
+from contextlib import ExitStack
+
+from create_birthday_calendar import (
+    DEFAULT_TEMPLATES,
+    ICS_HEADER,
+    iter_birthday_events,
+    parse_labels,
+    render_event,
+)
+from event_templates import escape_text
+
+
+def calendar_file_name(label, used_names):
+    """Return a file name for a label's calendar that no other label uses."""
+    base = re.sub(r"[^\w\- ]", "_", label).strip() or "label"
+    name = f"{base}.ics"
+    count = 1
+    while name.lower() in used_names:
+        count += 1
+        name = f"{base}_{count}.ics"
+    used_names.add(name.lower())
+    return name
+
+
+def create_group_calendars(
+    csv_file,
+    output_dir,
+    include=None,
+    exclude=(),
+    templates=DEFAULT_TEMPLATES,
+):
+    """Create one birthday calendar per contact label from a single read.
+
+    Events are rendered once and streamed to the calendar of every label of
+    their contact as the export is read, so each calendar is written as it
+    goes instead of filtering the export once per label. Only labels in
+    include (all by default) and not in exclude get a calendar. Returns the
+    number of events per label.
+    """
+    include = None if include is None else set(include)
+    exclude = set(exclude)
+    os.makedirs(output_dir, exist_ok=True)
+
+    counts = {}
+    files = {}
+    used_names = set()
+    # Raw label values repeat a lot: parse and filter each distinct one once
+    label_cache = {}
+
+    with ExitStack() as stack:
+        for event in iter_birthday_events(csv_file):
+            labels = label_cache.get(event.labels)
+            if labels is None:
+                labels = label_cache[event.labels] = [
+                    label
+                    for label in parse_labels(event.labels)
+                    if (include is None or label in include) and label not in exclude
+                ]
+            if not labels:
+                continue
+
+            text = "\n" + "\n".join(render_event(event, templates=templates))
+            for label in labels:
+                file = files.get(label)
+                if file is None:
+                    path = os.path.join(
+                        output_dir, calendar_file_name(label, used_names)
+                    )
+                    file = files[label] = stack.enter_context(
+                        open(path, "w", encoding="utf-8")
+                    )
+                    file.write("\n".join(ICS_HEADER))
+                    file.write(f"\nX-WR-CALNAME:{escape_text(label)}")
+                    counts[label] = 0
+                file.write(text)
+                counts[label] += 1
+
+        for file in files.values():
+            file.write("\nEND:VCALENDAR")
+
+    for label, count in sorted(counts.items()):
+        print(f"{label}: {count} events -> {os.path.basename(files[label].name)}")
+    print(f"Created {len(counts)} label calendars in: {output_dir}")
+
+    return counts
@@ -0,0 +1,193 @@
+import os
+
+from create_birthday_calendar import (
+    DEFAULT_TEMPLATES,
+    ICS_HEADER,
+    SOURCE_HASH_PROPERTY,
+    iter_birthday_events,
+    render_event,
+)
+
+
+def iter_ics_components(file):
+    """Stream an ICS file as (uid, lines) per VEVENT and (None, [line]) otherwise.
+
+    Lines are returned exactly as read (still folded, without line endings), so
+    events can be written back untouched.
+    """
+    event = None
+    depth = 0
+
+    for raw_line in file:
+        line = raw_line.rstrip("\r\n")
+        if event is None:
+            if line.upper() == "BEGIN:VEVENT":
+                event, depth = [line], 1
+            else:
+                yield None, [line]
+            continue
+
+        event.append(line)
+        head = line[:6].upper()
+        if head == "BEGIN:":
+            depth += 1
+        elif head[:4] == "END:":
+            depth -= 1
+            if depth == 0:
+                yield property_value(event, "UID") or "", event
+                event = None
+
+    if event is not None:
+        yield property_value(event, "UID") or "", event
+
+
+def top_level_properties(lines):
+    """Yield (name, raw_lines) for each property of a VEVENT outside subcomponents."""
+    depth = 0
+    current = None
+
+    for line in lines[1:-1]:
+        if line[:1] in (" ", "\t"):
+            # Folded continuation of the previous property
+            if current is not None:
+                current[1].append(line)
+            continue
+        if current is not None:
+            yield current
+            current = None
+
+        name = line.split(":", 1)[0].split(";", 1)[0].upper()
+        if name == "BEGIN":
+            depth += 1
+        elif name == "END":
+            depth -= 1
+        elif depth == 0:
+            current = (name, [line])
+
+    if current is not None:
+        yield current
+
+
+def property_value(lines, name):
+    """Return the unfolded value of a top-level property, or None if absent."""
+    size = len(name) + 1
+    depth = 0
+
+    for index in range(1, len(lines) - 1):
+        line = lines[index]
+        head = line[:size].upper()
+        if head[:-1] == name and head[-1:] in (":", ";"):
+            if depth:
+                continue
+            unfolded = [line]
+            for continuation in lines[index + 1 : -1]:
+                if continuation[:1] not in (" ", "\t"):
+                    break
+                unfolded.append(continuation[1:])
+            return "".join(unfolded).split(":", 1)[1].strip()
+        head = line[:6].upper()
+        if head == "BEGIN:":
+            depth += 1
+        elif head[:4] == "END:":
+            depth -= 1
+
+    return None
+
+
+def update_event(lines, event, templates=DEFAULT_TEMPLATES):
+    """Re-render an event, keeping custom properties added to the old copy."""
+    rendered = render_event(event, templates=templates)
+    generated = {name for name, _ in top_level_properties(rendered)}
+    custom = [
+        raw_line
+        for name, raw_lines in top_level_properties(lines)
+        if name not in generated
+        for raw_line in raw_lines
+    ]
+    return rendered[:-1] + custom + rendered[-1:]
+
+
+def merge_birthday_ics(
+    csv_file, existing_file, output_file, templates=DEFAULT_TEMPLATES
+):
+    """Merge freshly generated birthday events into an existing ICS calendar.
+
+    Events are matched by UID in a single pass over the existing calendar:
+    events whose contact is unchanged are copied byte for byte (keeping any
+    edits), changed contacts are re-rendered with their custom properties
+    kept, removed contacts are dropped, foreign events are left alone and new
+    contacts are appended at the end. Our events without a source hash (as
+    the compact and minimal profiles write them) are re-rendered in full.
+    """
+    # Contacts still to be written, keyed by their stable UID
+    pending = {event.uid: event for event in iter_birthday_events(csv_file)}
+    # Events written before UIDs were stable can only be recognized by summary
+    legacy_uids = {}
+    for event in pending.values():
+        legacy_uids.setdefault(f"🎂 {event.full_name}'s Birthday", event.uid)
+    counts = {"kept": 0, "updated": 0, "added": 0, "removed": 0}
+    temp_file = f"{output_file}.tmp"
+
+    with (
+        open(existing_file, "r", encoding="utf-8") as source,
+        open(temp_file, "w", encoding="utf-8") as target,
+    ):
+        ics_content = []
+        closed = False
+
+        for uid, lines in iter_ics_components(source):
+            if uid is None and lines[0].upper() == "END:VCALENDAR":
+                for event in pending.values():
+                    ics_content.extend(render_event(event, templates=templates))
+                    counts["added"] += 1
+                pending = {}
+                closed = True
+            elif uid is not None:
+                source_hash = property_value(lines, SOURCE_HASH_PROPERTY)
+                if source_hash is None:
+                    # Foreign event, unless it is one of ours without the hash:
+                    # from a compact calendar, or from an older run
+                    event = pending.pop(uid, None)
+                    if event is None:
+                        summary = property_value(lines, "SUMMARY")
+                        event = pending.pop(legacy_uids.get(summary), None)
+                    if event is not None:
+                        lines = update_event(lines, event, templates)
+                        counts["updated"] += 1
+                else:
+                    event = pending.pop(uid, None)
+                    if event is None:
+                        counts["removed"] += 1
+                        continue
+                    if source_hash == event.source_hash:
+                        counts["kept"] += 1
+                    else:
+                        lines = update_event(lines, event, templates)
+                        counts["updated"] += 1
+            ics_content.extend(lines)
+
+            # Flush regularly so memory does not grow with the calendar size
+            if len(ics_content) >= 10000:
+                target.write("\n".join(ics_content) + "\n")
+                ics_content = []
+
+        if not closed:
+            if not ics_content and target.tell() == 0:
+                ics_content.extend(ICS_HEADER)
+            for event in pending.values():
+                ics_content.extend(render_event(event, templates=templates))
+                counts["added"] += 1
+            ics_content.append("END:VCALENDAR")
+
+        target.write("\n".join(ics_content))
+
+    os.replace(temp_file, output_file)
+
+    print(
+        f"Merged birthday calendar: {counts['kept']} kept, "
+        f"{counts['updated']} updated, {counts['added']} added, "
+        f"{counts['removed']} removed"
+    )
+    print(f"Calendar saved as: {output_file}")
+
+    return counts
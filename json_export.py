@@ -0,0 +1,282 @@
+import argparse
+import contextlib
+import functools
+import json
+import os
+import re
+import sys
+import uuid
+
+from create_birthday_calendar import (
+    ICS_HEADER,
+    PROFILES,
+    UID_NAMESPACE,
+    event_identity,
+    iter_birthday_events,
+    iter_contact_keys,
+    iter_dates,
+    parse_labels,
+    render_event,
+)
+from event_templates import DEFAULT_TEMPLATES, LOCALES, load_templates
+
+# Write buffer of the output file
+OUTPUT_BUFFER = 1 << 20
+
+# Escaped characters of ICS TEXT values (RFC 5545, section 3.3.11)
+TEXT_ESCAPE = re.compile(r"\\([\\;,nN])")
+
+# jCal value types of the properties render_event writes, other than text
+# (RFC 7265, section 3.6); X- properties are of unknown type (section 5)
+JCAL_TYPES = {
+    "dtstart": "date",
+    "dtend": "date",
+    "dtstamp": "date-time",
+    "rrule": "recur",
+    "trigger": "duration",
+}
+
+
+def iter_contact_records(csv_file):
+    """Yield one JSON-ready dict per valid birthday and other dated event.
+
+    The dates come from the same single pass over the export as the calendar,
+    and the uid of each record is the UID of its calendar event. Dates are
+    ISO 8601, as "--MM-DD" when the year is unknown; groups are the contact's
+    labels.
+    """
+    entries = (
+        (event_identity(entry[0], entry[4], entry[5]), entry)
+        for entry in iter_dates(csv_file, with_names=True)
+    )
+    for key, (_, entry) in iter_contact_keys(entries):
+        full_name, event_date, year_known, labels, kind, occasion, names = entry
+        first_name, middle_name, last_name = names
+        value = event_date.isoformat()
+        yield {
+            "uid": str(uuid.uuid5(UID_NAMESPACE, key)),
+            "name": full_name,
+            "first_name": first_name,
+            "middle_name": middle_name,
+            "last_name": last_name,
+            "kind": kind,
+            "occasion": occasion,
+            "date": value if year_known else f"--{value[5:]}",
+            "year_known": year_known,
+            "groups": parse_labels(labels),
+        }
+
+
+def unescape_text(value):
+    """Undo escape_text: return the plain text of an ICS TEXT value."""
+    return TEXT_ESCAPE.sub(lambda match: "\n" if match[1] in "nN" else match[1], value)
+
+
+@functools.lru_cache(maxsize=None)
+def jcal_head(head):
+    """Return (name, parameters, value type) of a property from its name part.
+
+    Only a handful of distinct name parts occur, so they are parsed once.
+    """
+    name, *params = head.lower().split(";")
+    parameters = dict(param.split("=", 1) for param in params)
+    value_type = parameters.pop("value", JCAL_TYPES.get(name, "text")).lower()
+    if name.startswith("x-"):
+        value_type = "unknown"
+    return name, parameters, value_type
+
+
+def jcal_property(line):
+    """Return the jCal form of one unfolded ICS content line.
+
+    Only the value types render_event writes are converted: dates, UTC
+    date-times, a yearly rule, durations and text.
+    """
+    head, _, value = line.partition(":")
+    name, parameters, value_type = jcal_head(head)
+    if value_type == "text":
+        if "\\" in value:
+            value = unescape_text(value)
+    elif value_type == "date":
+        value = f"{value[:4]}-{value[4:6]}-{value[6:8]}"
+    elif value_type == "date-time":
+        value = (
+            f"{value[:4]}-{value[4:6]}-{value[6:8]}"
+            f"T{value[9:11]}:{value[11:13]}:{value[13:]}"
+        )
+    elif value_type == "recur":
+        value = {
+            part.lower(): setting
+            for part, setting in (rule.split("=", 1) for rule in value.split(";"))
+        }
+    return [name, parameters, value_type, value]
+
+
+def jcal_component(lines):
+    """Return the jCal form of the ICS lines of one component and its children.
+
+    A component is [name, properties, subcomponents] (RFC 7265, section 3.3).
+    """
+    stack = []
+    component = None
+    for line in lines:
+        if line[:6] == "BEGIN:":
+            stack.append([line[6:].lower(), [], []])
+        elif line[:4] == "END:":
+            component = stack.pop()
+            if stack:
+                stack[-1][2].append(component)
+        else:
+            stack[-1][1].append(jcal_property(line))
+    return component
+
+
+def iter_jcal_events(
+    csv_file, templates=DEFAULT_TEMPLATES, profile="full", alarms=True, dtstamp=None
+):
+    """Yield the jCal vevent of every event, rendered as for the calendar."""
+    for event in iter_birthday_events(csv_file):
+        yield jcal_component(
+            render_event(
+                event,
+                templates=templates,
+                profile=profile,
+                alarms=alarms,
+                dtstamp=dtstamp,
+            )
+        )
+
+
+def write_stream(output_file, chunks):
+    """Stream text chunks to output_file, or to stdout for "-".
+
+    Anything else printed meanwhile goes to stderr when streaming to stdout. A
+    file is written under a temporary name and only replaces output_file
+    once complete.
+    """
+    if output_file == "-":
+        stdout = sys.stdout
+        # Keep the summary of skipped rows out of the data
+        with contextlib.redirect_stdout(sys.stderr):
+            stdout.writelines(chunks)
+        stdout.flush()
+        return
+    temp_file = f"{output_file}.tmp"
+    try:
+        with open(
+            temp_file, "w", encoding="utf-8", newline="", buffering=OUTPUT_BUFFER
+        ) as file:
+            file.writelines(chunks)
+    except BaseException:
+        if os.path.exists(temp_file):
+            os.unlink(temp_file)
+        raise
+    os.replace(temp_file, output_file)
+
+
+def export_json(
+    csv_file,
+    output_file,
+    jcal=False,
+    templates=DEFAULT_TEMPLATES,
+    profile="full",
+    alarms=True,
+    dtstamp=None,
+):
+    """Write the birthday data of an export as NDJSON, or as a jCal document.
+
+    NDJSON has one object per event (see iter_contact_records). jCal (RFC
+    7265) holds the same events as the calendar, with the same templates and
+    profile. Either way records are written as they are read, so memory does
+    not grow with the export beyond the names the calendar tracks too.
+    Returns the number of records written.
+    """
+    count = 0
+
+    def ndjson_lines():
+        nonlocal count
+        for record in iter_contact_records(csv_file):
+            count += 1
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+
+    def jcal_chunks():
+        nonlocal count
+        calendar = jcal_component([*ICS_HEADER, "END:VCALENDAR"])
+        # Everything before the closing brackets of the subcomponent list
+        yield json.dumps(calendar, ensure_ascii=False)[:-2]
+        events = iter_jcal_events(csv_file, templates, profile, alarms, dtstamp)
+        for event in events:
+            yield ("," if count else "") + "\n" + json.dumps(event, ensure_ascii=False)
+            count += 1
+        yield "\n]]\n"
+
+    write_stream(output_file, jcal_chunks() if jcal else ndjson_lines())
+    if output_file != "-":
+        print(f"Exported {count} events to {output_file}")
+    return count
+
+
+def main(argv=None, prog=None):
+    """Run the command line interface."""
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Write the birthday data as NDJSON or jCal"
+    )
+    parser.add_argument("csv_file", nargs="?", default="export.csv")
+    parser.add_argument(
+        "output_file",
+        nargs="?",
+        help="Output file, - for stdout (birthdays.ndjson, or birthdays.json "
+        "with --jcal)",
+    )
+    parser.add_argument(
+        "--jcal",
+        action="store_true",
+        help="Write the calendar events as one jCal (RFC 7265) document",
+    )
+    parser.add_argument(
+        "--output-profile",
+        default="full",
+        choices=PROFILES,
+        help="With --jcal, the properties and reminders of each event",
+    )
+    parser.add_argument(
+        "--no-alarms",
+        action="store_true",
+        help="With --jcal and --output-profile compact, leave out the reminder",
+    )
+    parser.add_argument(
+        "--dtstamp",
+        metavar="STAMP",
+        help="With --jcal, give every event this UTC DTSTAMP (e.g. 20260101T000000Z)",
+    )
+    parser.add_argument(
+        "--locale",
+        default="en",
+        choices=sorted(LOCALES),
+        help="With --jcal, language of the event texts",
+    )
+    parser.add_argument(
+        "--templates",
+        metavar="FILE",
+        help="With --jcal, JSON file overriding some of the locale's event texts",
+    )
+    args = parser.parse_args(argv)
+    if args.dtstamp and not re.fullmatch(r"\d{8}T\d{6}Z", args.dtstamp):
+        parser.error(f"--dtstamp must look like 20260101T000000Z, not {args.dtstamp}")
+    output_file = args.output_file
+    if output_file is None:
+        output_file = "birthdays.json" if args.jcal else "birthdays.ndjson"
+
+    export_json(
+        args.csv_file,
+        output_file,
+        args.jcal,
+        load_templates(args.locale, args.templates),
+        args.output_profile,
+        not args.no_alarms,
+        args.dtstamp,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import http.client
+import threading
+from urllib.parse import urlsplit
+
+# Network errors after which a request is retried once on a fresh connection
+CONNECTION_ERRORS = (http.client.HTTPException, OSError)
+
+
+class KeepAliveClient:
+    """Sends HTTP requests to one server over a keep-alive connection per thread.
+
+    Concurrent requests from a pool of threads reuse a handful of connections
+    however many are sent. headers are sent with every request.
+    """
+
+    def __init__(self, url, timeout=30):
+        parts = urlsplit(url)
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path
+        self.timeout = timeout
+        self.headers = {}
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def connection(self, fresh=False):
+        """Return this thread's connection, opening a new one if needed."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and fresh:
+            connection.close()
+            connection = None
+        if connection is None:
+            if self.https:
+                connection_class = http.client.HTTPSConnection
+            else:
+                connection_class = http.client.HTTPConnection
+            connection = connection_class(self.host, self.port, timeout=self.timeout)
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def send(self, method, path, body=None, headers=()):
+        """Send one request and return (response, body).
+
+        The response is read completely so the connection can be reused. A
+        request failing on a reused connection, which the server may have
+        closed in the meantime, is retried once on a new one.
+        """
+        headers = {**self.headers, **dict(headers)}
+        for attempt in range(2):
+            connection = self.connection(fresh=attempt > 0)
+            try:
+                connection.request(method, path, body, headers)
+                response = connection.getresponse()
+                return response, response.read()
+            except CONNECTION_ERRORS:
+                connection.close()
+                if attempt:
+                    raise
+
+    def close(self):
+        """Close every connection opened by the client."""
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
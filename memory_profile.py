@@ -0,0 +1,218 @@
+import os
+import sys
+import tracemalloc
+from contextlib import contextmanager
+
+# Share of the ceiling at which processing is aborted, leaving headroom for
+# the memory allocated between two checks
+ABORT_FRACTION = 0.9
+
+# Phase switches between two RSS samples and ceiling checks
+CHECK_EVERY = 1000
+
+# A new snapshot of allocation sites is only taken past this growth
+SNAPSHOT_GROWTH = 1.5
+
+
+class MemoryCeilingExceededError(MemoryError):
+    """Memory use came close to the configured ceiling."""
+
+    def __init__(self, phase, used, ceiling):
+        super().__init__(
+            f"memory use reached {format_size(used)} during {phase}, "
+            f"close to the {format_size(ceiling)} ceiling"
+        )
+        self.phase = phase
+        self.used = used
+        self.ceiling = ceiling
+
+
+def format_size(size):
+    """Format a number of bytes as MiB, or KiB below one MiB."""
+    if size < 1024**2:
+        return f"{size / 1024:.1f} KiB"
+    return f"{size / 1024**2:.1f} MiB"
+
+
+def current_rss():
+    """Return the resident set size of this process in bytes, or None.
+
+    Reads /proc where available. Elsewhere the peak RSS from getrusage is the
+    closest measure, and None is returned when neither exists.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class PhaseStats:
+    """Memory measured while a pipeline phase was running."""
+
+    def __init__(self):
+        self.traced_peak = 0
+        self.rss_peak = 0
+        self.samples = 0
+
+
+class MemoryProfiler:
+    """Attributes memory use to the phases of a pipeline.
+
+    RSS is sampled every CHECK_EVERY phase switches, the first time a phase
+    is left and at the end of with blocks. With trace, every allocation seen
+    by tracemalloc is also charged to the phase running when it happened, so
+    a phase's traced peak is the largest traced memory seen while it ran,
+    even when streaming phases take turns item by item. Tracing makes
+    allocations several times slower, so leave it off when only enforcing a
+    ceiling. With a ceiling, MemoryCeilingExceededError is raised once RSS
+    (or traced memory, without RSS) reaches ABORT_FRACTION of it.
+    """
+
+    def __init__(self, ceiling=None, trace=True, top=10, check_every=CHECK_EVERY):
+        self.ceiling = ceiling
+        self.trace = trace
+        self.top = top
+        self.check_every = check_every
+        self.phases = {}
+        self.current = None
+        self.switches = 0
+        self.snapshot = None
+        self.snapshot_size = 0
+        self.started_tracing = False
+        self.exceeded = False
+
+    def start(self):
+        """Start tracing allocations, if enabled."""
+        if self.trace:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.started_tracing = True
+            tracemalloc.reset_peak()
+        return self
+
+    def stop(self):
+        """Stop tracing allocations, charging what is left to the current phase."""
+        previous = self.switch(None)
+        if previous is not None:
+            self.sample(previous, self.traced(), check=False)
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def switch(self, phase):
+        """Charge memory since the last switch to the current phase, then change it.
+
+        Returns the phase that was running.
+        """
+        previous = self.current
+        self.current = phase
+        if phase is not None:
+            self.phases.setdefault(phase, PhaseStats())
+        current = 0
+        if previous is not None:
+            stats = self.phases[previous]
+            if self.trace:
+                current, peak = tracemalloc.get_traced_memory()
+                stats.traced_peak = max(stats.traced_peak, peak)
+            self.switches += 1
+            if not stats.samples or self.switches % self.check_every == 0:
+                self.sample(previous, current)
+        if self.trace:
+            tracemalloc.reset_peak()
+        return previous
+
+    def traced(self):
+        """Return the memory currently traced, 0 without tracing."""
+        return tracemalloc.get_traced_memory()[0] if self.trace else 0
+
+    def sample(self, phase, traced, check=True):
+        """Record the RSS of a phase and enforce the ceiling."""
+        stats = self.phases[phase]
+        rss = current_rss()
+        stats.samples += 1
+        if rss is not None:
+            stats.rss_peak = max(stats.rss_peak, rss)
+
+        if self.trace and traced > self.snapshot_size * SNAPSHOT_GROWTH:
+            # Keep the allocation sites of the largest traced memory seen
+            self.snapshot = tracemalloc.take_snapshot()
+            self.snapshot_size = traced
+
+        used = rss if rss is not None or not self.trace else traced
+        if check and self.ceiling is not None and used is not None:
+            if used >= self.ceiling * ABORT_FRACTION and not self.exceeded:
+                # Only raise once, not again while the pipeline unwinds
+                self.exceeded = True
+                raise MemoryCeilingExceededError(phase, used, self.ceiling)
+
+    @contextmanager
+    def phase(self, name):
+        """Charge the memory allocated in the with block to a phase."""
+        previous = self.switch(name)
+        try:
+            yield
+        finally:
+            self.switch(previous)
+            self.sample(name, self.traced())
+
+    def iter_phase(self, name, iterable):
+        """Yield the items of iterable, charging the work producing them to a phase."""
+        iterator = iter(iterable)
+        while True:
+            previous = self.switch(name)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.switch(previous)
+            yield item
+
+    def allocation_sites(self):
+        """Return (location, size, count) of the largest allocation sites."""
+        if self.snapshot is None:
+            return []
+        snapshot = self.snapshot.filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            ]
+        )
+        sites = []
+        for stat in snapshot.statistics("lineno")[: self.top]:
+            frame = stat.traceback[0]
+            sites.append((f"{frame.filename}:{frame.lineno}", stat.size, stat.count))
+        return sites
+
+    def report_lines(self):
+        """Return the lines of the memory report."""
+        lines = ["Memory by phase (peak traced / peak RSS):"]
+        for name, stats in self.phases.items():
+            traced = format_size(stats.traced_peak) if self.trace else "n/a"
+            rss = format_size(stats.rss_peak) if stats.rss_peak else "n/a"
+            lines.append(f"  {name:<8} {traced:>12} {rss:>12}")
+        sites = self.allocation_sites()
+        if sites:
+            peak = format_size(self.snapshot_size)
+            lines.append(f"Largest allocation sites at {peak} traced:")
+            for location, size, count in sites:
+                lines.append(f"  {format_size(size):>12} {count:>9} blocks {location}")
+        return lines
+
+    def print_report(self):
+        """Print the memory report."""
+        print("\n".join(self.report_lines()))
@@ -0,0 +1,317 @@
+import argparse
+import csv
+import json
+import os
+import queue
+import threading
+from urllib.parse import urlencode
+
+from keep_alive import KeepAliveClient
+
+DEFAULT_ENDPOINT = "https://people.googleapis.com"
+DEFAULT_STATE_FILE = ".people-sync.json"
+CONNECTIONS_PATH = "/v1/people/me/connections"
+GROUPS_PATH = "/v1/contactGroups"
+
+# Columns written to the export; the pipeline reads them by name
+FIELDS = [
+    "First Name",
+    "Middle Name",
+    "Last Name",
+    "Birthday",
+    "Labels",
+    "Resource Name",
+]
+
+
+class PeopleAPIError(Exception):
+    """The People API answered a request with an error status."""
+
+    def __init__(self, status, message):
+        super().__init__(f"{status} {message}")
+        self.status = status
+
+
+class PeopleClient(KeepAliveClient):
+    """GETs JSON from a People-API-compatible endpoint.
+
+    Requests share a keep-alive connection per thread (see KeepAliveClient).
+    """
+
+    def __init__(self, endpoint=DEFAULT_ENDPOINT, token=None, timeout=30):
+        super().__init__(endpoint, timeout)
+        self.path = self.path.rstrip("/")
+        self.headers["Accept"] = "application/json"
+        if token:
+            self.headers["Authorization"] = f"Bearer {token}"
+
+    def get(self, path, params):
+        """GET a resource and return its decoded JSON body."""
+        url = f"{self.path}{path}?{urlencode(params)}"
+        response, body = self.send("GET", url)
+        if response.status != 200:
+            raise PeopleAPIError(response.status, body.decode("utf-8", "replace"))
+        return json.loads(body)
+
+
+def iter_pages(client, path, params, prefetch=2):
+    """Yield the pages of a paginated listing, fetching ahead in the background.
+
+    Page tokens only come with the previous page, so pages cannot be fetched
+    in parallel; instead a thread keeps up to prefetch pages ready while the
+    caller processes the current one.
+    """
+    pages = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+
+    def fetch():
+        page_params = dict(params)
+        try:
+            while not stop.is_set():
+                page = client.get(path, page_params)
+                pages.put(page)
+                if "nextPageToken" not in page:
+                    break
+                page_params["pageToken"] = page["nextPageToken"]
+        except Exception as error:
+            pages.put(error)
+            return
+        pages.put(None)
+
+    thread = threading.Thread(target=fetch, daemon=True)
+    thread.start()
+    try:
+        while True:
+            page = pages.get()
+            if page is None:
+                return
+            if isinstance(page, Exception):
+                raise page
+            yield page
+    finally:
+        # Let the fetcher finish, unblocking it if the caller stopped early
+        stop.set()
+        while thread.is_alive():
+            try:
+                pages.get_nowait()
+            except queue.Empty:
+                thread.join(timeout=0.01)
+
+
+def contact_groups(client):
+    """Return {group resource name: label}, with "* " before system groups."""
+    labels = {}
+    for page in iter_pages(client, GROUPS_PATH, {"pageSize": 1000}):
+        for group in page.get("contactGroups", []):
+            name = group.get("formattedName") or group.get("name", "")
+            if group.get("groupType") == "SYSTEM_CONTACT_GROUP":
+                name = f"* {group.get('name', name)}"
+            labels[group["resourceName"]] = name
+    return labels
+
+
+def format_birthday(birthdays):
+    """Format the first usable birthday as YYYY-MM-DD or --MM-DD, else its text."""
+    for birthday in birthdays:
+        date = birthday.get("date") or {}
+        if date.get("month") and date.get("day"):
+            if date.get("year"):
+                return f"{date['year']:04d}-{date['month']:02d}-{date['day']:02d}"
+            return f"--{date['month']:02d}-{date['day']:02d}"
+    for birthday in birthdays:
+        if birthday.get("text"):
+            return birthday["text"]
+    return ""
+
+
+def person_row(person, groups):
+    """Return the export row of a person, or None without a birthday."""
+    if person.get("metadata", {}).get("deleted"):
+        return None
+    birthday = format_birthday(person.get("birthdays", []))
+    if not birthday:
+        return None
+
+    name = (person.get("names") or [{}])[0]
+    first_name = name.get("givenName", "")
+    if not (first_name or name.get("familyName")):
+        first_name = name.get("displayName", "")
+    labels = []
+    for membership in person.get("memberships", []):
+        group = membership.get("contactGroupMembership", {})
+        resource_name = group.get("contactGroupResourceName")
+        if resource_name:
+            labels.append(groups.get(resource_name, resource_name.rpartition("/")[2]))
+    return [
+        first_name,
+        name.get("middleName", ""),
+        name.get("familyName", ""),
+        birthday,
+        " ::: ".join(labels),
+        person["resourceName"],
+    ]
+
+
+def iter_people(client, page_size=1000, prefetch=2, sync_token=None, state=None):
+    """Yield every person of the listing, or the changes since sync_token.
+
+    The sync token for the next run is stored in state["sync_token"] once
+    the last page has been read.
+    """
+    params = {
+        "personFields": "names,birthdays,memberships",
+        "pageSize": page_size,
+        "requestSyncToken": "true",
+    }
+    if sync_token:
+        params["syncToken"] = sync_token
+    for page in iter_pages(client, CONNECTIONS_PATH, params, prefetch):
+        yield from page.get("connections", [])
+        if "nextSyncToken" in page and state is not None:
+            state["sync_token"] = page["nextSyncToken"]
+
+
+def load_sync_token(state_file, endpoint):
+    """Return the sync token of the last fetch from endpoint, if any."""
+    if not os.path.exists(state_file):
+        return None
+    with open(state_file, "r", encoding="utf-8") as file:
+        state = json.load(file)
+    return state.get("sync_token") if state.get("endpoint") == endpoint else None
+
+
+def save_sync_token(state_file, endpoint, sync_token):
+    """Remember the sync token for the next fetch."""
+    with open(state_file, "w", encoding="utf-8") as file:
+        json.dump({"endpoint": endpoint, "sync_token": sync_token}, file)
+
+
+def has_resource_names(csv_file):
+    """Return True if csv_file is an export written by this fetcher."""
+    if not os.path.exists(csv_file):
+        return False
+    with open(csv_file, "r", encoding="utf-8", newline="") as file:
+        return "Resource Name" in next(csv.reader(file), [])
+
+
+def fetch_contacts(
+    output_file,
+    endpoint=DEFAULT_ENDPOINT,
+    token=None,
+    state_file=DEFAULT_STATE_FILE,
+    page_size=1000,
+    prefetch=2,
+    full=False,
+):
+    """Fetch contacts with birthdays into a CSV export the pipeline can read.
+
+    The first run lists every contact, writing each page to the export as
+    it arrives. Later runs ask only for the changes since the stored sync
+    token and apply them to the existing export; a rejected token falls
+    back to a full fetch. Returns (people received, rows written).
+    """
+    client = PeopleClient(endpoint, token)
+    groups = contact_groups(client)
+    sync_token = None
+    if not full and has_resource_names(output_file):
+        sync_token = load_sync_token(state_file, endpoint)
+
+    state = {}
+    temp_file = f"{output_file}.tmp"
+    received = written = 0
+
+    try:
+        with open(temp_file, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(FIELDS)
+
+            changes = None
+            if sync_token:
+                try:
+                    changes = {}
+                    people = iter_people(client, page_size, prefetch, sync_token, state)
+                    for person in people:
+                        received += 1
+                        changes[person["resourceName"]] = person_row(person, groups)
+                except PeopleAPIError as error:
+                    if error.status != 410:
+                        raise
+                    # The token expired: list everything again
+                    changes, received, state = None, 0, {}
+
+            if changes is None:
+                for person in iter_people(client, page_size, prefetch, None, state):
+                    received += 1
+                    row = person_row(person, groups)
+                    if row is not None:
+                        writer.writerow(row)
+                        written += 1
+            else:
+                with open(output_file, "r", encoding="utf-8", newline="") as source:
+                    reader = csv.reader(source)
+                    index = next(reader).index("Resource Name")
+                    for row in reader:
+                        resource_name = row[index] if len(row) > index else ""
+                        if resource_name in changes:
+                            row = changes.pop(resource_name)
+                        if row is not None:
+                            writer.writerow(row)
+                            written += 1
+                for row in changes.values():
+                    if row is not None:
+                        writer.writerow(row)
+                        written += 1
+    except BaseException:
+        if os.path.exists(temp_file):
+            os.unlink(temp_file)
+        raise
+    finally:
+        client.close()
+
+    os.replace(temp_file, output_file)
+    if "sync_token" in state:
+        save_sync_token(state_file, endpoint, state["sync_token"])
+
+    kind = "changed contacts" if sync_token and changes is not None else "contacts"
+    print(f"Fetched {received} {kind}")
+    print(f"Contacts with birthdays saved as: {output_file} ({written} contacts)")
+
+    return received, written
+
+
+def main(argv=None, prog=None):
+    """Run the command line interface."""
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Fetch contacts with birthdays from the People API"
+    )
+    parser.add_argument("output_file", nargs="?", default="export.csv")
+    parser.add_argument("--endpoint", default=DEFAULT_ENDPOINT)
+    parser.add_argument(
+        "--state",
+        default=DEFAULT_STATE_FILE,
+        help="File keeping the sync token for incremental fetches",
+    )
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument(
+        "--prefetch", type=int, default=2, help="Pages to fetch ahead of processing"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore the sync token and fetch everything",
+    )
+    args = parser.parse_args(argv)
+
+    fetch_contacts(
+        args.output_file,
+        args.endpoint,
+        os.environ.get("PEOPLE_API_TOKEN"),
+        args.state,
+        args.page_size,
+        args.prefetch,
+        args.full,
+    )
+
+
+if __name__ == "__main__":
+    main()
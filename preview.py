@@ -0,0 +1,174 @@
+import calendar
+import csv
+import io
+import math
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+from itertools import islice
+
+from create_birthday_calendar import (
+    DEFAULT_TEMPLATES,
+    create_birthday_ics,
+    parse_birthday,
+)
+from filter_contacts import parse_csv_records, prefilter_records, read_csv_header
+
+
+def preview_path(output_file):
+    """Return where the preview of a calendar is written, next to it."""
+    root, extension = os.path.splitext(output_file)
+    return f"{root}.preview{extension or '.ics'}"
+
+
+def reservoir_sample(items, size, rng):
+    """Return a uniform random sample of size items in a single pass.
+
+    Uses Algorithm L: once the reservoir is full, the number of items to
+    skip before the next replacement is drawn directly, so the random number
+    generator is only called O(size * log(n / size)) times. All items are
+    returned when there are no more than size.
+    """
+    iterator = iter(items)
+    reservoir = list(islice(iterator, size))
+    if len(reservoir) < size:
+        return reservoir
+
+    # 1 - random() is in (0, 1], so its logarithm is defined
+    weight = math.exp(math.log(1 - rng.random()) / size)
+    while weight < 1:
+        skip = math.floor(math.log(1 - rng.random()) / math.log(1 - weight))
+        item = next(islice(iterator, skip, None), reservoir)
+        if item is reservoir:
+            break
+        reservoir[rng.randrange(size)] = item
+        weight *= math.exp(math.log(1 - rng.random()) / size)
+    return reservoir
+
+
+def iter_birthday_rows(file, birthday_index, counts, prefilter=True):
+    """Yield the rows of a binary CSV file that have a birthday, numbered.
+
+    counts["rows"] and counts["birthdays"] grow as rows are read. With
+    prefilter, rows without a birthday are counted by the byte-level
+    prefilter, a chunk at a time, without being decoded; without it, every
+    row is parsed, so the counts are exact wherever reading stops.
+    """
+    if prefilter:
+        rows = parse_prefiltered(file, birthday_index, counts)
+    else:
+        rows = csv.reader(io.TextIOWrapper(file, encoding="utf-8"))
+    for row in rows:
+        counts["rows"] += 1
+        if len(row) > birthday_index and row[birthday_index].strip():
+            counts["birthdays"] += 1
+            yield counts["birthdays"], row
+
+
+def parse_prefiltered(file, birthday_index, counts):
+    """Yield the rows the prefilter cannot reject, counting the others."""
+    for rejected, candidates in prefilter_records(file, birthday_index):
+        counts["rows"] += rejected
+        candidates.append(b"")
+        yield from parse_csv_records(b"\n".join(candidates))
+
+
+def sample_export(csv_file, size, first=False, seed=None):
+    """Pick size contacts with a birthday from an export, in one streaming pass.
+
+    The contacts are a uniform random sample (reproducible with seed), or
+    with first the first ones, in which case reading stops there. Only the
+    sample is held in memory. Returns (header, rows in file order, counts of
+    rows read and of those with a birthday).
+    """
+    counts = {"rows": 0, "birthdays": 0}
+    with open(csv_file, "rb") as file:
+        header = read_csv_header(file)
+        if "Birthday" not in header:
+            raise ValueError(f"No Birthday column in {csv_file}")
+        rows = iter_birthday_rows(
+            file, header.index("Birthday"), counts, prefilter=not first
+        )
+        if first:
+            sample = list(islice(rows, size))
+        else:
+            sample = sorted(reservoir_sample(rows, size, random.Random(seed)))
+    return header, [row for _, row in sample], counts
+
+
+def sample_stats(rows, birthday_index):
+    """Return (share with a known year, birthdays per month) of sampled rows."""
+    months = Counter()
+    year_known = 0
+    for row in rows:
+        value = row[birthday_index].strip()
+        try:
+            birthday_date = parse_birthday(value)
+        except ValueError:
+            continue
+        if birthday_date is not None:
+            months[birthday_date.month] += 1
+            year_known += not value.startswith("--")
+    return year_known / len(rows) if rows else 0, months
+
+
+def create_preview(
+    csv_file,
+    output_file,
+    size,
+    first=False,
+    seed=None,
+    templates=DEFAULT_TEMPLATES,
+    profile="full",
+    alarms=True,
+):
+    """Render a calendar of a sample of an export and print quick statistics.
+
+    See sample_export for how the size contacts are picked. They are
+    rendered to output_file like a full run would render them, except that
+    repeated names are only numbered within the sample. The size of the
+    full calendar is estimated from the preview's. Returns the counts of
+    rows read and of those with a birthday.
+    """
+    start = time.perf_counter()
+    header, rows, counts = sample_export(csv_file, size, first, seed)
+    elapsed = time.perf_counter() - start
+
+    fd, sample_file = tempfile.mkstemp(suffix=".csv")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(header)
+            writer.writerows(rows)
+        create_birthday_ics(
+            sample_file,
+            output_file,
+            templates=templates,
+            profile=profile,
+            alarms=alarms,
+        )
+    finally:
+        os.unlink(sample_file)
+
+    kind = "first" if first else "random sample of"
+    print(f"Preview of the {kind} {len(rows)} contacts with a birthday")
+    share = counts["birthdays"] / counts["rows"] if counts["rows"] else 0
+    print(
+        f"Read {counts['rows']} rows in {elapsed:.1f}s: "
+        f"{counts['birthdays']} with a birthday ({share:.0%})"
+    )
+    year_share, months = sample_stats(rows, header.index("Birthday"))
+    print(f"Birth year known: {year_share:.0%}")
+    print(
+        "Birthdays per month: "
+        + ", ".join(
+            f"{calendar.month_abbr[month]} {months[month]}" for month in range(1, 13)
+        )
+    )
+    if rows and not first:
+        estimate = os.path.getsize(output_file) / len(rows) * counts["birthdays"]
+        print(f"Estimated full calendar size: {estimate / 1024**2:.1f} MiB")
+
+    return counts
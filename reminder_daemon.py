@@ -0,0 +1,189 @@
+import argparse
+import heapq
+import threading
+import time
+from datetime import datetime
+from datetime import time as day_time
+
+from create_birthday_calendar import birthday_in_year, iter_birthdays
+
+
+def reminder_text(full_name):
+    """Return the (summary, description) pair used for a birthday reminder."""
+    return (
+        f"Today is {full_name}'s Birthday! 🎂",
+        f"Don't forget to call {full_name} today to wish them a happy birthday! 🎂",
+    )
+
+
+def stdout_sink(full_name, occurrence):
+    """Print a reminder to standard output."""
+    summary, description = reminder_text(full_name)
+    print(f"[{occurrence.isoformat()}] {summary} {description}", flush=True)
+
+
+def webhook_sink(url, timeout=10):
+    """Create a sink that POSTs each reminder as JSON to a webhook URL."""
+    import json
+    import urllib.request
+
+    def send(full_name, occurrence):
+        summary, description = reminder_text(full_name)
+        payload = {
+            "name": full_name,
+            "date": occurrence.isoformat(),
+            "summary": summary,
+            "description": description,
+        }
+        request = urllib.request.Request(
+            url,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=timeout):
+            pass
+
+    return send
+
+
+def smtp_sink(host, port, sender, recipient, timeout=10):
+    """Create a sink that emails each reminder through an SMTP server."""
+    import smtplib
+    from email.message import EmailMessage
+
+    def send(full_name, occurrence):
+        summary, description = reminder_text(full_name)
+        message = EmailMessage()
+        message["From"] = sender
+        message["To"] = recipient
+        message["Subject"] = summary
+        message.set_content(description)
+        with smtplib.SMTP(host, port, timeout=timeout) as server:
+            server.send_message(message)
+
+    return send
+
+
+class ReminderScheduler:
+    """Fire birthday reminders from a min-heap of next firing times.
+
+    Each heap entry is (timestamp, contact index, year), so popping the next
+    due reminder and rescheduling it for the following year are O(log n).
+    """
+
+    def __init__(self, birthdays, sinks, reminder_time=day_time(0, 0)):
+        self.birthdays = list(birthdays)
+        self.sinks = list(sinks)
+        self.reminder_time = reminder_time
+        self.heap = []
+        self._fire_times = {}
+        self._stop = threading.Event()
+
+    def fire_time(self, index, year):
+        """Return the local timestamp of a contact's reminder in a given year."""
+        birthday_date = self.birthdays[index][1]
+        # At most 366 distinct days per year, so cache the conversions
+        key = (birthday_date.month, birthday_date.day, year)
+        if key not in self._fire_times:
+            occurrence = birthday_in_year(birthday_date, year)
+            self._fire_times[key] = datetime.combine(
+                occurrence, self.reminder_time
+            ).timestamp()
+        return self._fire_times[key]
+
+    def schedule(self, now):
+        """Build the heap with every contact's next reminder at or after now.
+
+        A reminder whose time already passed today is due at now, so the
+        birthdays of the day still fire when the daemon starts late.
+        """
+        today = datetime.fromtimestamp(now).date()
+        year = today.year
+        self.heap = []
+        for index in range(len(self.birthdays)):
+            fire_at = self.fire_time(index, year)
+            if fire_at < now and datetime.fromtimestamp(fire_at).date() == today:
+                self.heap.append((now, index, year))
+            elif fire_at < now:
+                self.heap.append((self.fire_time(index, year + 1), index, year + 1))
+            else:
+                self.heap.append((fire_at, index, year))
+        heapq.heapify(self.heap)
+
+    def run_pending(self, now):
+        """Dispatch every reminder due at now and reschedule it for next year."""
+        fired = 0
+        while self.heap and self.heap[0][0] <= now:
+            _, index, year = self.heap[0]
+            full_name, birthday_date = self.birthdays[index]
+            self.dispatch(full_name, birthday_in_year(birthday_date, year))
+            heapq.heapreplace(
+                self.heap, (self.fire_time(index, year + 1), index, year + 1)
+            )
+            fired += 1
+        return fired
+
+    def dispatch(self, full_name, occurrence):
+        """Send a reminder to every sink, keeping the daemon alive on failures."""
+        for sink in self.sinks:
+            try:
+                sink(full_name, occurrence)
+            except Exception as error:
+                print(f"Failed to send reminder for {full_name}: {error}")
+
+    def run_forever(self, clock=time.time):
+        """Sleep until the next due reminder, fire it, and repeat until stopped."""
+        self.schedule(clock())
+        while self.heap and not self._stop.is_set():
+            self._stop.wait(max(0.0, self.heap[0][0] - clock()))
+            if not self._stop.is_set():
+                self.run_pending(clock())
+
+    def stop(self):
+        """Wake the daemon up and make run_forever return."""
+        self._stop.set()
+
+
+def build_sinks(args):
+    """Create the sinks selected on the command line."""
+    sinks = []
+    if args.stdout or not (args.webhook or args.smtp):
+        sinks.append(stdout_sink)
+    if args.webhook:
+        sinks.append(webhook_sink(args.webhook))
+    if args.smtp:
+        host, _, port = args.smtp.partition(":")
+        sinks.append(smtp_sink(host, int(port or 25), args.sender, args.recipient))
+    return sinks
+
+
+def main(argv=None, prog=None):
+    """Run the command line interface."""
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Send birthday reminders locally"
+    )
+    parser.add_argument("csv_file", nargs="?", default="export.csv")
+    parser.add_argument("--at", default="00:00", help="Reminder time (HH:MM)")
+    parser.add_argument("--stdout", action="store_true", help="Print reminders")
+    parser.add_argument("--webhook", help="POST reminders as JSON to this URL")
+    parser.add_argument("--smtp", help="Email reminders through HOST[:PORT]")
+    parser.add_argument("--sender", default="birthdays@localhost")
+    parser.add_argument("--recipient", default="me@localhost")
+    args = parser.parse_args(argv)
+
+    scheduler = ReminderScheduler(
+        (birthday[:2] for birthday in iter_birthdays(args.csv_file)),
+        build_sinks(args),
+        day_time.fromisoformat(args.at),
+    )
+    print(f"Loaded {len(scheduler.birthdays)} birthdays")
+
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import threading
+from collections import OrderedDict
+
+from create_birthday_calendar import render_block
+from event_templates import DEFAULT_TEMPLATES
+
+# Events kept by default, about 55 MB of full-profile events
+RENDER_CACHE_SIZE = 50_000
+
+
+class RenderCache:
+    """Keeps the rendered bytes of recently rendered events, least recent out.
+
+    For long-running processes that render the same contacts again and
+    again, e.g. a service calling render_ics on every new export. An event
+    is found again by its UID and source hash (which change with the
+    contact's name, kind, occasion or date), the version of the templates
+    and the rendering options, so after a small change to an export nearly
+    every event is a hit. At most maxsize events are kept. The cache can be
+    shared between threads.
+
+    Without a fixed dtstamp, a cached event keeps the DTSTAMP of when it was
+    first rendered, which is when that version of the event was created.
+    """
+
+    def __init__(self, maxsize=RENDER_CACHE_SIZE):
+        if maxsize < 1:
+            raise ValueError("A render cache needs room for at least one event")
+        self.maxsize = maxsize
+        self.blocks = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def render(
+        self,
+        event,
+        templates=DEFAULT_TEMPLATES,
+        profile="full",
+        alarms=True,
+        dtstamp=None,
+    ):
+        """Return the bytes of an event like render_block, cached."""
+        key = (
+            event.uid,
+            event.source_hash,
+            templates.version,
+            profile,
+            alarms,
+            dtstamp,
+        )
+        with self.lock:
+            block = self.blocks.get(key)
+            if block is not None:
+                self.blocks.move_to_end(key)
+                self.hits += 1
+                return block
+            self.misses += 1
+
+        # Rendered outside the lock, so threads do not wait for each other
+        block = render_block(event, templates, profile, alarms, dtstamp)
+        with self.lock:
+            self.blocks[key] = block
+            while len(self.blocks) > self.maxsize:
+                self.blocks.popitem(last=False)
+                self.evictions += 1
+        return block
+
+    def stats(self):
+        """Return the hits, misses, evictions, size and hit rate so far."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self.blocks),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        """Forget every cached event, keeping the counts."""
+        with self.lock:
+            self.blocks.clear()
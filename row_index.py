@@ -0,0 +1,203 @@
+import argparse
+import csv
+import pickle
+import sys
+from array import array
+from bisect import bisect_left
+
+from checkpoint import OffsetLines, input_identity
+from create_birthday_calendar import hash_file
+from filter_contacts import parse_csv_records
+
+# Bumped whenever the layout of index files changes
+INDEX_VERSION = 1
+
+NAME_COLUMNS = ("First Name", "Middle Name", "Last Name")
+
+
+def index_path(csv_file):
+    """Return where the row index of an export is kept, next to it."""
+    return f"{csv_file}.idx"
+
+
+class RowIndex:
+    """Byte offsets of the records of an export, and of its contacts by name.
+
+    offsets[n] is where record n (the first after the header being 0)
+    starts, and offsets[-1] the end of the file. keys maps each contact's
+    name (numbered "Name#2" and so on in file order when repeated) to its
+    record number. source and digest identify the export the index was
+    built from: its (size, modification time) and SHA-256.
+    """
+
+    def __init__(self, offsets, keys, source, digest):
+        self.offsets = offsets
+        self.keys = keys
+        self.source = source
+        self.digest = digest
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @classmethod
+    def load(cls, index_file):
+        """Read an index file."""
+        with open(index_file, "rb") as file:
+            data = pickle.load(file)
+        if data["version"] != INDEX_VERSION:
+            raise ValueError(f"{index_file} was written by another version")
+        offsets = array("Q")
+        offsets.frombytes(data["offsets"])
+        return cls(offsets, data["keys"], data["source"], data["digest"])
+
+    def save(self, index_file):
+        """Write the index file."""
+        data = {
+            "version": INDEX_VERSION,
+            "offsets": self.offsets.tobytes(),
+            "keys": self.keys,
+            "source": self.source,
+            "digest": self.digest,
+        }
+        with open(index_file, "wb") as file:
+            pickle.dump(data, file, pickle.HIGHEST_PROTOCOL)
+
+    def unchanged(self, csv_file):
+        """Tell whether csv_file is still the export the index was built from.
+
+        Same size and modification time is enough; a file touched without
+        changing is recognized by its SHA-256, which only then is computed.
+        """
+        source = input_identity(csv_file)
+        if source == self.source:
+            return True
+        if source[0] != self.source[0]:
+            return False
+        return hash_file(csv_file).hexdigest() == self.digest
+
+    def find(self, key):
+        """Return the record number of a contact by name, or None."""
+        return self.keys.get(key)
+
+    def read_rows(self, file, first, last=None):
+        """Return the parsed records first to last (included) of a binary file."""
+        last = first if last is None else last
+        file.seek(self.offsets[first])
+        data = file.read(self.offsets[last + 1] - self.offsets[first])
+        return list(parse_csv_records(data))
+
+    def split(self, parts):
+        """Split the records into about even byte ranges for parallel workers.
+
+        Returns (first, last) record numbers of up to parts non-empty ranges,
+        cut at the record boundary nearest to each even share of the bytes.
+        """
+        start, end = self.offsets[0], self.offsets[-1]
+        cuts = [0]
+        for part in range(1, parts):
+            target = start + (end - start) * part // parts
+            cut = bisect_left(self.offsets, target, 0, len(self))
+            if cuts[-1] < cut < len(self):
+                cuts.append(cut)
+        cuts.append(len(self))
+        return [(first, last - 1) for first, last in zip(cuts, cuts[1:])]
+
+
+def build_index(csv_file, index_file=None):
+    """Index the records of an export in one pass and save the index file.
+
+    Records are read by the CSV parser, so quoted fields spanning several
+    lines stay in their record. Returns the RowIndex.
+    """
+    index_file = index_file or index_path(csv_file)
+    source = input_identity(csv_file)
+    offsets = array("Q")
+    keys = {}
+    name_counts = {}
+    with open(csv_file, "rb") as file:
+        lines = OffsetLines(file)
+        reader = csv.reader(lines)
+        header = next(reader)
+        name_indices = [header.index(column) for column in NAME_COLUMNS]
+        width = max(name_indices) + 1
+        offsets.append(lines.offset)
+        for record, row in enumerate(reader):
+            offsets.append(lines.offset)
+            if len(row) < width:
+                row = row + [""] * (width - len(row))
+            full_name = " ".join(
+                part for part in (row[i].strip() for i in name_indices) if part
+            )
+            if not full_name:
+                continue
+            count = name_counts[full_name] = name_counts.get(full_name, 0) + 1
+            keys[full_name if count == 1 else f"{full_name}#{count}"] = record
+
+    digest = hash_file(csv_file).hexdigest()
+    if input_identity(csv_file) != source:
+        raise ValueError(f"{csv_file} changed while it was being indexed")
+    index = RowIndex(offsets, keys, source, digest)
+    index.save(index_file)
+    print(f"Indexed {len(index)} rows of {csv_file} in {index_file}")
+    return index
+
+
+def load_current_index(parser, csv_file, index_file):
+    """Load the index of an export, exiting if it is missing or out of date."""
+    try:
+        index = RowIndex.load(index_file)
+    except FileNotFoundError:
+        parser.exit(1, f"No index {index_file}: build it first\n")
+    if not index.unchanged(csv_file):
+        parser.exit(1, f"{csv_file} changed since {index_file} was built\n")
+    return index
+
+
+def main(argv=None, prog=None):
+    """Run the command line interface."""
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Build or use the byte-offset row index of an export"
+    )
+    parser.add_argument("action", choices=["build", "check", "lookup", "split"])
+    parser.add_argument("csv_file", nargs="?", default="export.csv")
+    parser.add_argument("--index", metavar="FILE", help="Index file (CSV_FILE.idx)")
+    parser.add_argument("--name", help="With lookup, the contact to show")
+    parser.add_argument(
+        "--parts",
+        type=int,
+        default=4,
+        help="With split, the number of ranges (default 4)",
+    )
+    args = parser.parse_args(argv)
+    index_file = args.index or index_path(args.csv_file)
+
+    if args.action == "build":
+        build_index(args.csv_file, index_file)
+    elif args.action == "check":
+        load_current_index(parser, args.csv_file, index_file)
+        print(f"{args.csv_file} is unchanged since {index_file} was built")
+    elif args.action == "lookup":
+        if not args.name:
+            parser.error("lookup needs --name")
+        index = load_current_index(parser, args.csv_file, index_file)
+        record = index.find(args.name)
+        if record is None:
+            parser.exit(1, f"No contact named {args.name!r}\n")
+        with open(args.csv_file, "rb") as file:
+            header = next(parse_csv_records(file.read(index.offsets[0])))
+            (row,) = index.read_rows(file, record)
+        print(f"Row {record + 2} at byte {index.offsets[record]}:")
+        for column, value in zip(header, row):
+            if value:
+                print(f"  {column}: {value}")
+    else:
+        index = load_current_index(parser, args.csv_file, index_file)
+        writer = csv.writer(sys.stdout, lineterminator="\n")
+        writer.writerow(["part", "first_row", "last_row", "start", "end"])
+        for part, (first, last) in enumerate(index.split(args.parts), start=1):
+            start, end = index.offsets[first], index.offsets[last + 1]
+            writer.writerow([part, first + 2, last + 2, start, end])
+
+
+if __name__ == "__main__":
+    main()
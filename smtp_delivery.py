@@ -0,0 +1,304 @@
+import argparse
+import asyncio
+import re
+import time
+from datetime import date
+from email import policy
+from email.message import EmailMessage
+from email.utils import getaddresses, parseaddr
+
+from create_birthday_calendar import birthday_in_year, iter_birthdays
+from reminder_daemon import reminder_text
+
+
+class SMTPReplyError(Exception):
+    """An SMTP command was answered with an error reply."""
+
+    def __init__(self, code, text):
+        super().__init__(f"{code} {text}")
+        self.code = code
+        self.text = text
+
+    @property
+    def transient(self):
+        """Return True for 4xx replies, which are worth retrying later."""
+        return self.code < 500
+
+
+class SMTPConnection:
+    """A single ESMTP connection that pipelines commands when supported."""
+
+    def __init__(self, host, port, timeout=30):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.pipelining = False
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        """Open the connection and greet the server."""
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        try:
+            self.check(await self.read_reply(), 220)
+            code, lines = await self.command(b"EHLO localhost")
+            if code == 250:
+                self.pipelining = any(line.upper() == "PIPELINING" for line in lines)
+            else:
+                self.check(await self.command(b"HELO localhost"), 250)
+        except BaseException:
+            self.abort()
+            raise
+
+    async def read_reply(self):
+        """Read one (possibly multi-line) reply as (code, lines).
+
+        A line that is not an SMTP reply raises ConnectionError, like a
+        dropped connection.
+        """
+        lines = []
+        while True:
+            line = await asyncio.wait_for(self.reader.readline(), self.timeout)
+            if not line:
+                raise ConnectionError("SMTP server closed the connection")
+            if not line[:3].isdigit() or line[3:4] not in (b" ", b"-", b"\r", b"\n"):
+                raise ConnectionError(f"Malformed SMTP reply: {line[:80]!r}")
+            lines.append(line[4:].decode("utf-8", "replace").rstrip("\r\n"))
+            if line[3:4] != b"-":
+                return int(line[:3]), lines
+
+    async def command(self, command):
+        """Send one command and wait for its reply."""
+        self.writer.write(command + b"\r\n")
+        await self.writer.drain()
+        return await self.read_reply()
+
+    def check(self, reply, expected):
+        """Raise SMTPReplyError unless the reply has the expected code."""
+        code, lines = reply
+        if code != expected:
+            raise SMTPReplyError(code, " ".join(lines))
+
+    async def send(self, sender, recipients, data):
+        """Send one message, pipelining the envelope and DATA commands if possible."""
+        commands = [f"MAIL FROM:<{sender}>".encode("utf-8")]
+        commands += [f"RCPT TO:<{rcpt}>".encode("utf-8") for rcpt in recipients]
+        commands.append(b"DATA")
+
+        if self.pipelining:
+            self.writer.write(b"".join(command + b"\r\n" for command in commands))
+            await self.writer.drain()
+            replies = [await self.read_reply() for _ in commands]
+        else:
+            replies = [await self.command(commands[0])]
+            if replies[0][0] == 250:
+                for command in commands[1:-1]:
+                    replies.append(await self.command(command))
+                if any(code in (250, 251) for code, _ in replies[1:]):
+                    replies.append(await self.command(b"DATA"))
+
+        mail_reply = replies[0]
+        rcpt_replies = replies[1 : len(recipients) + 1]
+        data_reply = replies[-1] if len(replies) == len(commands) else (0, [])
+        accepted = any(code in (250, 251) for code, _ in rcpt_replies)
+        if mail_reply[0] != 250 or not accepted or data_reply[0] != 354:
+            if data_reply[0] == 354:
+                # The server wants a body we are not going to send: abort it
+                await self.command(b".")
+            await self.command(b"RSET")
+            self.check(mail_reply, 250)
+            if not accepted:
+                self.check(rcpt_replies[0], 250)
+            self.check(data_reply, 354)
+
+        self.writer.write(data + b".\r\n")
+        await self.writer.drain()
+        self.check(await self.read_reply(), 250)
+
+    def abort(self):
+        """Drop the connection without the QUIT handshake."""
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    async def close(self):
+        """Say goodbye and close the connection, ignoring network errors."""
+        if self.writer is None:
+            return
+        try:
+            await self.command(b"QUIT")
+        except (OSError, ConnectionError, asyncio.TimeoutError):
+            pass
+        self.writer.close()
+        self.writer = None
+
+
+def message_bytes(message):
+    """Serialize a message for the DATA command, with CRLF and dot-stuffing."""
+    data = message.as_bytes(policy=policy.SMTP)
+    if not data.endswith(b"\r\n"):
+        data += b"\r\n"
+    return re.sub(rb"(?m)^\.", b"..", data)
+
+
+async def deliver_messages(
+    messages,
+    host="localhost",
+    port=25,
+    pool_size=4,
+    messages_per_connection=100,
+    retries=3,
+    backoff=0.5,
+    timeout=30,
+):
+    """Deliver messages over a bounded pool of reused SMTP connections.
+
+    Each of the pool_size workers keeps one connection open and sends up to
+    messages_per_connection messages over it before reconnecting. Network
+    errors, malformed replies and 4xx replies are retried with exponential
+    backoff; 5xx replies and any other error fail the message. Returns
+    (sent, failed) where failed holds (message, error) pairs.
+    """
+    queue = asyncio.Queue()
+    for message in messages:
+        queue.put_nowait((message, 0))
+
+    loop = asyncio.get_running_loop()
+    sent = 0
+    failed = []
+
+    def retry_later(message, attempt, error):
+        if attempt >= retries:
+            failed.append((message, error))
+            queue.task_done()
+            return
+
+        def requeue():
+            queue.put_nowait((message, attempt + 1))
+            queue.task_done()
+
+        loop.call_later(backoff * 2**attempt, requeue)
+
+    async def worker():
+        nonlocal sent
+        connection = None
+        sent_on_connection = 0
+        try:
+            while True:
+                message, attempt = await queue.get()
+                try:
+                    if connection is None:
+                        pending = SMTPConnection(host, port, timeout)
+                        await pending.connect()
+                        connection, sent_on_connection = pending, 0
+                    await connection.send(
+                        parseaddr(message["From"])[1],
+                        [address for _, address in getaddresses([message["To"]])],
+                        message_bytes(message),
+                    )
+                except SMTPReplyError as error:
+                    if error.code == 421 and connection is not None:
+                        # The server is shutting this connection down
+                        connection.abort()
+                        connection = None
+                    if error.transient:
+                        retry_later(message, attempt, error)
+                    else:
+                        failed.append((message, error))
+                        queue.task_done()
+                    continue
+                except (OSError, ConnectionError, asyncio.TimeoutError) as error:
+                    if connection is not None:
+                        connection.abort()
+                    connection = None
+                    retry_later(message, attempt, error)
+                    continue
+                except Exception as error:
+                    # Anything else fails the message, but never the worker,
+                    # or the queue would wait for it forever
+                    if connection is not None:
+                        connection.abort()
+                    connection = None
+                    failed.append((message, error))
+                    queue.task_done()
+                    continue
+
+                sent += 1
+                sent_on_connection += 1
+                queue.task_done()
+                if sent_on_connection >= messages_per_connection:
+                    await connection.close()
+                    connection = None
+        finally:
+            if connection is not None:
+                await connection.close()
+
+    workers = [asyncio.create_task(worker()) for _ in range(pool_size)]
+    await queue.join()
+    for task in workers:
+        task.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    return sent, failed
+
+
+def birthday_messages(birthdays, day, sender, recipient):
+    """Build one reminder email for every birthday falling on a given day."""
+    messages = []
+    for full_name, birthday_date in birthdays:
+        if birthday_in_year(birthday_date, day.year) != day:
+            continue
+        summary, description = reminder_text(full_name)
+        message = EmailMessage()
+        message["From"] = sender
+        message["To"] = recipient
+        message["Subject"] = summary
+        message.set_content(description)
+        messages.append(message)
+    return messages
+
+
+def send_birthday_reminders(csv_file, day, host, port, sender, recipient, **options):
+    """Email the reminders for every birthday on a given day."""
+    birthdays = (birthday[:2] for birthday in iter_birthdays(csv_file))
+    messages = birthday_messages(birthdays, day, sender, recipient)
+
+    start = time.perf_counter()
+    sent, failed = asyncio.run(deliver_messages(messages, host, port, **options))
+    elapsed = time.perf_counter() - start
+
+    print(f"Sent {sent} birthday reminders in {elapsed:.2f}s")
+    for message, error in failed:
+        print(f"Failed to send '{message['Subject']}': {error}")
+
+    return sent, len(failed)
+
+
+def main(argv=None, prog=None):
+    """Run the command line interface."""
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Email today's birthday reminders"
+    )
+    parser.add_argument("csv_file", nargs="?", default="export.csv")
+    parser.add_argument("--smtp", default="localhost:25", help="SMTP HOST[:PORT]")
+    parser.add_argument("--sender", default="birthdays@localhost")
+    parser.add_argument("--recipient", default="me@localhost")
+    parser.add_argument("--date", help="Send reminders for this day (YYYY-MM-DD)")
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    host, _, port = args.smtp.partition(":")
+    send_birthday_reminders(
+        args.csv_file,
+        date.fromisoformat(args.date) if args.date else date.today(),
+        host,
+        int(port or 25),
+        args.sender,
+        args.recipient,
+        pool_size=args.pool_size,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,14 @@
 """Pytest configuration and fixtures for Google Birthday Liberator tests."""
 
+import csv
 import os
 import tempfile
 
 import pytest
 
+# Columns of the small exports written by the write_export fixture
+EXPORT_COLUMNS = ["First Name", "Middle Name", "Last Name", "Birthday"]
+
 
 @pytest.fixture
 def temp_csv_file():
@@ -152,6 +156,31 @@ def csv_header():
     ]
 
 
+@pytest.fixture
+def write_export():
+    """Factory writing contact exports into a temporary directory.
+
+    write_export(rows, columns=EXPORT_COLUMNS, name="export.csv") writes the
+    columns and then the rows, and returns the path of the file. Rows are
+    lists of fields, or lines already formatted, written as they are.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+
+        def write(rows, columns=EXPORT_COLUMNS, name="export.csv"):
+            path = os.path.join(directory, name)
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                for row in rows:
+                    if isinstance(row, str):
+                        f.write(row)
+                    else:
+                        writer.writerow(row)
+            return path
+
+        yield write
+
+
 @pytest.fixture(autouse=True)
 def setup_python_path():
     """Add current directory to Python path for imports."""
@@ -0,0 +1,297 @@
+"""Local stand-in servers used by the tests and benchmarks."""
+
+import asyncio
+import hashlib
+import http.server
+import json
+import threading
+import urllib.parse
+
+
+class SMTPStandIn:
+    """Minimal ESMTP server with PIPELINING that keeps received messages in memory.
+
+    transient_failures makes the first N MAIL commands fail with a 451 reply,
+    and rejected_recipients are answered with a permanent 550 reply. greeting
+    replaces the 220 greeting line.
+    """
+
+    def __init__(
+        self,
+        transient_failures=0,
+        rejected_recipients=(),
+        greeting=b"220 standin ESMTP",
+    ):
+        self.greeting = greeting
+        self.transient_failures = transient_failures
+        self.rejected_recipients = set(rejected_recipients)
+        self.messages = []
+        self.connections = 0
+        self.server = None
+        self.port = None
+
+    async def start(self):
+        """Start listening on a free local port."""
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        """Stop the server."""
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        """Serve one client connection."""
+        self.connections += 1
+        writer.write(self.greeting + b"\r\n")
+        recipients = []
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.strip().upper()
+            if command.startswith(b"EHLO"):
+                writer.write(b"250-standin\r\n250-PIPELINING\r\n250 8BITMIME\r\n")
+            elif command.startswith(b"HELO") or command in (b"NOOP", b"RSET"):
+                recipients = []
+                writer.write(b"250 OK\r\n")
+            elif command.startswith(b"MAIL FROM:"):
+                recipients = []
+                if self.transient_failures:
+                    self.transient_failures -= 1
+                    writer.write(b"451 Try again later\r\n")
+                else:
+                    writer.write(b"250 OK\r\n")
+            elif command.startswith(b"RCPT TO:"):
+                address = line.strip()[8:].strip(b"<>").decode("utf-8")
+                if address in self.rejected_recipients:
+                    writer.write(b"550 No such user\r\n")
+                else:
+                    recipients.append(address)
+                    writer.write(b"250 OK\r\n")
+            elif command == b"DATA":
+                if not recipients:
+                    writer.write(b"554 No valid recipients\r\n")
+                    continue
+                writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                await writer.drain()
+                body = []
+                while True:
+                    data_line = await reader.readline()
+                    if data_line in (b".\r\n", b""):
+                        break
+                    body.append(data_line[1:] if data_line[:1] == b"." else data_line)
+                self.messages.append((recipients, b"".join(body)))
+                recipients = []
+                writer.write(b"250 Queued\r\n")
+            elif command == b"QUIT":
+                writer.write(b"221 Bye\r\n")
+                await writer.drain()
+                break
+            else:
+                writer.write(b"500 Unknown command\r\n")
+            await writer.drain()
+        writer.close()
+
+
+class CalDAVStandIn:
+    """Minimal CalDAV collection over keep-alive HTTP/1.1, kept in memory.
+
+    Resources are stored with a fresh ETag per write, and PUT and DELETE
+    honour If-Match and If-None-Match. Requests and connections are counted
+    so tests can check how much traffic a sync caused.
+    """
+
+    def __init__(self, path="/calendars/me/birthdays/"):
+        self.path = path
+        self.resources = {}
+        self.requests = []
+        self.connections = 0
+        self.lock = threading.Lock()
+        self.server = None
+        self.url = None
+
+    def start(self):
+        """Start serving on a free local port in a background thread."""
+        standin = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with standin.lock:
+                    standin.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def reply(self, status, etag=None, body=b""):
+                self.send_response(status)
+                if etag:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def handle_request(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length)
+                with standin.lock:
+                    standin.requests.append((self.command, self.path))
+                    status, etag, content = standin.handle(
+                        self.command, self.path, self.headers, body
+                    )
+                self.reply(status, etag, content)
+
+            do_GET = do_PUT = do_DELETE = handle_request  # noqa: N815
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        ).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}{self.path}"
+        return self
+
+    def stop(self):
+        """Stop the server."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def handle(self, method, path, headers, body):
+        """Apply one request to the collection, returning (status, etag, body)."""
+        if not path.startswith(self.path):
+            return 404, None, b""
+        current = self.resources.get(path)
+        if_match = headers.get("If-Match")
+        if if_match and (current is None or current[0] != if_match):
+            return 412, None, b""
+        if headers.get("If-None-Match") == "*" and current is not None:
+            return 412, None, b""
+
+        if method == "GET":
+            if current is None:
+                return 404, None, b""
+            return 200, current[0], current[1]
+        if method == "PUT":
+            etag = f'"{hashlib.sha1(body).hexdigest()[:16]}-{len(self.requests)}"'
+            self.resources[path] = (etag, body)
+            return (201 if current is None else 204), etag, b""
+        if method == "DELETE":
+            if current is None:
+                return 404, None, b""
+            del self.resources[path]
+            return 204, None, b""
+        return 405, None, b""
+
+    def edit(self, path, body):
+        """Change a resource as another client would, giving it a new ETag."""
+        with self.lock:
+            etag = f'"edited-{len(self.requests)}"'
+            self.resources[path] = (etag, body)
+
+
+class PeopleStandIn:
+    """In-memory stand-in for the People API connections and contact groups.
+
+    Every change bumps a version; sync tokens remember the version they were
+    issued at, so an incremental request returns the people changed since,
+    with removed people as deleted tombstones. Tokens issued before
+    expire_before are answered with 410 Gone.
+    """
+
+    def __init__(self, people=(), groups=()):
+        self.version = 0
+        self.people = {}
+        self.groups = list(groups)
+        self.requests = []
+        self.connections = 0
+        self.expire_before = 0
+        self.lock = threading.Lock()
+        self.server = None
+        self.url = None
+        for person in people:
+            self.put(person)
+
+    def put(self, person):
+        """Add or replace a person, keyed by resourceName."""
+        with self.lock:
+            self.version += 1
+            self.people[person["resourceName"]] = (self.version, person)
+
+    def delete(self, resource_name):
+        """Remove a person, leaving a tombstone for incremental syncs."""
+        with self.lock:
+            self.version += 1
+            tombstone = {"resourceName": resource_name, "metadata": {"deleted": True}}
+            self.people[resource_name] = (self.version, tombstone)
+
+    def start(self):
+        """Start serving on a free local port in a background thread."""
+        standin = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with standin.lock:
+                    standin.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                parts = urllib.parse.urlsplit(self.path)
+                params = dict(urllib.parse.parse_qsl(parts.query))
+                with standin.lock:
+                    standin.requests.append((parts.path, params))
+                    status, data = standin.handle(parts.path, params)
+                body = json.dumps(data).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        ).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        return self
+
+    def stop(self):
+        """Stop the server."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def handle(self, path, params):
+        """Answer one GET request with (status, JSON data)."""
+        if path == "/v1/contactGroups":
+            return 200, {"contactGroups": self.groups}
+        if path != "/v1/people/me/connections":
+            return 404, {"error": {"code": 404, "message": "Not found"}}
+
+        since = 0
+        if "syncToken" in params:
+            since = int(params["syncToken"])
+            if since < self.expire_before:
+                return 410, {"error": {"code": 410, "status": "EXPIRED_SYNC_TOKEN"}}
+        changed = [
+            person
+            for version, person in sorted(self.people.values(), key=lambda p: p[0])
+            if version > since and (since or not person.get("metadata"))
+        ]
+
+        start = int(params.get("pageToken") or 0)
+        end = start + int(params.get("pageSize") or 100)
+        data = {"connections": changed[start:end], "totalItems": len(changed)}
+        if end < len(changed):
+            data["nextPageToken"] = str(end)
+        elif params.get("requestSyncToken") == "true":
+            data["nextSyncToken"] = str(self.version)
+        return 200, data
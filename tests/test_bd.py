@@ -0,0 +1,107 @@
+"""Tests for the bd command line entry point."""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def imported_modules(argv):
+    """Helper function to list the modules imported by running bd in a new process."""
+    code = (
+        "import sys, bd\n"
+        "try:\n"
+        f"    bd.main({argv!r})\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print('\\n'.join(sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True
+    )
+    return set(result.stdout.splitlines())
+
+
+class TestBd:
+    """Test cases for the bd command line."""
+
+    def test_help_lists_commands(self, capsys):
+        """Test that the top-level help lists every command."""
+        import bd
+
+        assert bd.main(["--help"]) == 0
+        output = capsys.readouterr().out
+        names = ["fetch", "filter", "store", "index", "calendar", "stats", "serve"]
+        for name in [*names, "diff", "json", "remind", "sync"]:
+            assert f"  {name} " in output
+
+    def test_unknown_command(self, capsys):
+        """Test that an unknown command is a usage error."""
+        import bd
+
+        assert bd.main(["bake"]) == 2
+        assert "unknown command 'bake'" in capsys.readouterr().err
+
+    def test_commands_are_imported_lazily(self):
+        """Test that commands only import the modules they need."""
+        modules = imported_modules(["--help"])
+        assert "argparse" not in modules
+        assert "create_birthday_calendar" not in modules
+
+        modules = imported_modules(["calendar", "--help"])
+        assert "create_birthday_calendar" in modules
+        for heavy in ["asyncio", "external_sort", "ics_merge", "smtplib", "urllib"]:
+            assert heavy not in modules
+
+    def test_calendar_command(self, csv_header):
+        """Test that bd calendar creates the calendar."""
+        import bd
+
+        temp_file = tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".csv")
+        temp_file.write(",".join(csv_header) + "\n")
+        temp_file.write("John,,Doe" + "," * 11 + "1990-05-15,,,\n")
+        temp_file.close()
+        output_file = temp_file.name[:-4] + ".ics"
+
+        try:
+            assert bd.main(["calendar", temp_file.name, output_file, "--sorted"]) == 0
+            with open(output_file, "r", encoding="utf-8") as f:
+                assert "🎂 John Doe's Birthday" in f.read()
+
+        finally:
+            os.unlink(temp_file.name)
+            if os.path.exists(output_file):
+                os.unlink(output_file)
+
+    def test_stats_command(self, capsys, csv_header):
+        """Test that bd stats counts contacts and calendar events."""
+        import bd
+
+        with tempfile.TemporaryDirectory() as directory:
+            csv_file = os.path.join(directory, "export.csv")
+            ics_file = os.path.join(directory, "birthdays.ics")
+            with open(csv_file, "w", encoding="utf-8") as f:
+                f.write(",".join(csv_header) + "\n")
+                f.write('John,,Doe,,,,,,,,,,,1990-05-15,"two\nlines",,\n')
+            with open(ics_file, "w", encoding="utf-8") as f:
+                f.write("BEGIN:VCALENDAR\nBEGIN:VEVENT\nEND:VEVENT\nEND:VCALENDAR")
+
+            assert bd.main(["stats", csv_file, ics_file]) == 0
+
+        output = capsys.readouterr().out
+        assert "Total contacts with birthdays: 1" in output
+        assert "Calendar events created: 1" in output
+
+    def test_command_help_exits(self, capsys):
+        """Test that command options are parsed by the command itself."""
+        import bd
+
+        with pytest.raises(SystemExit) as exit_info:
+            bd.main(["calendar", "--help"])
+
+        assert exit_info.value.code == 0
+        assert "usage: bd calendar" in capsys.readouterr().out
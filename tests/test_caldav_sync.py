@@ -0,0 +1,150 @@
+"""Tests for caldav_sync.py functionality."""
+
+import os
+
+import pytest
+
+from tests.standins import CalDAVStandIn
+
+CONTACTS = [
+    ["John", "", "Doe", "1990-05-15"],
+    ["Jane", "", "Smith", "1992-08-20"],
+    ["Bob", "", "Johnson", "--03-22"],
+]
+
+
+@pytest.fixture
+def caldav(write_export):
+    """A running CalDAV stand-in plus a temporary export and state file."""
+    server = CalDAVStandIn().start()
+    csv_file = write_export(CONTACTS)
+    yield server, csv_file, os.path.join(os.path.dirname(csv_file), "state.json")
+    server.stop()
+
+
+class TestCalDAVSync:
+    """Test cases for incremental CalDAV sync."""
+
+    def test_first_sync_uploads_everything(self, caldav, write_export):
+        """Test that every event is created, over reused connections."""
+        from caldav_sync import sync_birthdays
+
+        server, csv_file, state_file = caldav
+        write_export(CONTACTS * 20)
+
+        counts = sync_birthdays(csv_file, server.url, state_file, concurrency=2)
+
+        assert counts["uploaded"] == 60
+        assert len(server.resources) == 60
+        assert server.connections <= 2
+        body = next(iter(server.resources.values()))[1]
+        assert body.startswith(b"BEGIN:VCALENDAR\r\n")
+        assert body.endswith(b"END:VCALENDAR\r\n")
+
+    def test_unchanged_sync_makes_no_requests(self, caldav):
+        """Test that syncing again without changes sends nothing."""
+        from caldav_sync import sync_birthdays
+
+        server, csv_file, state_file = caldav
+        sync_birthdays(csv_file, server.url, state_file)
+        requests_before = len(server.requests)
+
+        counts = sync_birthdays(csv_file, server.url, state_file)
+
+        assert counts["unchanged"] == 3
+        assert len(server.requests) == requests_before
+
+    def test_changes_are_put_and_deleted_incrementally(self, caldav, write_export):
+        """Test that only changed, new and removed contacts cause requests."""
+        from caldav_sync import sync_birthdays
+
+        server, csv_file, state_file = caldav
+        sync_birthdays(csv_file, server.url, state_file)
+        requests_before = len(server.requests)
+
+        write_export(
+            [
+                ["John", "", "Doe", "1990-05-16"],
+                ["Jane", "", "Smith", "1992-08-20"],
+                ["Amy", "", "Brown", "1988-11-30"],
+            ],
+        )
+        counts = sync_birthdays(csv_file, server.url, state_file)
+
+        assert counts == {
+            "unchanged": 1,
+            "uploaded": 2,
+            "deleted": 1,
+            "conflicts": 0,
+            "failed": 0,
+        }
+        assert sorted(method for method, _ in server.requests[requests_before:]) == [
+            "DELETE",
+            "PUT",
+            "PUT",
+        ]
+        assert len(server.resources) == 3
+        bodies = [body for _, body in server.resources.values()]
+        assert any(b"DTSTART;VALUE=DATE:19900516" in body for body in bodies)
+
+    def test_server_side_edits_are_not_overwritten(self, caldav, write_export):
+        """Test that If-Match turns a concurrent edit into a conflict."""
+        from caldav_sync import load_state, sync_birthdays
+
+        server, csv_file, state_file = caldav
+        write_export(CONTACTS[:1])
+        sync_birthdays(csv_file, server.url, state_file)
+        (path,) = server.resources
+        server.edit(path, b"edited elsewhere")
+
+        write_export([["John", "", "Doe", "1990-05-16"]])
+        counts = sync_birthdays(csv_file, server.url, state_file)
+
+        assert counts["conflicts"] == 1
+        assert server.resources[path][1] == b"edited elsewhere"
+        assert len(load_state(state_file, server.url)) == 1
+
+        counts = sync_birthdays(csv_file, server.url, state_file, force=True)
+
+        assert (counts["uploaded"], counts["conflicts"]) == (1, 0)
+        assert b"DTSTART;VALUE=DATE:19900516" in server.resources[path][1]
+
+    def test_lost_state_converges(self, caldav):
+        """Test that a sync without state adopts existing events, edits included."""
+        from caldav_sync import load_state, sync_birthdays
+
+        server, csv_file, state_file = caldav
+        sync_birthdays(csv_file, server.url, state_file)
+        os.unlink(state_file)
+        path = sorted(server.resources)[0]
+        edited = b"BEGIN:VCALENDAR\r\nEND:VCALENDAR\r\n"
+        server.edit(path, edited)
+
+        counts = sync_birthdays(csv_file, server.url, state_file)
+
+        assert counts == {
+            "unchanged": 2,
+            "uploaded": 0,
+            "deleted": 0,
+            "conflicts": 1,
+            "failed": 0,
+        }
+        assert server.resources[path][1] == edited
+        state = load_state(state_file, server.url)
+        assert sorted(etag for _, etag in state.values()) == sorted(
+            etag for etag, _ in server.resources.values()
+        )
+        requests_before = len(server.requests)
+        assert sync_birthdays(csv_file, server.url, state_file)["unchanged"] == 3
+        assert len(server.requests) == requests_before
+        assert server.resources[path][1] == edited
+
+    def test_state_is_ignored_for_another_collection(self, caldav):
+        """Test that a state file only applies to the collection it was made for."""
+        from caldav_sync import load_state, save_state
+
+        _, _, state_file = caldav
+        save_state(state_file, "http://a/cal/", {"uid": ["hash", '"etag"']})
+
+        assert load_state(state_file, "http://a/cal/") == {"uid": ["hash", '"etag"']}
+        assert load_state(state_file, "http://b/cal/") == {}
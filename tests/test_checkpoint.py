@@ -0,0 +1,142 @@
+"""Tests for checkpoint.py functionality."""
+
+import os
+
+import pytest
+
+COLUMNS = ["First Name", "Middle Name", "Last Name", "Birthday", "Notes"]
+
+
+def export_lines(count):
+    """Helper function to make export lines mixing multi-line notes and line ends."""
+    for index in range(count):
+        birthday = ["1990-05-15", "", "--03-22", "1990-02-30"][index % 4]
+        notes = ['"two\r\nlines, quoted"', "", "plain", '"a\nb"'][index % 3]
+        end = "\r\n" if index % 5 else "\n"
+        name = "Dup" if index % 7 == 0 else f"Person{index}"
+        yield f"{name},,Test,{birthday},{notes}{end}"
+
+
+def read_bytes(path):
+    """Helper function to read a file's bytes."""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@pytest.fixture
+def export(write_export):
+    """A temporary directory holding an export of 300 contacts."""
+    csv_file = write_export(export_lines(300), COLUMNS)
+    return os.path.dirname(csv_file), csv_file
+
+
+class TestCheckpoint:
+    """Test cases for checkpointed, resumable runs."""
+
+    def test_resumed_calendar_matches_uninterrupted_run(self, export, monkeypatch):
+        """Test that a calendar resumed from a checkpoint is byte-identical."""
+        import create_birthday_calendar
+        from create_birthday_calendar import main, render_event
+
+        directory, csv_file = export
+        resumed_file = os.path.join(directory, "resumed.ics")
+        complete_file = os.path.join(directory, "complete.ics")
+        stamp = ["--dtstamp", "20260101T000000Z"]
+
+        calls = 0
+
+        def interrupted_render(*args, **kwargs):
+            nonlocal calls
+            calls += 1
+            if calls == 150:
+                raise KeyboardInterrupt
+            return render_event(*args, **kwargs)
+
+        monkeypatch.setattr(
+            create_birthday_calendar, "render_event", interrupted_render
+        )
+        with pytest.raises(KeyboardInterrupt):
+            main([csv_file, resumed_file, *stamp, "--checkpoint-every", "40"])
+        assert os.path.exists(resumed_file + ".checkpoint")
+        assert os.path.exists(resumed_file + ".tmp")
+
+        monkeypatch.setattr(create_birthday_calendar, "render_event", render_event)
+        main([csv_file, resumed_file, *stamp, "--resume"])
+        main([csv_file, complete_file, *stamp])
+
+        assert read_bytes(resumed_file) == read_bytes(complete_file)
+        assert sorted(os.listdir(directory)) == [
+            "complete.ics",
+            "export.csv",
+            "resumed.ics",
+        ]
+
+    def test_resumed_filter_matches_uninterrupted_run(self, export, monkeypatch):
+        """Test that a filter run resumed from a checkpoint is byte-identical."""
+        import filter_contacts
+        from checkpoint import Checkpoint
+        from filter_contacts import filter_contacts_with_birthdays, prefilter_records
+
+        directory, csv_file = export
+        resumed_file = os.path.join(directory, "resumed.csv")
+        complete_file = os.path.join(directory, "complete.csv")
+        checkpoint_file = resumed_file + ".checkpoint"
+
+        def interrupted_prefilter(file, index, progress=None):
+            # Small chunks leave quoted records open across chunk boundaries
+            chunks = prefilter_records(file, index, chunk_size=97, progress=progress)
+            for number, chunk in enumerate(chunks):
+                if number == 20:
+                    raise KeyboardInterrupt
+                yield chunk
+
+        monkeypatch.setattr(filter_contacts, "prefilter_records", interrupted_prefilter)
+        with pytest.raises(KeyboardInterrupt):
+            filter_contacts_with_birthdays(
+                csv_file,
+                resumed_file,
+                checkpoint=Checkpoint(checkpoint_file, csv_file, 5),
+            )
+
+        monkeypatch.setattr(filter_contacts, "prefilter_records", prefilter_records)
+        resumed = filter_contacts_with_birthdays(
+            csv_file,
+            resumed_file,
+            checkpoint=Checkpoint(checkpoint_file, csv_file, 5, resume=True),
+        )
+        complete = filter_contacts_with_birthdays(csv_file, complete_file)
+
+        assert resumed == complete
+        assert read_bytes(resumed_file) == read_bytes(complete_file)
+        assert not os.path.exists(checkpoint_file)
+
+    def test_changed_input_is_not_resumed(self, export, write_export):
+        """Test that a checkpoint is refused once its input has changed."""
+        from checkpoint import Checkpoint, CheckpointMismatchError
+
+        directory, csv_file = export
+        output_file = os.path.join(directory, "output.csv")
+        checkpoint = Checkpoint(output_file + ".checkpoint", csv_file, every=1)
+        with checkpoint.open_output(output_file):
+            checkpoint.save(0)
+
+        write_export(export_lines(301), COLUMNS)
+
+        with pytest.raises(CheckpointMismatchError, match="changed since"):
+            Checkpoint(output_file + ".checkpoint", csv_file, resume=True)
+
+    def test_filter_refuses_to_overwrite_backup(self, export, capsys):
+        """Test that filtering over an interrupted run requires --resume."""
+        from filter_contacts import main
+
+        _, csv_file = export
+        backup_file = csv_file + ".bak"
+        with open(csv_file + ".checkpoint", "wb"):
+            pass
+
+        with pytest.raises(SystemExit) as exit_info:
+            main([csv_file, "--backup", backup_file])
+
+        assert exit_info.value.code == 2
+        assert "continue it with --resume" in capsys.readouterr().err
+        assert not os.path.exists(backup_file)
@@ -0,0 +1,148 @@
+"""Tests for contact_store.py functionality."""
+
+import os
+
+import pytest
+
+COLUMNS = ["First Name", "Middle Name", "Last Name", "Birthday", "Labels"]
+
+
+def read_events(path):
+    """Helper function to read a calendar's events without their DTSTAMP."""
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.read().split("\n")
+    return [line for line in lines if not line.startswith("DTSTAMP:")]
+
+
+CONTACTS = [
+    ["John", "", "Doe", "1990-05-15", "Family"],
+    ["Jane", "", "Smith", "1992-08-20", ""],
+    ["Bob", "", "Johnson", "--03-22", "Work"],
+    ["John", "", "Doe", "1970-01-01", ""],
+]
+
+
+@pytest.fixture
+def store(write_export):
+    """A temporary export of CONTACTS, and a store and calendar file beside it."""
+    csv_file = write_export(CONTACTS, COLUMNS)
+    directory = os.path.dirname(csv_file)
+    return (
+        csv_file,
+        os.path.join(directory, "contacts.db"),
+        os.path.join(directory, "birthdays.ics"),
+    )
+
+
+class TestContactStore:
+    """Test cases for the SQLite contact store."""
+
+    def test_import_is_incremental(self, store, write_export):
+        """Test that a second import only touches changed and removed contacts."""
+        from contact_store import count_stored_contacts, import_contacts
+
+        csv_file, store_file, _ = store
+        assert import_contacts(store_file, csv_file, batch_size=3) == {
+            "inserted": 4,
+            "updated": 0,
+            "unchanged": 0,
+            "deleted": 0,
+        }
+
+        write_export(
+            [
+                ["John", "", "Doe", "1990-05-16", "Family"],
+                ["Jane", "", "Smith", "1992-08-20", "Work"],
+                ["Bob", "", "Johnson", "--03-22", "Work"],
+                ["Amy", "", "Brown", "1988-11-30", ""],
+            ],
+            COLUMNS,
+        )
+        counts = import_contacts(store_file, csv_file, batch_size=3)
+
+        assert counts == {"inserted": 1, "updated": 2, "unchanged": 1, "deleted": 1}
+        assert count_stored_contacts(store_file) == 4
+
+    def test_calendar_from_store_matches_export(self, store):
+        """Test that the store renders the same calendar as the export."""
+        from contact_store import import_contacts
+        from create_birthday_calendar import create_birthday_ics
+
+        csv_file, store_file, ics_file = store
+        import_contacts(store_file, csv_file)
+
+        for sort in (False, True):
+            create_birthday_ics(csv_file, ics_file, sort=sort)
+            from_export = read_events(ics_file)
+            create_birthday_ics(csv_file, ics_file, sort=sort, store=store_file)
+            if sort:
+                assert read_events(ics_file) == from_export
+            else:
+                assert sorted(read_events(ics_file)) == sorted(from_export)
+
+    def test_birthdays_on_uses_month_day(self, store):
+        """Test that birthdays are looked up by month and day."""
+        from contact_store import birthdays_on, import_contacts
+
+        csv_file, store_file, _ = store
+        import_contacts(store_file, csv_file)
+
+        assert [event.full_name for event in birthdays_on(store_file, 5)] == [
+            "John Doe"
+        ]
+        (event,) = birthdays_on(store_file, 3, 22)
+        assert event.year_known is False
+        assert event.labels == "Work"
+        assert birthdays_on(store_file, 3, 23) == []
+
+    def test_stats_read_the_store(self, store, capsys):
+        """Test that stats count contacts from the store."""
+        from contact_stats import print_stats
+        from contact_store import import_contacts
+
+        csv_file, store_file, ics_file = store
+        import_contacts(store_file, csv_file)
+        os.unlink(csv_file)
+
+        print_stats(csv_file, ics_file=ics_file, store=store_file)
+
+        assert "Total contacts with birthdays: 4" in capsys.readouterr().out
+
+    def test_missing_store_is_not_created(self, store):
+        """Test that reading a missing store fails without creating it."""
+        from contact_store import birthdays_on, count_stored_contacts
+        from create_birthday_calendar import main
+
+        csv_file, store_file, ics_file = store
+        main([csv_file, ics_file])
+        with open(ics_file, "rb") as f:
+            calendar = f.read()
+
+        with pytest.raises(SystemExit) as exit_info:
+            main([csv_file, ics_file, "--store", store_file])
+        with pytest.raises(FileNotFoundError):
+            count_stored_contacts(store_file)
+        with pytest.raises(FileNotFoundError):
+            birthdays_on(store_file, 5)
+
+        assert exit_info.value.code == 1
+        assert not os.path.exists(store_file)
+        with open(ics_file, "rb") as f:
+            assert f.read() == calendar
+
+    def test_reads_open_the_store_read_only(self, store):
+        """Test that a store opened for reading cannot be written to."""
+        import sqlite3
+
+        from contact_store import count_stored_contacts, import_contacts, open_store
+
+        csv_file, store_file, _ = store
+        import_contacts(store_file, csv_file)
+
+        connection = open_store(store_file, create=False)
+        try:
+            with pytest.raises(sqlite3.OperationalError, match="readonly"):
+                connection.execute("DELETE FROM contacts")
+        finally:
+            connection.close()
+        assert count_stored_contacts(store_file) == 4
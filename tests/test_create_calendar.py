@@ -508,3 +508,397 @@ class TestCreateCalendar:
         finally:
             os.unlink(input_file)
             os.unlink(output_file)
+
+    def test_create_expanded_ics(self):
+        """Test expanding birthdays into concrete yearly instances."""
+        padding = [""] * 10
+        contacts = [
+            ["John", "", "Doe"] + padding + ["1990-05-15"],
+            ["Leap", "", "Person"] + padding + ["1996-02-29"],
+            ["Bob", "", "Johnson"] + padding + ["--03-22"],
+            ["Baby", "", "Born"] + padding + ["2027-07-01"],
+        ]
+
+        input_file = create_test_csv(contacts)
+        output_file = tempfile.NamedTemporaryFile(delete=False, suffix=".ics").name
+
+        try:
+            import sys
+
+            sys.path.insert(0, ".")
+            from create_birthday_calendar import create_expanded_ics
+
+            events_created = create_expanded_ics(
+                input_file, output_file, 2026, 2028, with_ages=True
+            )
+
+            with open(output_file, "r", encoding="utf-8") as f:
+                content = f.read()
+
+            # 3 years each for John, Leap and Bob; only 2028 for Baby
+            assert events_created == 10
+            assert content.count("BEGIN:VEVENT") == 10
+            assert "RRULE" not in content
+            assert content.startswith("BEGIN:VCALENDAR")
+            assert content.endswith("END:VCALENDAR")
+
+            assert "DTSTART;VALUE=DATE:20260515" in content
+            assert "DTSTART;VALUE=DATE:20280515" in content
+            assert "🎂 John Doe's Birthday (turns 36)" in content
+            assert "🎂 John Doe's Birthday (turns 38)" in content
+
+            assert "DTSTART;VALUE=DATE:20270228" in content
+            assert "DTSTART;VALUE=DATE:20280229" in content
+            assert "🎂 Leap Person's Birthday (turns 31)" in content
+
+            assert "🎂 Bob Johnson's Birthday\n" in content
+            assert "DTSTART;VALUE=DATE:20270322" in content
+
+            assert "DTSTART;VALUE=DATE:20270701" not in content
+            assert "🎂 Baby Born's Birthday (turns 1)" in content
+
+            uids = [line for line in content.split("\n") if line.startswith("UID:")]
+            assert len(set(uids)) == 10
+
+        finally:
+            os.unlink(input_file)
+            os.unlink(output_file)
+
+    def test_expanded_yearless_leap_day(self):
+        """Test that a --02-29 birthday is kept and falls on Feb 28 off leap years."""
+        padding = [""] * 10
+        contacts = [["Leap", "", "Person"] + padding + ["--02-29"]]
+
+        input_file = create_test_csv(contacts)
+        output_file = tempfile.NamedTemporaryFile(delete=False, suffix=".ics").name
+
+        try:
+            import calendar
+
+            from create_birthday_calendar import create_expanded_ics, parse_birthday
+
+            birthday_date = parse_birthday("--02-29")
+            assert (birthday_date.month, birthday_date.day) == (2, 29)
+            assert calendar.isleap(birthday_date.year)
+
+            assert create_expanded_ics(input_file, output_file, 2026, 2028) == 3
+            with open(output_file, "r", encoding="utf-8") as f:
+                content = f.read()
+            assert "DTSTART;VALUE=DATE:20260228" in content
+            assert "DTSTART;VALUE=DATE:20270228" in content
+            assert "DTSTART;VALUE=DATE:20280229" in content
+
+        finally:
+            os.unlink(input_file)
+            os.unlink(output_file)
+
+    def test_create_sorted_ics(self):
+        """Test that sorted output orders events by month-day, then name."""
+        padding = [""] * 10
+        contacts = [
+            ["Zoe", "", "Adams"] + padding + ["1990-05-15"],
+            ["Bob", "", "Johnson"] + padding + ["--03-22"],
+            ["Amy", "", "Brown"] + padding + ["1985-05-15"],
+            ["Carl", "", "Davis"] + padding + ["2001-12-01"],
+            ["Dan", "", "Evans"] + padding + ["1970-01-09"],
+        ]
+
+        input_file = create_test_csv(contacts)
+        output_file = tempfile.NamedTemporaryFile(delete=False, suffix=".ics").name
+        spilled_file = tempfile.NamedTemporaryFile(delete=False, suffix=".ics").name
+
+        try:
+            import sys
+
+            sys.path.insert(0, ".")
+            from create_birthday_calendar import create_birthday_ics
+
+            create_birthday_ics(input_file, output_file, sort=True)
+            # A tiny budget forces the external merge path
+            create_birthday_ics(input_file, spilled_file, sort=True, memory_budget=1)
+
+            with open(output_file, "r", encoding="utf-8") as f:
+                content = f.read()
+            with open(spilled_file, "r", encoding="utf-8") as f:
+                spilled = f.read()
+
+            summaries = [
+                line
+                for line in content.split("\n")
+                if line.startswith("SUMMARY:🎂") and line.endswith("Birthday")
+            ]
+            assert summaries == [
+                "SUMMARY:🎂 Dan Evans's Birthday",
+                "SUMMARY:🎂 Bob Johnson's Birthday",
+                "SUMMARY:🎂 Amy Brown's Birthday",
+                "SUMMARY:🎂 Zoe Adams's Birthday",
+                "SUMMARY:🎂 Carl Davis's Birthday",
+            ]
+            strip_stamps = [
+                line for line in spilled.split("\n") if not line.startswith("DTSTAMP")
+            ]
+            assert strip_stamps == [
+                line for line in content.split("\n") if not line.startswith("DTSTAMP")
+            ]
+
+        finally:
+            os.unlink(input_file)
+            os.unlink(output_file)
+            os.unlink(spilled_file)
+
+    def test_event_columns_in_one_pass(self):
+        """Test that birthdays, anniversaries and custom events are all extracted."""
+        temp_file = tempfile.NamedTemporaryFile(
+            mode="w", delete=False, suffix=".csv", newline=""
+        )
+        writer = csv.writer(temp_file)
+        writer.writerow(
+            [
+                "First Name",
+                "Middle Name",
+                "Last Name",
+                "Birthday",
+                "Event 1 - Label",
+                "Event 1 - Value",
+                "Event 2 - Type",
+                "Event 2 - Value",
+            ]
+        )
+        writer.writerow(
+            ["John", "", "Doe", "1990-05-15", "Anniversary", "2015-06-20", "", ""]
+        )
+        writer.writerow(["Jane", "", "Smith", "", "Name day", "--07-26", "", ""])
+        writer.writerow(["Bob", "", "Lee", "", "", "", "* Other", "2000-13-01"])
+        temp_file.close()
+        output_file = temp_file.name.replace(".csv", ".ics")
+
+        try:
+            from create_birthday_calendar import create_birthday_ics, iter_dates
+            from validation import ValidationReport
+
+            report = ValidationReport()
+            dates = [
+                (name, kind, occasion)
+                for name, *_, kind, occasion in iter_dates(temp_file.name, report)
+            ]
+            assert dates == [
+                ("John Doe", "birthday", ""),
+                ("John Doe", "anniversary", "Anniversary"),
+                ("Jane Smith", "event", "Name day"),
+            ]
+            assert [error["reason"] for error in report.errors] == ["invalid_date"]
+
+            assert create_birthday_ics(temp_file.name, output_file) == 3
+            with open(output_file, "r", encoding="utf-8") as f:
+                content = f.read()
+            assert "SUMMARY:🎂 John Doe's Birthday" in content
+            assert "SUMMARY:💍 John Doe's Anniversary" in content
+            assert "DTSTART;VALUE=DATE:20150620" in content
+            assert "SUMMARY:📅 Jane Smith: Name day" in content
+            uids = [line for line in content.split("\n") if line.startswith("UID:")]
+            assert len(set(uids)) == 3
+
+        finally:
+            os.unlink(temp_file.name)
+            if os.path.exists(output_file):
+                os.unlink(output_file)
+
+    def test_fold_line(self):
+        """Test that long lines are folded at 75 octets without splitting characters."""
+        from create_birthday_calendar import fold_line
+
+        assert fold_line("SUMMARY:short") == "SUMMARY:short"
+        line = "SUMMARY:" + "Zoë 🎂 " * 40
+        folded = fold_line(line)
+
+        parts = folded.split("\r\n")
+        assert len(parts) > 1
+        assert all(len(part.encode("utf-8")) <= 75 for part in parts)
+        assert all(part.startswith(" ") for part in parts[1:])
+        assert folded.replace("\r\n ", "") == line
+
+    def test_output_profiles(self, capsys):
+        """Test that compact and minimal profiles shrink the calendar."""
+        contacts = [
+            ["John", "", "Doe", "", "", "", "", "", "", "", "", "", "", "1990-05-15"],
+            ["Jane", "", "Smith", "", "", "", "", "", "", "", "", "", "", "--08-20"],
+        ]
+        input_file = create_test_csv(contacts)
+        output_file = input_file.replace(".csv", ".ics")
+
+        try:
+            from create_birthday_calendar import create_birthday_ics
+
+            sizes = {}
+            for profile, alarms in [
+                ("full", True),
+                ("compact", True),
+                ("compact", False),
+                ("minimal", True),
+            ]:
+                create_birthday_ics(
+                    input_file, output_file, profile=profile, alarms=alarms
+                )
+                with open(output_file, "rb") as f:
+                    content = f.read()
+                sizes[profile, alarms] = len(content)
+                if profile == "full":
+                    full_size = len(content)
+                    continue
+
+                output = capsys.readouterr().out
+                saved = full_size - len(content)
+                assert f"{saved} bytes" in output
+                assert content.endswith(b"END:VCALENDAR\r\n")
+                assert b"\n" not in content.replace(b"\r\n", b"")
+                text = content.decode("utf-8")
+                assert "SUMMARY:🎂 John Doe's Birthday\r\n" in text
+                assert "RRULE:FREQ=YEARLY" in text
+                assert "DTEND" not in text and "ACTION:EMAIL" not in text
+                assert ("ACTION:DISPLAY" in text) == (profile == "compact" and alarms)
+                assert ("DESCRIPTION:Birthday of" in text) == (profile == "compact")
+
+            assert (
+                sizes["full", True]
+                > sizes["compact", True]
+                > sizes["compact", False]
+                > sizes["minimal", True]
+            )
+
+        finally:
+            os.unlink(input_file)
+            if os.path.exists(output_file):
+                os.unlink(output_file)
+
+    def test_reproducible_output(self, capsys, monkeypatch):
+        """Test that reproducible runs only rewrite a calendar if an event changed."""
+        contacts = [
+            ["Jane", "", "Smith", "", "", "", "", "", "", "", "", "", "", "--08-20"],
+            ["John", "", "Doe", "", "", "", "", "", "", "", "", "", "", "1990-05-15"],
+        ]
+        input_file = create_test_csv(contacts)
+        output_file = input_file.replace(".csv", ".ics")
+        changed_file = None
+
+        try:
+            from create_birthday_calendar import main
+
+            monkeypatch.setenv("SOURCE_DATE_EPOCH", "1767225600")
+            main([input_file, output_file, "--reproducible"])
+            with open(output_file, "rb") as f:
+                first = f.read()
+            os.utime(output_file, (0, 0))
+
+            main([input_file, output_file, "--reproducible"])
+
+            output = capsys.readouterr().out
+            assert "Calendar unchanged" in output
+            assert os.path.getmtime(output_file) == 0
+            assert not os.path.exists(output_file + ".tmp")
+            text = first.decode("utf-8")
+            assert text.count("DTSTAMP:20260101T000000Z") == 2
+            assert text.index("John Doe") < text.index("Jane Smith")
+
+            # A rewritten export with the same contacts only changes DTSTAMP
+            monkeypatch.delenv("SOURCE_DATE_EPOCH")
+            os.utime(input_file, (1798761600, 1798761600))
+            main([input_file, output_file, "--reproducible"])
+            assert "Calendar unchanged" in capsys.readouterr().out
+            with open(output_file, "rb") as f:
+                assert f.read() == first
+
+            amy = ["Amy", "", "Brown", *[""] * 10, "1988-11-30"]
+            changed_file = create_test_csv([*contacts, amy])
+            stamp = ["--dtstamp", "20270101T000000Z"]
+            main([changed_file, output_file, "--reproducible", *stamp])
+            assert "Calendar saved as" in capsys.readouterr().out
+            with open(output_file, "rb") as f:
+                assert f.read().count(b"DTSTAMP:20270101T000000Z") == 3
+
+        finally:
+            os.unlink(input_file)
+            if changed_file is not None:
+                os.unlink(changed_file)
+            if os.path.exists(output_file):
+                os.unlink(output_file)
+
+    def test_render_ics_in_memory(self, capsys, monkeypatch):
+        """Test that render_ics returns the calendar's bytes without any file."""
+        contacts = [
+            ["Jane", "", "Smith", "", "", "", "", "", "", "", "", "", "", "--08-20"],
+            ["John", "", "Doe", "", "", "", "", "", "", "", "", "", "", "1990-05-15"],
+            ["Bad", "", "Date", "", "", "", "", "", "", "", "", "", "", "1990-02-30"],
+        ]
+        input_file = create_test_csv(contacts)
+        output_file = input_file.replace(".csv", ".ics")
+
+        try:
+            import builtins
+            import io
+
+            from create_birthday_calendar import create_birthday_ics, render_ics
+            from validation import ValidationReport
+
+            stamp = "20260101T000000Z"
+            create_birthday_ics(input_file, output_file, sort=True, dtstamp=stamp)
+            with open(output_file, "rb") as f:
+                expected = f.read()
+            with open(input_file, "rb") as f:
+                data = f.read()
+            capsys.readouterr()
+
+            def no_files(*args, **kwargs):
+                raise AssertionError("render_ics opened a file")
+
+            monkeypatch.setattr(builtins, "open", no_files)
+            report = ValidationReport()
+            rendered = render_ics(data, sort=True, dtstamp=stamp, report=report)
+            assert rendered == expected
+            text = io.StringIO(data.decode("utf-8"))
+            assert render_ics(text, sort=True, dtstamp=stamp) == expected
+            assert capsys.readouterr().out == ""
+            assert report.valid == 2
+            assert [error["reason"] for error in report.errors] == ["invalid_date"]
+
+        finally:
+            os.unlink(input_file)
+            if os.path.exists(output_file):
+                os.unlink(output_file)
+
+    def test_render_ics_from_pipe(self):
+        """Test that render_ics reads exports from streams that cannot seek."""
+        import io
+
+        from create_birthday_calendar import render_ics
+
+        data = b"First Name,Middle Name,Last Name,Birthday\nJohn,,Doe,1990-05-15\n"
+        stamp = "20260101T000000Z"
+        expected = render_ics(data, dtstamp=stamp)
+
+        for text in (False, True):
+            read_end, write_end = os.pipe()
+            os.write(write_end, data)
+            os.close(write_end)
+            with open(read_end, "rb") as pipe:
+                assert not pipe.seekable()
+                stream = io.TextIOWrapper(pipe, encoding="utf-8") if text else pipe
+                assert render_ics(stream, dtstamp=stamp) == expected
+
+    def test_render_ics_in_threads(self):
+        """Test that concurrent renders of different exports do not mix."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        from create_birthday_calendar import render_ics
+
+        header = "First Name,Middle Name,Last Name,Birthday\n"
+        uploads = []
+        for index in range(16):
+            row = f"Person{index},,Test,1990-{index % 12 + 1:02d}-15\n"
+            uploads.append((header + row * 200).encode("utf-8"))
+
+        def render(data):
+            return render_ics(data, profile="compact", dtstamp="20260101T000000Z")
+
+        expected = [render(data) for data in uploads]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            assert list(pool.map(render, uploads * 4)) == expected * 4
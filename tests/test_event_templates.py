@@ -0,0 +1,112 @@
+"""Tests for event_templates.py functionality."""
+
+import json
+import os
+import tempfile
+from datetime import date
+
+import pytest
+
+
+class TestEventTemplates:
+    """Test cases for compiled event templates."""
+
+    def test_default_templates_match_english_wording(self):
+        """Test that the default templates give the usual English texts."""
+        from event_templates import DEFAULT_TEMPLATES
+
+        assert DEFAULT_TEMPLATES.render("John Doe") == (
+            "🎂 John Doe's Birthday",
+            "Birthday of John Doe - Remember to call and congratulate!",
+            "Today is John Doe's Birthday! 🎂",
+            "🎂 John Doe's Birthday!",
+            "Don't forget to call John Doe today to wish them a happy birthday! 🎂",
+        )
+        assert DEFAULT_TEMPLATES.render("John Doe", 36)[0] == (
+            "🎂 John Doe's Birthday (turns 36)"
+        )
+
+    def test_names_and_literals_are_escaped(self):
+        """Test that ICS special characters are escaped in names and wording."""
+        from event_templates import load_templates
+
+        templates = load_templates("de")
+
+        assert templates.render("Doe, John; Jr")[0] == (
+            "🎂 Geburtstag von Doe\\, John\\; Jr"
+        )
+        assert templates.render("A")[4] == (
+            "Vergiss nicht\\, A heute anzurufen und zu gratulieren! 🎂"
+        )
+
+    def test_custom_template_file(self):
+        """Test that a JSON file overrides some texts of a locale."""
+        from event_templates import load_templates
+
+        with tempfile.NamedTemporaryFile(
+            mode="w", delete=False, suffix=".json", encoding="utf-8"
+        ) as f:
+            json.dump({"title": "{name}", "summary": "Call {title}! {{not a slot}}"}, f)
+
+        try:
+            templates = load_templates("en", f.name)
+            assert templates.render("Jane")[:2] == (
+                "Call Jane! {not a slot}",
+                "Birthday of Jane - Remember to call and congratulate!",
+            )
+
+        finally:
+            os.unlink(f.name)
+
+    def test_templates_per_event_kind(self):
+        """Test that each kind of event has its own templates, overridable by kind."""
+        from event_templates import load_templates
+
+        with tempfile.NamedTemporaryFile(
+            mode="w", delete=False, suffix=".json", encoding="utf-8"
+        ) as f:
+            json.dump({"event": {"title": "{occasion}: {name}"}}, f)
+
+        try:
+            templates = load_templates("en", f.name)
+            assert templates.kinds["anniversary"]("Jane", 10)[0] == (
+                "💍 Jane's Anniversary (10 years)"
+            )
+            assert templates.kinds["event"]("Jane", None, "Name day, Saint")[0] == (
+                "📅 Name day\\, Saint: Jane"
+            )
+            assert templates.render("Jane")[0] == "🎂 Jane's Birthday"
+
+        finally:
+            os.unlink(f.name)
+
+    @pytest.mark.parametrize(
+        "templates",
+        [
+            {"summary": "{nickname}"},
+            {"title": "{title}"},
+            {"summary": "{name.__class__}"},
+            {"summary": "{name!r}"},
+            {"subject": "{name}"},
+            {"anniversary": {"subject": "{name}"}},
+        ],
+    )
+    def test_invalid_templates_are_rejected(self, templates):
+        """Test that unknown placeholders and keys fail when compiling."""
+        from event_templates import LOCALES, EventTemplates
+
+        with pytest.raises(ValueError):
+            EventTemplates({**LOCALES["en"], **templates})
+
+    def test_render_event_with_locale(self):
+        """Test that events are rendered with the chosen locale."""
+        from create_birthday_calendar import BirthdayEvent, render_event
+        from event_templates import load_templates
+
+        event = BirthdayEvent("uid", "hash", "Jean Dupont", date(1990, 5, 15), True)
+        lines = render_event(event, date(2026, 5, 15), 36, load_templates("fr"))
+
+        assert "SUMMARY:🎂 Anniversaire de Jean Dupont (36 ans)" in lines
+        assert (
+            "SUMMARY:Aujourd'hui : Anniversaire de Jean Dupont (36 ans) ! 🎂" in lines
+        )
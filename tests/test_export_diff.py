@@ -0,0 +1,100 @@
+"""Tests for export_diff.py functionality."""
+
+import os
+import tempfile
+
+import pytest
+
+HEADER = "First Name,Middle Name,Last Name,Birthday,Event 1 - Label,Event 1 - Value\n"
+
+OLD = [
+    "Ann,,Lee,1990-05-15,Anniversary,2015-06-01\n",
+    "Bob,,Jones,--03-22,,\n",
+    "Dup,,Test,1980-01-01,,\n",
+    "Dup,,Test,1981-01-01,,\n",
+    "Gone,,Away,1970-07-07,,\n",
+]
+
+NEW = [
+    "Bob,,Jones,1985-03-22,,\n",
+    "Ann,,Lee,1990-05-15,Anniversary,2016-06-01\n",
+    "Dup,,Test,1980-01-01,,\n",
+    "Dup,,Test,1981-01-01,,\n",
+    "Dup,,Test,1982-01-01,,\n",
+    "New,,Comer,2000-02-02,,\n",
+    "Bad,,Date,1990-02-30,,\n",
+]
+
+
+@pytest.fixture
+def exports():
+    """Paths of an old and a new export of the same contacts."""
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for name, rows in (("old.csv", OLD), ("new.csv", NEW)):
+            path = os.path.join(directory, name)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(HEADER + "".join(rows))
+            paths.append(path)
+        yield paths
+
+
+class TestExportDiff:
+    """Test cases for the diff between two exports."""
+
+    def test_hash_join_and_sort_merge_agree(self, exports):
+        """Test that both methods find the same added, removed and changed dates."""
+        from export_diff import diff_exports
+
+        anniversary = ("Ann Lee\nanniversary\nAnniversary", 1)
+        expected = {
+            ("changed", ("Bob Jones", 1), "--03-22", "1985-03-22"),
+            ("changed", anniversary, "2015-06-01", "2016-06-01"),
+            ("added", ("Dup Test", 3), None, "1982-01-01"),
+            ("added", ("New Comer", 1), None, "2000-02-02"),
+            ("removed", ("Gone Away", 1), "1970-07-07", None),
+        }
+        method, changes = diff_exports(*exports)
+        assert method == "hash join"
+        assert set(changes) == expected
+
+        method, changes = diff_exports(*exports, sort_merge=True)
+        assert method == "sort-merge"
+        changes = list(changes)
+        assert set(changes) == expected
+        assert [change.key for change in changes] == sorted(
+            change.key for change in changes
+        )
+
+    def test_falls_back_to_sort_merge(self, exports):
+        """Test that an old export too big for the budget is sorted on disk."""
+        from export_diff import diff_exports
+        from validation import ValidationReport
+
+        reports = ValidationReport(), ValidationReport()
+        method, changes = diff_exports(*exports, memory_budget=1000, reports=reports)
+
+        assert method == "sort-merge"
+        assert len(list(changes)) == 5
+        assert reports[0].valid == 6
+        assert [error["reason"] for error in reports[1].errors] == ["invalid_date"]
+
+    def test_command_output(self, exports, capsys):
+        """Test that the command lists the changes and exits with 1 if any."""
+        from export_diff import main
+
+        old_file, new_file = exports
+        with pytest.raises(SystemExit) as exit_info:
+            main([old_file, new_file])
+
+        assert exit_info.value.code == 1
+        output = capsys.readouterr().out
+        assert "~ Bob Jones: --03-22 -> 1985-03-22" in output
+        assert "~ Ann Lee [Anniversary]: 2015-06-01 -> 2016-06-01" in output
+        assert "+ Dup Test (#3): 1982-01-01" in output
+        assert "- Gone Away: 1970-07-07" in output
+        assert "2 added, 1 removed, 2 changed (hash join)" in output
+        assert "Skipped 1 unreadable dates or rows in" in output
+
+        main([old_file, old_file])
+        assert "0 added, 0 removed, 0 changed" in capsys.readouterr().out
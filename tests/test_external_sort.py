@@ -0,0 +1,109 @@
+"""Tests for external_sort.py functionality."""
+
+import os
+import random
+import tempfile
+
+
+class TestExternalSort:
+    """Test cases for the memory-budgeted external merge sort."""
+
+    def setup_method(self):
+        import sys
+
+        sys.path.insert(0, ".")
+
+    def test_sorts_in_memory_within_budget(self):
+        """Test that small inputs are sorted without spilling to disk."""
+        from external_sort import external_sort
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            records = [(3, "c"), (1, "a"), (2, "b")]
+            result = list(external_sort(records, key=lambda r: r, temp_dir=temp_dir))
+
+            assert result == [(1, "a"), (2, "b"), (3, "c")]
+            assert os.listdir(temp_dir) == []
+
+    def test_spills_runs_and_merges(self):
+        """Test that inputs over the budget are merged back in order."""
+        from external_sort import external_sort
+
+        random.seed(42)
+        records = [(random.randint(1, 12), f"name {i}") for i in range(2000)]
+        sorted_records = external_sort(records, key=lambda r: r, memory_budget=4096)
+
+        assert list(sorted_records) == sorted(records)
+
+    def test_merges_in_several_passes(self):
+        """Test that more runs than the fan-in are merged in several passes."""
+        from external_sort import external_sort
+
+        records = [(i % 97, i) for i in range(1000)]
+        sorted_records = external_sort(
+            records, key=lambda r: r, memory_budget=512, fan_in=3
+        )
+
+        assert list(sorted_records) == sorted(records)
+
+    def test_temporary_runs_are_removed(self):
+        """Test that run files are cleaned up once the merge is done."""
+        from external_sort import external_sort
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            records = [(i % 7, i) for i in range(500)]
+            result = list(
+                external_sort(
+                    records, key=lambda r: r, memory_budget=256, temp_dir=temp_dir
+                )
+            )
+
+            assert result == sorted(records)
+            assert os.listdir(temp_dir) == []
+
+    def test_nested_records_are_measured(self):
+        """Test that tuples inside a record count towards its size."""
+        from external_sort import record_size
+
+        inner = ("a name", "another field")
+        assert record_size((1, inner)) > record_size((1,)) + record_size(inner)
+
+    def test_sorted_calendar_stays_within_budget(self):
+        """Test that the traced peak of a sorted calendar run stays in the budget."""
+        import tracemalloc
+
+        from create_birthday_calendar import create_birthday_ics
+
+        budget = 256 * 1024
+
+        def traced_peak(directory, count):
+            csv_file = os.path.join(directory, f"export{count}.csv")
+            with open(csv_file, "w", encoding="utf-8") as f:
+                f.write("First Name,Middle Name,Last Name,Birthday\n")
+                for i in range(count):
+                    birthday = f"19{i % 90 + 10}-{i % 12 + 1:02d}-{i % 28 + 1:02d}"
+                    f.write(f"Person{i % 1000},,Test,{birthday}\n")
+            output_file = os.path.join(directory, "birthdays.ics")
+            tracemalloc.start()
+            try:
+                create_birthday_ics(
+                    csv_file, output_file, sort=True, memory_budget=budget
+                )
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        with tempfile.TemporaryDirectory() as directory:
+            # What a run holds whatever the size of the export
+            overhead = traced_peak(directory, 10)
+            peak = traced_peak(directory, 3000)
+
+        assert peak - overhead <= budget
+
+    def test_parse_size(self):
+        """Test parsing human readable memory budgets."""
+        from external_sort import parse_size
+
+        assert parse_size("1024") == 1024
+        assert parse_size("512K") == 512 * 1024
+        assert parse_size("64M") == 64 * 1024**2
+        assert parse_size("1.5GB") == int(1.5 * 1024**3)
@@ -405,3 +405,104 @@ class TestFilterContacts:
         finally:
             os.unlink(input_file)
             os.unlink(output_file)
+
+    def test_filter_handles_quoted_fields(self):
+        """Test that quoted commas and multi-line fields survive the prefilter."""
+        padding = [""] * 12
+        contacts = [
+            ["Doe, John"] + padding + ["1990-05-15"],
+            ["Jane"] + padding + [""],
+            ["Bob"] + padding + ["", "Line 1\nLine 2"],  # Multi-line notes
+            ["Multi\nLine"] + padding + ["--03-22"],
+            ['Quote "Q"'] + padding + ["1985-12-01"],
+        ]
+
+        input_file = create_test_csv(contacts)
+        output_file = tempfile.NamedTemporaryFile(delete=False, suffix=".csv").name
+
+        try:
+            import sys
+
+            sys.path.insert(0, ".")
+            from filter_contacts import filter_contacts_with_birthdays
+
+            kept, removed = filter_contacts_with_birthdays(input_file, output_file)
+
+            assert kept == 3
+            assert removed == 2
+
+            with open(output_file, "r", newline="") as f:
+                rows = list(csv.reader(f))
+
+            assert [row[0] for row in rows[1:]] == [
+                "Doe, John",
+                "Multi\nLine",
+                'Quote "Q"',
+            ]
+
+        finally:
+            os.unlink(input_file)
+            os.unlink(output_file)
+
+    def test_prefilter_defers_ambiguous_records(self):
+        """Test that the byte-level prefilter only rejects records it can be sure of."""
+        import io
+        import sys
+
+        sys.path.insert(0, ".")
+        from filter_contacts import prefilter_records
+
+        data = (
+            b"John,,Doe,\r\n"
+            b"Jane,,Doe,  \r\n"
+            b"Short,Row\r\n"
+            b"Bob,,Doe,1990-05-15\r\n"
+            b'"Doe, Ann",,,\r\n'
+            b'Multi,"Line 1\r\nLine 2",,\r\n'
+            b"Lone,,CR,\rx\r\n"
+            b'Ann,,Lee,,"Note, long\r\nand wrapped"\r\n'
+            b'Eve,,Lee,1990-01-01,"Note"\r\n'
+        )
+
+        chunks = list(prefilter_records(io.BytesIO(data), 3, chunk_size=16))
+        rejected = sum(count for count, _ in chunks)
+        candidates = [record for _, records in chunks for record in records]
+
+        assert rejected == 4
+        assert candidates == [
+            b"Bob,,Doe,1990-05-15\r",
+            b'"Doe, Ann",,,\r',
+            b'Multi,"Line 1\r\nLine 2",,\r',
+            b"Lone,,CR,\rx\r",
+            b'Eve,,Lee,1990-01-01,"Note"\r',
+        ]
+
+    def test_stray_quotes_do_not_merge_records(self):
+        """Test that inch marks inside unquoted fields do not swallow rows."""
+        import sys
+
+        sys.path.insert(0, ".")
+        from filter_contacts import filter_contacts_with_birthdays
+
+        input_file = tempfile.NamedTemporaryFile(delete=False, suffix=".csv").name
+        output_file = tempfile.NamedTemporaryFile(delete=False, suffix=".csv").name
+        with open(input_file, "wb") as f:
+            f.write(
+                b"First Name,Middle Name,Last Name,Birthday,Notes\r\n"
+                b'Ann,,Lee,,has a 5" screen\r\n'
+                b"Bob,,Ray,1990-05-15,\r\n"
+                b"Cy,,Ng,--03-22,\r\n"
+                b'Dee,,Fox,,6" tall\r\n'
+            )
+
+        try:
+            kept, removed = filter_contacts_with_birthdays(input_file, output_file)
+
+            assert (kept, removed) == (2, 2)
+            with open(output_file, "r", newline="") as f:
+                rows = list(csv.reader(f))
+            assert [row[0] for row in rows[1:]] == ["Bob", "Cy"]
+
+        finally:
+            os.unlink(input_file)
+            os.unlink(output_file)
@@ -0,0 +1,130 @@
+"""Tests for group_calendars.py functionality."""
+
+import csv
+import os
+import tempfile
+
+
+def create_test_csv(rows, label_column="Labels"):
+    """Helper function to create a temporary CSV file with labelled contacts."""
+    temp_file = tempfile.NamedTemporaryFile(
+        mode="w", delete=False, suffix=".csv", newline=""
+    )
+    writer = csv.writer(temp_file)
+    writer.writerow(
+        ["First Name", "Middle Name", "Last Name", "Birthday", label_column]
+    )
+    writer.writerows(rows)
+    temp_file.close()
+    return temp_file.name
+
+
+CONTACTS = [
+    ["John", "", "Doe", "1990-05-15", "* myContacts ::: Family"],
+    ["Jane", "", "Smith", "1992-08-20", "* myContacts ::: Work ::: Family"],
+    ["Bob", "", "Johnson", "--03-22", "Work"],
+    ["Alice", "", "Wilson", "1985-01-01", ""],
+    ["Carl", "", "Davis", "", "Family"],
+]
+
+
+def summaries(path):
+    """Helper function to list the event titles of a calendar."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [
+            line[len("SUMMARY:🎂 ") :]
+            for line in f.read().split("\n")
+            if line.startswith("SUMMARY:🎂") and line.endswith("Birthday")
+        ]
+
+
+class TestGroupCalendars:
+    """Test cases for per-label calendar fan-out."""
+
+    def test_one_calendar_per_label(self):
+        """Test that every label gets a calendar with its contacts."""
+        from group_calendars import create_group_calendars
+
+        input_file = create_test_csv(CONTACTS)
+
+        try:
+            with tempfile.TemporaryDirectory() as output_dir:
+                counts = create_group_calendars(input_file, output_dir)
+
+                assert counts == {"myContacts": 2, "Family": 2, "Work": 2}
+                assert sorted(os.listdir(output_dir)) == [
+                    "Family.ics",
+                    "Work.ics",
+                    "myContacts.ics",
+                ]
+                family = os.path.join(output_dir, "Family.ics")
+                assert summaries(family) == [
+                    "John Doe's Birthday",
+                    "Jane Smith's Birthday",
+                ]
+                with open(family, "r", encoding="utf-8") as f:
+                    content = f.read()
+                assert "X-WR-CALNAME:Family" in content
+                assert content.endswith("END:VCALENDAR")
+
+        finally:
+            os.unlink(input_file)
+
+    def test_include_and_exclude_labels(self):
+        """Test that label filters select which calendars are written."""
+        from group_calendars import create_group_calendars
+
+        input_file = create_test_csv(CONTACTS)
+
+        try:
+            with tempfile.TemporaryDirectory() as output_dir:
+                counts = create_group_calendars(
+                    input_file, output_dir, exclude=["myContacts"]
+                )
+                assert counts == {"Family": 2, "Work": 2}
+
+            with tempfile.TemporaryDirectory() as output_dir:
+                counts = create_group_calendars(
+                    input_file, output_dir, include=["Work", "Family"], exclude=["Work"]
+                )
+                assert counts == {"Family": 2}
+                assert os.listdir(output_dir) == ["Family.ics"]
+
+        finally:
+            os.unlink(input_file)
+
+    def test_group_membership_column_and_uids(self):
+        """Test older exports and that UIDs match the full calendar."""
+        from create_birthday_calendar import create_birthday_ics
+        from group_calendars import create_group_calendars
+
+        input_file = create_test_csv(CONTACTS, label_column="Group Membership")
+        output_file = tempfile.NamedTemporaryFile(delete=False, suffix=".ics").name
+
+        try:
+            create_birthday_ics(input_file, output_file)
+            with open(output_file, "r", encoding="utf-8") as f:
+                all_uids = {line for line in f if line.startswith("UID:")}
+
+            with tempfile.TemporaryDirectory() as output_dir:
+                create_group_calendars(input_file, output_dir, include=["Work"])
+                work_file = os.path.join(output_dir, "Work.ics")
+                with open(work_file, "r", encoding="utf-8") as f:
+                    work_uids = {line for line in f if line.startswith("UID:")}
+
+            assert len(work_uids) == 2
+            assert work_uids <= all_uids
+
+        finally:
+            os.unlink(input_file)
+            os.unlink(output_file)
+
+    def test_calendar_file_names_are_safe_and_unique(self):
+        """Test that labels map to distinct, safe file names."""
+        from group_calendars import calendar_file_name
+
+        used_names = set()
+
+        assert calendar_file_name("Friends/Old", used_names) == "Friends_Old.ics"
+        assert calendar_file_name("Friends_Old", used_names) == "Friends_Old_2.ics"
+        assert calendar_file_name("../..", used_names) == "_____.ics"
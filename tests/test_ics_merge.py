@@ -0,0 +1,195 @@
+"""Tests for ics_merge.py functionality."""
+
+import csv
+import os
+import tempfile
+
+import pytest
+
+
+def create_test_csv(contacts_data):
+    """Helper function to create a temporary CSV file with (name, birthday) rows."""
+    temp_file = tempfile.NamedTemporaryFile(
+        mode="w", delete=False, suffix=".csv", encoding="utf-8", newline=""
+    )
+    writer = csv.writer(temp_file)
+    writer.writerow(["First Name", "Middle Name", "Last Name", "Birthday"])
+    for first_name, last_name, birthday in contacts_data:
+        writer.writerow([first_name, "", last_name, birthday])
+    temp_file.close()
+    return temp_file.name
+
+
+def read_file(path):
+    """Helper function to read a calendar file."""
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def write_file(path, content):
+    """Helper function to overwrite a calendar file."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+FOREIGN_EVENT = "\n".join(
+    [
+        "BEGIN:VEVENT",
+        "UID:dentist@example.com",
+        "DTSTART;VALUE=DATE:20260301",
+        "SUMMARY:Dentist with a very long description that a calendar client",
+        "  decided to fold onto a second line",
+        "END:VEVENT",
+    ]
+)
+
+
+class TestMergeCalendar:
+    """Test cases for merging into an existing calendar."""
+
+    def setup_method(self):
+        import sys
+
+        sys.path.insert(0, ".")
+        self.calendar = tempfile.NamedTemporaryFile(delete=False, suffix=".ics").name
+        self.csv_files = []
+
+    def teardown_method(self):
+        for path in self.csv_files + [self.calendar]:
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def generate(self, contacts):
+        """Create the initial calendar from contacts."""
+        from create_birthday_calendar import create_birthday_ics
+
+        self.csv_files.append(create_test_csv(contacts))
+        create_birthday_ics(self.csv_files[-1], self.calendar)
+
+    def merge(self, contacts):
+        """Merge contacts into the calendar."""
+        from ics_merge import merge_birthday_ics
+
+        self.csv_files.append(create_test_csv(contacts))
+        return merge_birthday_ics(self.csv_files[-1], self.calendar, self.calendar)
+
+    def test_uids_are_stable_across_runs(self):
+        """Test that regenerating the calendar keeps the same UIDs."""
+        from ics_merge import iter_ics_components
+
+        contacts = [("John", "Doe", "1990-05-15"), ("John", "Doe", "1985-01-02")]
+        self.generate(contacts)
+        with open(self.calendar, encoding="utf-8") as f:
+            first = [uid for uid, _ in iter_ics_components(f) if uid]
+        self.generate(contacts)
+        with open(self.calendar, encoding="utf-8") as f:
+            second = [uid for uid, _ in iter_ics_components(f) if uid]
+
+        assert first == second
+        assert len(set(first)) == 2
+
+    def test_unchanged_events_keep_user_edits(self):
+        """Test that events of unchanged contacts are copied untouched."""
+        contacts = [("John", "Doe", "1990-05-15"), ("Jane", "Smith", "1992-08-20")]
+        self.generate(contacts)
+        edited = read_file(self.calendar).replace(
+            "SUMMARY:🎂 John Doe's Birthday", "SUMMARY:🎂 Uncle John's Birthday"
+        )
+        write_file(self.calendar, edited)
+
+        counts = self.merge(contacts)
+
+        assert counts == {"kept": 2, "updated": 0, "added": 0, "removed": 0}
+        assert read_file(self.calendar) == edited
+
+    def test_changed_contacts_are_updated_with_custom_properties(self):
+        """Test that a changed birthday is re-rendered but custom properties stay."""
+        self.generate([("John", "Doe", "1990-05-15")])
+        content = read_file(self.calendar).replace(
+            "END:VEVENT", "CATEGORIES:Family\nEND:VEVENT"
+        )
+        write_file(self.calendar, content)
+
+        counts = self.merge([("John", "Doe", "1990-06-16")])
+
+        merged = read_file(self.calendar)
+        assert counts["updated"] == 1
+        assert "DTSTART;VALUE=DATE:19900616" in merged
+        assert "19900515" not in merged
+        assert "CATEGORIES:Family\nEND:VEVENT" in merged
+        assert merged.count("BEGIN:VEVENT") == 1
+
+    def test_foreign_events_are_kept_and_contacts_added_or_removed(self):
+        """Test that foreign events survive while contacts come and go."""
+        self.generate([("John", "Doe", "1990-05-15"), ("Jane", "Smith", "1992-08-20")])
+        content = read_file(self.calendar).replace(
+            "END:VCALENDAR", FOREIGN_EVENT + "\nEND:VCALENDAR"
+        )
+        write_file(self.calendar, content)
+
+        counts = self.merge([("John", "Doe", "1990-05-15"), ("Bob", "Lee", "--03-22")])
+
+        merged = read_file(self.calendar)
+        assert counts == {"kept": 1, "updated": 0, "added": 1, "removed": 1}
+        assert FOREIGN_EVENT in merged
+        assert "Jane Smith" not in merged
+        assert "🎂 Bob Lee's Birthday" in merged
+        assert merged.index("Bob Lee") > merged.index("dentist@example.com")
+        assert merged.endswith("END:VCALENDAR")
+
+    def test_events_from_older_runs_are_adopted(self):
+        """Test that events without a source hash but our summary are replaced."""
+        legacy = "\n".join(
+            [
+                "BEGIN:VCALENDAR",
+                "VERSION:2.0",
+                "BEGIN:VEVENT",
+                "UID:3b241101-e2bb-4255-8caf-4136c566a962",
+                "DTSTART;VALUE=DATE:19900515",
+                "SUMMARY:🎂 John Doe's Birthday",
+                "END:VEVENT",
+                "END:VCALENDAR",
+            ]
+        )
+        write_file(self.calendar, legacy)
+
+        counts = self.merge([("John", "Doe", "1990-05-15")])
+
+        merged = read_file(self.calendar)
+        assert counts["updated"] == 1
+        assert counts["added"] == 0
+        assert merged.count("BEGIN:VEVENT") == 1
+        assert "3b241101" not in merged
+
+    def test_compact_calendar_is_adopted_by_uid(self):
+        """Test that events without a source hash are matched by their UID."""
+        from create_birthday_calendar import create_birthday_ics, main
+        from ics_merge import iter_ics_components, merge_birthday_ics
+
+        csv_file = tempfile.NamedTemporaryFile(delete=False, suffix=".csv").name
+        self.csv_files.append(csv_file)
+        write_file(
+            csv_file,
+            "First Name,Middle Name,Last Name,Birthday,Event 1 - Label,"
+            "Event 1 - Value\n"
+            "John,,Doe,1990-05-15,Anniversary,2015-06-01\n",
+        )
+        create_birthday_ics(csv_file, self.calendar, profile="compact")
+
+        counts = merge_birthday_ics(csv_file, self.calendar, self.calendar)
+
+        with open(self.calendar, encoding="utf-8") as f:
+            uids = [uid for uid, _ in iter_ics_components(f) if uid]
+        assert counts == {"kept": 0, "updated": 2, "added": 0, "removed": 0}
+        assert len(uids) == len(set(uids)) == 2
+        with open(self.calendar, "rb") as f:
+            assert b"\r" not in f.read()
+        assert merge_birthday_ics(csv_file, self.calendar, self.calendar) == {
+            "kept": 2,
+            "updated": 0,
+            "added": 0,
+            "removed": 0,
+        }
+
+        with pytest.raises(SystemExit):
+            main([csv_file, self.calendar, "--merge", "--output-profile", "compact"])
@@ -0,0 +1,97 @@
+"""Tests for json_export.py functionality."""
+
+import json
+import os
+import tempfile
+
+import pytest
+
+EXPORT = (
+    "First Name,Middle Name,Last Name,Birthday,Labels,"
+    "Event 1 - Label,Event 1 - Value\n"
+    'Ann,B.,"Smith, Jr",1990-05-15,* myContacts ::: Family,Anniversary,2015-06-01\n'
+    "Bob,,Jones,--03-22,,,\n"
+    "Cid,,Xy,1990-02-30,,,\n"
+)
+
+
+@pytest.fixture
+def export():
+    """A temporary directory holding a small export with an invalid birthday."""
+    with tempfile.TemporaryDirectory() as directory:
+        csv_file = os.path.join(directory, "export.csv")
+        with open(csv_file, "w", encoding="utf-8") as f:
+            f.write(EXPORT)
+        yield directory, csv_file
+
+
+class TestJsonExport:
+    """Test cases for the NDJSON and jCal exports."""
+
+    def test_ndjson_has_one_record_per_event(self, export):
+        """Test that NDJSON records carry name parts, dates, groups and UIDs."""
+        from create_birthday_calendar import iter_birthday_events
+        from json_export import main
+
+        directory, csv_file = export
+        output_file = os.path.join(directory, "birthdays.ndjson")
+
+        main([csv_file, output_file])
+        with open(output_file, "r", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+
+        assert [record["kind"] for record in records] == [
+            "birthday",
+            "anniversary",
+            "birthday",
+        ]
+        ann = records[0]
+        assert ann["name"] == "Ann B. Smith, Jr"
+        assert (ann["first_name"], ann["middle_name"], ann["last_name"]) == (
+            "Ann",
+            "B.",
+            "Smith, Jr",
+        )
+        assert ann["date"] == "1990-05-15"
+        assert ann["groups"] == ["myContacts", "Family"]
+        assert records[2]["date"] == "--03-22"
+        assert records[2]["year_known"] is False
+        assert [record["uid"] for record in records] == [
+            event.uid for event in iter_birthday_events(csv_file)
+        ]
+
+    def test_jcal_document(self, export):
+        """Test that the jCal document holds the calendar's events as jCal."""
+        from json_export import main
+
+        directory, csv_file = export
+        output_file = os.path.join(directory, "birthdays.json")
+
+        main([csv_file, output_file, "--jcal", "--dtstamp", "20260101T000000Z"])
+        with open(output_file, "r", encoding="utf-8") as f:
+            name, properties, events = json.load(f)
+
+        assert name == "vcalendar"
+        assert ["version", {}, "text", "2.0"] in properties
+        assert len(events) == 3
+        vevent, event_properties, alarms = events[0]
+        assert vevent == "vevent"
+        assert ["dtstart", {}, "date", "1990-05-15"] in event_properties
+        assert ["rrule", {}, "recur", {"freq": "YEARLY"}] in event_properties
+        assert ["dtstamp", {}, "date-time", "2026-01-01T00:00:00Z"] in event_properties
+        summary = next(prop[3] for prop in event_properties if prop[0] == "summary")
+        assert "Ann B. Smith, Jr" in summary
+        assert [alarm[0] for alarm in alarms] == ["valarm", "valarm"]
+        assert ["trigger", {}, "duration", "PT0S"] in alarms[0][1]
+
+    def test_stdout_holds_only_data(self, export, capsys):
+        """Test that streaming to stdout sends the skipped-row summary to stderr."""
+        from json_export import main
+
+        _, csv_file = export
+
+        main([csv_file, "-"])
+        captured = capsys.readouterr()
+
+        assert len([json.loads(line) for line in captured.out.splitlines()]) == 3
+        assert "not a real date" in captured.err
@@ -0,0 +1,48 @@
+"""Tests for keep_alive.py functionality."""
+
+import socket
+
+import pytest
+
+from tests.standins import CalDAVStandIn
+
+
+@pytest.fixture
+def server():
+    """A running HTTP stand-in."""
+    standin = CalDAVStandIn().start()
+    yield standin
+    standin.stop()
+
+
+class TestKeepAlive:
+    """Test cases for the keep-alive HTTP client."""
+
+    def test_requests_reuse_the_connection(self, server):
+        """Test that a thread sends all of its requests over one connection."""
+        from keep_alive import KeepAliveClient
+
+        client = KeepAliveClient(server.url)
+        try:
+            for _ in range(5):
+                response, body = client.send("GET", f"{server.path}missing.ics")
+                assert (response.status, body) == (404, b"")
+        finally:
+            client.close()
+
+        assert server.connections == 1
+
+    def test_closed_connection_is_retried_once(self, server):
+        """Test that a request on a connection closed meanwhile is sent again."""
+        from keep_alive import KeepAliveClient
+
+        client = KeepAliveClient(server.url)
+        try:
+            client.send("PUT", f"{server.path}a.ics", b"event")
+            client.connection().sock.shutdown(socket.SHUT_RDWR)
+            response, body = client.send("GET", f"{server.path}a.ics")
+        finally:
+            client.close()
+
+        assert (response.status, body) == (200, b"event")
+        assert server.connections == 2
@@ -0,0 +1,109 @@
+"""Tests for memory_profile.py functionality."""
+
+import os
+
+import pytest
+
+
+def contacts(count):
+    """Helper function to make count contacts with birthdays and count without."""
+    for index in range(count):
+        yield [f"Person{index}", "", "Test", "1990-05-15"]
+        yield [f"Nobody{index}", "", "Test", ""]
+
+
+@pytest.fixture
+def export(write_export):
+    """A temporary export of 50 contacts with birthdays and 50 without."""
+    csv_file = write_export(contacts(50))
+    return csv_file, os.path.join(os.path.dirname(csv_file), "birthdays.ics")
+
+
+class TestMemoryProfile:
+    """Test cases for per-phase memory profiling."""
+
+    def test_memory_is_charged_to_the_allocating_phase(self):
+        """Test that streaming phases are charged for their own allocations."""
+        from memory_profile import MemoryProfiler
+
+        def reading():
+            for index in range(10):
+                # A large temporary buffer, released before each item is yielded
+                buffer = bytearray(1_000_000)
+                del buffer
+                yield index
+
+        profiler = MemoryProfiler(check_every=3)
+        with profiler:
+            with profiler.phase("write"):
+                for _ in profiler.iter_phase("read", reading()):
+                    pass
+
+        assert profiler.phases["read"].traced_peak >= 1_000_000
+        assert profiler.phases["write"].traced_peak < 1_000_000
+        assert profiler.phases["read"].samples > 0
+
+    def test_calendar_reports_every_phase(self, export, capsys):
+        """Test that the calendar pipeline reports its phases and allocation sites."""
+        from create_birthday_calendar import create_birthday_ics
+        from memory_profile import MemoryProfiler
+
+        csv_file, ics_file = export
+
+        create_birthday_ics(csv_file, ics_file, sort=True, profiler=MemoryProfiler())
+
+        output = capsys.readouterr().out
+        for phase in ("read", "sort", "render", "write"):
+            assert f"  {phase} " in output
+        assert "Largest allocation sites" in output
+        assert "Created birthday calendar with 50 events" in output
+
+    def test_ceiling_aborts_without_partial_calendar(self, export):
+        """Test that reaching the ceiling aborts and leaves no partial calendar."""
+        from create_birthday_calendar import create_birthday_ics
+        from memory_profile import MemoryCeilingExceededError, MemoryProfiler
+
+        csv_file, ics_file = export
+
+        with pytest.raises(MemoryCeilingExceededError) as error_info:
+            create_birthday_ics(
+                csv_file, ics_file, profiler=MemoryProfiler(ceiling=1024, trace=False)
+            )
+
+        assert "close to the 1.0 KiB ceiling" in str(error_info.value)
+        assert os.listdir(os.path.dirname(ics_file)) == ["export.csv"]
+
+    def test_filter_abort_restores_export(self, export, capsys):
+        """Test that an aborted filter run puts the original export back."""
+        from filter_contacts import main
+
+        csv_file, _ = export
+        backup_file = os.path.join(os.path.dirname(csv_file), "backup.csv")
+        with open(csv_file, "rb") as f:
+            original = f.read()
+
+        with pytest.raises(SystemExit) as exit_info:
+            main([csv_file, "--backup", backup_file, "--memory-ceiling", "1K"])
+
+        assert exit_info.value.code == 1
+        assert "Aborted: memory use reached" in capsys.readouterr().err
+        with open(csv_file, "rb") as f:
+            assert f.read() == original
+        assert not os.path.exists(backup_file)
+
+    def test_filter_profile(self, export, capsys):
+        """Test that the filter pipeline reports its phases."""
+        from filter_contacts import filter_contacts_with_birthdays
+        from memory_profile import MemoryProfiler
+
+        csv_file, _ = export
+        output_file = csv_file + ".out"
+
+        kept, removed = filter_contacts_with_birthdays(
+            csv_file, output_file, MemoryProfiler()
+        )
+
+        assert (kept, removed) == (50, 50)
+        output = capsys.readouterr().out
+        for phase in ("read", "filter", "write"):
+            assert f"  {phase} " in output
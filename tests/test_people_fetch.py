@@ -0,0 +1,184 @@
+"""Tests for people_fetch.py functionality."""
+
+import csv
+import os
+import tempfile
+
+import pytest
+
+from tests.standins import PeopleStandIn
+
+GROUPS = [
+    {
+        "resourceName": "contactGroups/myContacts",
+        "name": "myContacts",
+        "groupType": "SYSTEM_CONTACT_GROUP",
+    },
+    {
+        "resourceName": "contactGroups/4f2a",
+        "name": "Family",
+        "formattedName": "Family",
+        "groupType": "USER_CONTACT_GROUP",
+    },
+]
+
+
+def make_person(index, birthday=None, groups=("contactGroups/myContacts",)):
+    """Helper function to build a People API person."""
+    person = {
+        "resourceName": f"people/c{index}",
+        "names": [{"givenName": f"Person{index}", "familyName": "Test"}],
+        "memberships": [
+            {"contactGroupMembership": {"contactGroupResourceName": group}}
+            for group in groups
+        ],
+    }
+    if birthday is not None:
+        person["birthdays"] = [{"date": birthday}]
+    return person
+
+
+def read_rows(path):
+    """Helper function to read an export as dicts."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.fixture
+def people():
+    """A People API stand-in with 25 contacts, 20 of them with birthdays."""
+    contacts = []
+    for index in range(25):
+        birthday = {"year": 1990, "month": 5, "day": index + 1}
+        contacts.append(make_person(index, None if index % 5 == 4 else birthday))
+    server = PeopleStandIn(contacts, GROUPS).start()
+    with tempfile.TemporaryDirectory() as directory:
+        yield (
+            server,
+            os.path.join(directory, "export.csv"),
+            os.path.join(directory, "state.json"),
+        )
+    server.stop()
+
+
+def connection_requests(server):
+    """Helper function to list the parameters of the connections requests."""
+    return [params for path, params in server.requests if path.endswith("connections")]
+
+
+class TestPeopleFetch:
+    """Test cases for fetching contacts from a People API endpoint."""
+
+    def test_full_fetch_follows_pages(self, people):
+        """Test that every page is fetched and contacts without birthdays dropped."""
+        from people_fetch import fetch_contacts
+
+        server, output_file, state_file = people
+
+        received, written = fetch_contacts(
+            output_file, server.url, state_file=state_file, page_size=10
+        )
+
+        assert (received, written) == (25, 20)
+        assert [params.get("pageToken") for params in connection_requests(server)] == [
+            None,
+            "10",
+            "20",
+        ]
+        rows = read_rows(output_file)
+        assert rows[0] == {
+            "First Name": "Person0",
+            "Middle Name": "",
+            "Last Name": "Test",
+            "Birthday": "1990-05-01",
+            "Labels": "* myContacts",
+            "Resource Name": "people/c0",
+        }
+
+    def test_labels_and_yearless_birthdays(self, people):
+        """Test that group names and --MM-DD birthdays reach the export."""
+        from create_birthday_calendar import iter_birthdays, parse_labels
+        from people_fetch import fetch_contacts
+
+        server, output_file, state_file = people
+        groups = ("contactGroups/myContacts", "contactGroups/4f2a")
+        server.put(make_person(99, {"month": 3, "day": 4}, groups))
+
+        fetch_contacts(output_file, server.url, state_file=state_file)
+
+        birthdays = {name: rest for name, *rest in iter_birthdays(output_file)}
+        _, year_known, labels = birthdays["Person99 Test"]
+        assert year_known is False
+        assert parse_labels(labels) == ["myContacts", "Family"]
+
+    def test_incremental_fetch_applies_changes(self, people):
+        """Test that a later run asks only for changes and applies them."""
+        from people_fetch import fetch_contacts
+
+        server, output_file, state_file = people
+        fetch_contacts(output_file, server.url, state_file=state_file)
+        server.put(make_person(0, {"year": 1991, "month": 1, "day": 2}))
+        server.delete("people/c1")
+        server.put(make_person(4, {"year": 1980, "month": 3, "day": 4}))
+        server.requests.clear()
+
+        received, written = fetch_contacts(
+            output_file, server.url, state_file=state_file
+        )
+
+        assert (received, written) == (3, 20)
+        (params,) = connection_requests(server)
+        assert "syncToken" in params
+        rows = read_rows(output_file)
+        assert rows[0]["Birthday"] == "1991-01-02"
+        assert "people/c1" not in [row["Resource Name"] for row in rows]
+        assert rows[-1]["Resource Name"] == "people/c4"
+
+    def test_expired_sync_token_falls_back_to_full_fetch(self, people):
+        """Test that a 410 reply to a sync token refetches everything."""
+        from people_fetch import fetch_contacts
+
+        server, output_file, state_file = people
+        fetch_contacts(output_file, server.url, state_file=state_file)
+        server.put(make_person(50, {"year": 2000, "month": 1, "day": 1}))
+        server.expire_before = server.version + 1
+
+        received, written = fetch_contacts(
+            output_file, server.url, state_file=state_file
+        )
+
+        assert (received, written) == (26, 21)
+
+    def test_errors_reach_the_caller(self, people):
+        """Test that an error from the prefetch thread is raised while iterating."""
+        from people_fetch import PeopleAPIError, PeopleClient, iter_pages
+
+        server, _, _ = people
+
+        with pytest.raises(PeopleAPIError) as error_info:
+            list(iter_pages(PeopleClient(server.url), "/v1/nothing", {}))
+
+        assert error_info.value.status == 404
+
+    def test_failed_fetch_keeps_the_export(self, people, monkeypatch):
+        """Test that a failed fetch leaves the export and no temporary file."""
+        from people_fetch import PeopleAPIError, fetch_contacts
+
+        server, csv_file, state_file = people
+        fetch_contacts(csv_file, server.url, state_file=state_file, full=True)
+        with open(csv_file, "rb") as f:
+            export = f.read()
+        handle = server.handle
+
+        def failing_handle(path, params):
+            if path.endswith("connections"):
+                return 500, {"error": {"code": 500, "message": "Backend error"}}
+            return handle(path, params)
+
+        monkeypatch.setattr(server, "handle", failing_handle)
+        with pytest.raises(PeopleAPIError):
+            fetch_contacts(csv_file, server.url, state_file=state_file, full=True)
+
+        assert not os.path.exists(csv_file + ".tmp")
+        with open(csv_file, "rb") as f:
+            assert f.read() == export
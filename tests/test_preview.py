@@ -0,0 +1,81 @@
+"""Tests for preview.py functionality."""
+
+import os
+import random
+
+import pytest
+
+
+def contacts(count):
+    """Helper function to make contacts where every third one has a birthday."""
+    for index in range(count):
+        birthday = f"1990-{index % 12 + 1:02d}-15" if index % 3 == 0 else ""
+        yield [f"Person{index}", "", "Test", birthday]
+
+
+@pytest.fixture
+def export(write_export):
+    """A temporary directory holding an export of 3000 contacts."""
+    csv_file = write_export(contacts(3000))
+    return os.path.dirname(csv_file), csv_file
+
+
+class TestPreview:
+    """Test cases for the sampled preview."""
+
+    def test_reservoir_sample_is_uniform(self):
+        """Test that every item is about as likely to be sampled."""
+        from preview import reservoir_sample
+
+        rng = random.Random(7)
+        picks = [0] * 20
+        for _ in range(3000):
+            sample = reservoir_sample(range(20), 5, rng)
+            assert len(set(sample)) == 5
+            for item in sample:
+                picks[item] += 1
+
+        # Each item is expected 750 times
+        assert all(600 < count < 900 for count in picks)
+        assert reservoir_sample(range(3), 5, rng) == [0, 1, 2]
+
+    def test_preview_samples_contacts_with_birthdays(self, export, capsys):
+        """Test that the preview renders a repeatable sample in file order."""
+        from create_birthday_calendar import main
+
+        directory, csv_file = export
+        output_file = os.path.join(directory, "birthdays.ics")
+        preview_file = os.path.join(directory, "birthdays.preview.ics")
+
+        main([csv_file, output_file, "--preview", "25", "--seed", "3"])
+        with open(preview_file, "r", encoding="utf-8") as f:
+            content = f.read()
+        main([csv_file, output_file, "--preview", "25", "--seed", "3"])
+
+        assert not os.path.exists(output_file)
+        with open(preview_file, "r", encoding="utf-8") as f:
+            assert f.read().split("DTSTAMP")[0] == content.split("DTSTAMP")[0]
+        names = [
+            int(line.split("Person")[1].split(" ")[0])
+            for line in content.split("\n")
+            if line.startswith("SUMMARY:") and line.endswith("Birthday")
+        ]
+        assert len(names) == 25
+        assert names == sorted(names)
+        assert all(index % 3 == 0 for index in names)
+        output = capsys.readouterr().out
+        assert "Read 3000 rows" in output
+        assert "1000 with a birthday (33%)" in output
+        assert "Estimated full calendar size" in output
+
+    def test_preview_first_stops_reading(self, export, capsys):
+        """Test that previewing the first contacts does not read the whole export."""
+        from preview import sample_export
+
+        _, csv_file = export
+
+        header, rows, counts = sample_export(csv_file, 10, first=True)
+
+        assert header[3] == "Birthday"
+        assert [row[0] for row in rows] == [f"Person{3 * i}" for i in range(10)]
+        assert counts == {"rows": 28, "birthdays": 10}
@@ -0,0 +1,123 @@
+"""Tests for reminder_daemon.py functionality."""
+
+import threading
+from datetime import date, datetime
+
+
+def make_scheduler(birthdays, fired):
+    """Helper function to build a scheduler that records dispatched reminders."""
+    import sys
+
+    sys.path.insert(0, ".")
+    from reminder_daemon import ReminderScheduler
+
+    return ReminderScheduler(
+        birthdays, [lambda name, occurrence: fired.append((name, occurrence))]
+    )
+
+
+class TestReminderScheduler:
+    """Test cases for the heap-based reminder scheduler."""
+
+    def test_schedule_orders_next_reminders(self):
+        """Test that the heap yields the soonest upcoming birthday first."""
+        fired = []
+        scheduler = make_scheduler(
+            [
+                ("John Doe", date(1990, 5, 15)),
+                ("Jane Smith", date(1992, 3, 1)),
+                ("Bob Johnson", date(1985, 12, 1)),
+            ],
+            fired,
+        )
+
+        scheduler.schedule(datetime(2026, 4, 1).timestamp())
+
+        _, index, year = scheduler.heap[0]
+        assert scheduler.birthdays[index][0] == "John Doe"
+        assert year == 2026
+        # Jane's birthday already passed this year
+        assert sorted((y, i) for _, i, y in scheduler.heap)[-1] == (2027, 1)
+
+    def test_run_pending_fires_and_reschedules(self):
+        """Test that due reminders are dispatched once and moved to next year."""
+        fired = []
+        scheduler = make_scheduler(
+            [("John Doe", date(1990, 5, 15)), ("Jane Smith", date(1992, 8, 20))],
+            fired,
+        )
+        scheduler.schedule(datetime(2026, 5, 1).timestamp())
+
+        assert scheduler.run_pending(datetime(2026, 5, 14).timestamp()) == 0
+        assert scheduler.run_pending(datetime(2026, 5, 15, 8).timestamp()) == 1
+        assert scheduler.run_pending(datetime(2026, 5, 15, 9).timestamp()) == 0
+
+        assert fired == [("John Doe", date(2026, 5, 15))]
+        assert len(scheduler.heap) == 2
+        assert (
+            datetime(2027, 5, 15).timestamp(),
+            0,
+            2027,
+        ) in scheduler.heap
+
+    def test_restart_fires_reminders_of_the_day(self):
+        """Test that a daemon started after the reminder time still fires today's."""
+        fired = []
+        scheduler = make_scheduler(
+            [("John Doe", date(1990, 5, 15)), ("Jane Smith", date(1992, 5, 14))],
+            fired,
+        )
+        now = datetime(2026, 5, 15, 13, 30).timestamp()
+        scheduler.schedule(now)
+
+        assert scheduler.run_pending(now) == 1
+        assert fired == [("John Doe", date(2026, 5, 15))]
+        assert sorted(year for _, _, year in scheduler.heap) == [2027, 2027]
+
+    def test_leap_day_birthday_fires_on_feb_28(self):
+        """Test that Feb 29 birthdays fire on Feb 28 in non-leap years."""
+        fired = []
+        scheduler = make_scheduler([("Leap Person", date(1996, 2, 29))], fired)
+        scheduler.schedule(datetime(2027, 1, 1).timestamp())
+
+        scheduler.run_pending(datetime(2027, 3, 1).timestamp())
+        scheduler.run_pending(datetime(2028, 3, 1).timestamp())
+
+        assert fired == [
+            ("Leap Person", date(2027, 2, 28)),
+            ("Leap Person", date(2028, 2, 29)),
+        ]
+
+    def test_failing_sink_does_not_stop_dispatch(self, capsys):
+        """Test that a failing sink is reported and other sinks still run."""
+        import sys
+
+        sys.path.insert(0, ".")
+        from reminder_daemon import ReminderScheduler
+
+        def broken_sink(name, occurrence):
+            raise OSError("connection refused")
+
+        fired = []
+        scheduler = ReminderScheduler(
+            [("John Doe", date(1990, 5, 15))],
+            [broken_sink, lambda name, occurrence: fired.append(name)],
+        )
+        scheduler.schedule(datetime(2026, 5, 1).timestamp())
+        scheduler.run_pending(datetime(2026, 5, 15).timestamp())
+
+        assert fired == ["John Doe"]
+        assert "Failed to send reminder for John Doe" in capsys.readouterr().out
+
+    def test_run_forever_stops_when_requested(self):
+        """Test that stop() wakes the daemon from its sleep."""
+        fired = []
+        scheduler = make_scheduler([("John Doe", date(1990, 5, 15))], fired)
+
+        thread = threading.Thread(target=scheduler.run_forever)
+        thread.start()
+        scheduler.stop()
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert fired == []
@@ -0,0 +1,84 @@
+"""Tests for render_cache.py functionality."""
+
+import pytest
+
+STAMP = "20260101T000000Z"
+
+
+@pytest.fixture
+def make_export(write_export):
+    """Factory returning the bytes of an export from (name, birthday) pairs."""
+
+    def make(birthdays):
+        rows = ([name, "", "Test", birthday] for name, birthday in birthdays)
+        with open(write_export(rows), "rb") as f:
+            return f.read()
+
+    return make
+
+
+@pytest.fixture
+def birthdays():
+    """The (name, birthday) pairs of 100 contacts."""
+    return [(f"Person{index}", f"1990-{index % 12 + 1:02d}-15") for index in range(100)]
+
+
+class TestRenderCache:
+    """Test cases for the LRU cache of rendered events."""
+
+    def test_rerender_is_all_hits(self, birthdays, make_export):
+        """Test that rendering an export again takes every event from the cache."""
+        from create_birthday_calendar import render_ics
+        from render_cache import RenderCache
+
+        cache = RenderCache()
+        data = make_export(birthdays)
+
+        expected = render_ics(data, profile="compact", dtstamp=STAMP)
+        for _ in range(2):
+            rendered = render_ics(data, profile="compact", dtstamp=STAMP, cache=cache)
+            assert rendered == expected
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["size"]) == (100, 100, 100)
+        assert stats["hit_rate"] == 0.5
+
+    def test_changed_contacts_and_templates_miss(self, birthdays, make_export):
+        """Test that only changed contacts, or other wording, are rendered again."""
+        from create_birthday_calendar import render_ics
+        from event_templates import load_templates
+        from render_cache import RenderCache
+
+        cache = RenderCache()
+        render_ics(make_export(birthdays), dtstamp=STAMP, cache=cache)
+
+        birthdays[3] = ("Person3", "1991-04-15")
+        birthdays.append(("Newcomer", "--02-28"))
+        changed = make_export(birthdays)
+        rendered = render_ics(changed, dtstamp=STAMP, cache=cache)
+        assert rendered == render_ics(changed, dtstamp=STAMP)
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (99, 102)
+
+        german = load_templates("de")
+        assert german.version != load_templates().version
+        render_ics(changed, templates=german, dtstamp=STAMP, cache=cache)
+        assert cache.stats()["misses"] == 203
+
+    def test_least_recently_used_are_evicted(self, birthdays, make_export):
+        """Test that the cache never holds more than maxsize events."""
+        from create_birthday_calendar import iter_birthday_events
+        from render_cache import RenderCache
+
+        cache = RenderCache(maxsize=10)
+        events = list(iter_birthday_events(make_export(birthdays[:11])))
+        for event in events[:10]:
+            cache.render(event, dtstamp=STAMP)
+        cache.render(events[0], dtstamp=STAMP)
+        cache.render(events[10], dtstamp=STAMP)
+
+        assert len(cache) == 10
+        assert cache.stats()["evictions"] == 1
+        cache.render(events[0], dtstamp=STAMP)
+        cache.render(events[1], dtstamp=STAMP)
+        assert (cache.hits, cache.misses) == (2, 12)
@@ -0,0 +1,104 @@
+"""Tests for row_index.py functionality."""
+
+import csv
+import os
+import tempfile
+
+import pytest
+
+ROWS = [
+    ["John", "", "Doe", "1990-05-15", "plain"],
+    ["Jane", "", "Smith", "", "two\r\nlines, quoted"],
+    ["John", "", "Doe", "--03-22", ""],
+    ["", "", "", "", "no name"],
+    ["Bob", "", "Johnson", "1985-01-01", 'a "quote"\nand a line'],
+]
+
+
+@pytest.fixture
+def export():
+    """A temporary export with multi-line records and repeated names."""
+    with tempfile.TemporaryDirectory() as directory:
+        csv_file = os.path.join(directory, "export.csv")
+        with open(csv_file, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(
+                ["First Name", "Middle Name", "Last Name", "Birthday", "Notes"]
+            )
+            writer.writerows(ROWS * 40)
+        yield csv_file
+
+
+class TestRowIndex:
+    """Test cases for the byte-offset row index."""
+
+    def test_offsets_follow_multi_line_records(self, export, capsys):
+        """Test that every record can be read back from its offset alone."""
+        from row_index import RowIndex, build_index, index_path
+
+        build_index(export)
+        index = RowIndex.load(index_path(export))
+
+        assert len(index) == len(ROWS) * 40
+        assert index.offsets[-1] == os.path.getsize(export)
+        with open(export, "rb") as f:
+            (jane,) = index.read_rows(f, 1)
+            assert jane == ["Jane", "", "Smith", "", "two\nlines, quoted"]
+            assert index.read_rows(f, 198, 199) == ROWS[3:5]
+        assert "Indexed 200 rows" in capsys.readouterr().out
+
+    def test_find_contacts_by_name(self, export):
+        """Test that contacts are found by name, repeated names being numbered."""
+        from row_index import build_index
+
+        index = build_index(export)
+
+        assert index.find("John Doe") == 0
+        assert index.find("John Doe#2") == 2
+        assert index.find("John Doe#80") == 197
+        assert index.find("Bob Johnson#40") == 199
+        assert index.find("") is None
+        assert len(index.keys) == 160
+
+    def test_split_is_even_and_complete(self, export):
+        """Test that splitting covers every record once in about even byte ranges."""
+        from row_index import build_index
+
+        index = build_index(export)
+        parts = index.split(3)
+
+        assert parts[0][0] == 0 and parts[-1][1] == len(index) - 1
+        for (_, last), (first, _) in zip(parts, parts[1:]):
+            assert first == last + 1
+        offsets = index.offsets
+        sizes = [offsets[last + 1] - offsets[first] for first, last in parts]
+        assert max(sizes) - min(sizes) < 100
+        assert len(index.split(1000)) == len(index)
+
+    def test_unchanged_export_is_recognized(self, export):
+        """Test that touching the export keeps the index, editing it does not."""
+        from row_index import build_index
+
+        index = build_index(export)
+        os.utime(export, (0, 0))
+        assert index.unchanged(export)
+
+        with open(export, "r+b") as f:
+            f.seek(-3, os.SEEK_END)
+            f.write(b"XYZ")
+        assert not index.unchanged(export)
+
+        with open(export, "ab") as f:
+            f.write(b"Amy,,Lee,,\r\n")
+        assert not index.unchanged(export)
+
+    def test_lookup_command(self, export, capsys):
+        """Test that bd index lookup prints a contact's fields."""
+        import bd
+
+        assert bd.main(["index", "build", export]) == 0
+        assert bd.main(["index", "lookup", export, "--name", "Bob Johnson#2"]) == 0
+
+        output = capsys.readouterr().out
+        assert "Row 11 at byte" in output
+        assert '  Notes: a "quote"\nand a line' in output
@@ -0,0 +1,194 @@
+"""Tests for smtp_delivery.py functionality."""
+
+import asyncio
+from datetime import date
+from email.message import EmailMessage
+
+from tests.standins import SMTPStandIn
+
+
+def make_messages(count, recipient="me@example.com"):
+    """Helper function to build simple test messages."""
+    messages = []
+    for index in range(count):
+        message = EmailMessage()
+        message["From"] = "Birthdays <birthdays@example.com>"
+        message["To"] = recipient
+        message["Subject"] = f"Reminder {index}"
+        message.set_content(f"Body {index}\n.leading dot\n")
+        messages.append(message)
+    return messages
+
+
+def deliver(server_options, messages, **options):
+    """Helper function to deliver messages to a fresh SMTP stand-in."""
+    import sys
+
+    sys.path.insert(0, ".")
+    from smtp_delivery import deliver_messages
+
+    async def scenario():
+        server = await SMTPStandIn(**server_options).start()
+        try:
+            result = await deliver_messages(
+                messages, "127.0.0.1", server.port, backoff=0.01, **options
+            )
+        finally:
+            await server.stop()
+        return server, result
+
+    return asyncio.run(scenario())
+
+
+class TestSMTPDelivery:
+    """Test cases for pooled SMTP delivery."""
+
+    def test_delivers_over_pooled_connections(self):
+        """Test that many messages share a small number of connections."""
+        server, (sent, failed) = deliver({}, make_messages(50), pool_size=3)
+
+        assert sent == 50
+        assert failed == []
+        assert len(server.messages) == 50
+        assert server.connections <= 3
+
+    def test_messages_are_dot_stuffed(self):
+        """Test that body lines starting with a dot arrive unchanged."""
+        server, (sent, _) = deliver({}, make_messages(1), pool_size=1)
+
+        assert sent == 1
+        recipients, body = server.messages[0]
+        assert recipients == ["me@example.com"]
+        assert b"\r\n.leading dot\r\n" in body
+
+    def test_connections_are_recycled(self):
+        """Test that a connection is replaced after its message budget."""
+        server, (sent, _) = deliver(
+            {}, make_messages(10), pool_size=1, messages_per_connection=4
+        )
+
+        assert sent == 10
+        assert server.connections == 3
+
+    def test_transient_failures_are_retried(self):
+        """Test that 4xx replies are retried with backoff."""
+        server, (sent, failed) = deliver(
+            {"transient_failures": 2}, make_messages(3), pool_size=1
+        )
+
+        assert sent == 3
+        assert failed == []
+
+    def test_gives_up_after_retries(self):
+        """Test that a message failing every attempt is reported."""
+        server, (sent, failed) = deliver(
+            {"transient_failures": 100}, make_messages(1), pool_size=1, retries=2
+        )
+
+        assert sent == 0
+        assert len(failed) == 1
+        assert failed[0][1].code == 451
+
+    def test_permanent_failures_are_not_retried(self):
+        """Test that rejected recipients fail without retries."""
+        server, (sent, failed) = deliver(
+            {"rejected_recipients": ["nobody@example.com"]},
+            make_messages(2, recipient="nobody@example.com"),
+            pool_size=1,
+        )
+
+        assert sent == 0
+        assert [error.code for _, error in failed] == [550, 550]
+        assert server.messages == []
+
+    def test_malformed_reply_fails_after_retries(self):
+        """Test that a server answering garbage fails the messages, not the call."""
+        server, (sent, failed) = deliver(
+            {"greeting": b"garbage greeting"}, make_messages(2), pool_size=1, retries=1
+        )
+
+        assert sent == 0
+        assert len(failed) == 2
+        assert all(isinstance(error, ConnectionError) for _, error in failed)
+        assert server.connections == 4
+
+    def test_unexpected_error_fails_only_its_message(self, monkeypatch):
+        """Test that an unexpected error fails one message and the rest go out."""
+        import sys
+
+        sys.path.insert(0, ".")
+        import smtp_delivery
+
+        def broken_bytes(message):
+            if message["Subject"] == "Reminder 1":
+                raise ValueError("cannot serialize")
+            return message_bytes(message)
+
+        message_bytes = smtp_delivery.message_bytes
+        monkeypatch.setattr(smtp_delivery, "message_bytes", broken_bytes)
+        server, (sent, failed) = deliver({}, make_messages(3), pool_size=1)
+
+        assert sent == 2
+        assert [(message["Subject"], type(error)) for message, error in failed] == [
+            ("Reminder 1", ValueError)
+        ]
+        assert len(server.messages) == 2
+
+    def test_unreachable_server_fails_after_retries(self):
+        """Test that connection errors are retried and then reported."""
+        import socket
+        import sys
+
+        sys.path.insert(0, ".")
+        from smtp_delivery import deliver_messages
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+
+        sent, failed = asyncio.run(
+            deliver_messages(
+                make_messages(1), "127.0.0.1", port, retries=1, backoff=0.01
+            )
+        )
+
+        assert sent == 0
+        assert isinstance(failed[0][1], OSError)
+
+    def test_birthday_messages_for_day(self):
+        """Test that only birthdays falling on the day get a reminder."""
+        import sys
+
+        sys.path.insert(0, ".")
+        from smtp_delivery import birthday_messages
+
+        messages = birthday_messages(
+            [
+                ("John Doe", date(1990, 5, 15)),
+                ("Jane Smith", date(1992, 8, 20)),
+                ("Leap Person", date(1996, 2, 29)),
+            ],
+            date(2026, 5, 15),
+            "birthdays@example.com",
+            "me@example.com",
+        )
+
+        assert [message["Subject"] for message in messages] == [
+            "Today is John Doe's Birthday! 🎂"
+        ]
+
+    def test_leap_day_birthday_message_on_feb_28(self):
+        """Test that Feb 29 birthdays are reminded on Feb 28 in non-leap years."""
+        import sys
+
+        sys.path.insert(0, ".")
+        from smtp_delivery import birthday_messages
+
+        messages = birthday_messages(
+            [("Leap Person", date(1996, 2, 29))],
+            date(2027, 2, 28),
+            "birthdays@example.com",
+            "me@example.com",
+        )
+
+        assert len(messages) == 1
@@ -0,0 +1,180 @@
+"""Tests for the validate-only mode and validation reports."""
+
+import csv
+import json
+import os
+import tempfile
+
+import pytest
+
+
+def create_test_csv(rows):
+    """Helper function to create a temporary CSV file with names and birthdays."""
+    temp_file = tempfile.NamedTemporaryFile(
+        mode="w", delete=False, suffix=".csv", newline=""
+    )
+    writer = csv.writer(temp_file)
+    writer.writerow(["First Name", "Middle Name", "Last Name", "Birthday"])
+    writer.writerows(rows)
+    temp_file.close()
+    return temp_file.name
+
+
+MESSY_ROWS = [
+    ["John", "", "Doe", "1990-05-15"],
+    ["Jane", "", "Smith", "05/15/1990"],
+    ["Bob", "", "Johnson", "1990-02-30"],
+    ["", "", "", "1985-12-01"],
+    ["Amy", "", "Brown", ""],
+    ["Carl", "", "Davis", "1990-13-01"],
+    ["Dan", "", "Evans", "--03-04"],
+]
+
+
+class TestValidation:
+    """Test cases for validate-only mode."""
+
+    def test_validate_writes_json_report(self):
+        """Test that skipped contacts are reported with row, value and reason."""
+        import sys
+
+        sys.path.insert(0, ".")
+        from create_birthday_calendar import validate_birthdays
+
+        input_file = create_test_csv(MESSY_ROWS)
+        report_file = tempfile.NamedTemporaryFile(delete=False, suffix=".json").name
+
+        try:
+            report = validate_birthdays(input_file, report_file)
+
+            with open(report_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+            assert report.valid == 2
+            assert data["valid"] == 2
+            assert data["invalid"] == 4
+            assert data["summary"] == {
+                "unknown_format": 1,
+                "invalid_date": 2,
+                "missing_name": 1,
+            }
+            assert data["errors"][0] == {
+                "row": 3,
+                "name": "Jane Smith",
+                "value": "05/15/1990",
+                "reason": "unknown_format",
+            }
+            assert [error["row"] for error in data["errors"]] == [3, 4, 5, 7]
+
+        finally:
+            os.unlink(input_file)
+            os.unlink(report_file)
+
+    def test_validate_writes_csv_report(self):
+        """Test that a .csv report file gets one row per skipped contact."""
+        import sys
+
+        sys.path.insert(0, ".")
+        from create_birthday_calendar import validate_birthdays
+
+        input_file = create_test_csv(MESSY_ROWS)
+        report_file = tempfile.NamedTemporaryFile(delete=False, suffix=".csv").name
+
+        try:
+            validate_birthdays(input_file, report_file)
+
+            with open(report_file, "r", encoding="utf-8", newline="") as f:
+                rows = list(csv.DictReader(f))
+
+            assert len(rows) == 4
+            assert rows[1] == {
+                "row": "4",
+                "name": "Bob Johnson",
+                "value": "1990-02-30",
+                "reason": "invalid_date",
+            }
+
+        finally:
+            os.unlink(input_file)
+            os.unlink(report_file)
+
+    def test_normal_run_logs_one_line_per_reason(self, capsys):
+        """Test that creating a calendar summarizes skipped rows per reason."""
+        import sys
+
+        sys.path.insert(0, ".")
+        from create_birthday_calendar import create_birthday_ics
+
+        input_file = create_test_csv(MESSY_ROWS * 50)
+        output_file = tempfile.NamedTemporaryFile(delete=False, suffix=".ics").name
+
+        try:
+            create_birthday_ics(input_file, output_file)
+
+            lines = capsys.readouterr().out.splitlines()
+            skipped = [line for line in lines if line.startswith("Skipped")]
+            assert skipped == [
+                "Skipped 50 contacts - unknown birthday format "
+                "(first at row 3: Jane Smith '05/15/1990')",
+                "Skipped 100 contacts - birthday is not a real date "
+                "(first at row 4: Bob Johnson '1990-02-30')",
+                "Skipped 50 contacts - birthday without a name "
+                "(first at row 5: ? '1985-12-01')",
+            ]
+
+        finally:
+            os.unlink(input_file)
+            os.unlink(output_file)
+
+    @pytest.mark.parametrize("suffix", [".csv", ".ndjson"])
+    def test_quarantine_keeps_rejected_rows(self, suffix, capsys):
+        """Test that every rejected row goes to the quarantine file with a reason."""
+        from create_birthday_calendar import main
+
+        input_file = create_test_csv(MESSY_ROWS)
+        with open(input_file, "a", encoding="utf-8", newline="") as f:
+            f.write("Short,Row\n")
+            f.write("Extra,,Comma,1990-01-01,Notes\n")
+            f.write('Open,"Quote,1990-01-01\nEve,,Lee,1991-02-03\n')
+        output_file = input_file.replace(".csv", ".ics")
+        quarantine_file = input_file.replace(".csv", "-quarantine" + suffix)
+
+        try:
+            main([input_file, output_file, "--quarantine", quarantine_file])
+
+            with open(quarantine_file, "r", encoding="utf-8", newline="") as f:
+                if suffix == ".csv":
+                    rows = list(csv.DictReader(f, restkey="extra"))
+                else:
+                    rows = [json.loads(line) for line in f]
+
+            assert [(int(row["row"]), row["reason"]) for row in rows] == [
+                (3, "unknown_format"),
+                (4, "invalid_date"),
+                (5, "missing_name"),
+                (7, "invalid_date"),
+                (9, "short_row"),
+                (10, "broken_quoting"),
+                (11, "broken_quoting"),
+            ]
+            if suffix == ".csv":
+                assert rows[0]["First Name"] == "Jane"
+                assert rows[0]["Birthday"] == "05/15/1990"
+                assert rows[5]["extra"] == ["Notes"]
+            else:
+                assert rows[0]["record"]["Birthday"] == "05/15/1990"
+                assert rows[4]["record"] == {
+                    "First Name": "Short",
+                    "Middle Name": "Row",
+                }
+                assert rows[5]["extra"] == ["Notes"]
+                swallowed = "Quote,1990-01-01\nEve,,Lee,1991-02-03\n"
+                assert rows[6]["record"]["Middle Name"] == swallowed
+            output = capsys.readouterr().out
+            assert f"Quarantined 7 skipped rows in {quarantine_file}" in output
+            assert "Created birthday calendar with 2 events" in output
+
+        finally:
+            for path in (input_file, output_file, quarantine_file):
+                if os.path.exists(path):
+                    os.unlink(path)
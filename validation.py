@@ -0,0 +1,156 @@
+import csv
+import io
+import json
+import os
+from collections import Counter
+
+# Reasons a contact with a birthday is skipped, with their log descriptions
+REASONS = {
+    "invalid_date": "birthday is not a real date",
+    "unknown_format": "unknown birthday format",
+    "missing_name": "birthday without a name",
+    "short_row": "row with fewer fields than the header and no date",
+    "broken_quoting": "row mangled by a stray quote or comma",
+}
+
+REPORT_FIELDS = ["row", "name", "value", "reason"]
+
+# Fields of a quarantined row, before (CSV) or beside (NDJSON) the row itself
+QUARANTINE_FIELDS = ["row", "reason", "value"]
+
+# Write buffer of the quarantine file
+QUARANTINE_BUFFER = 1 << 20
+
+
+class Quarantine:
+    """Streams the rows rejected while reading an export to a file.
+
+    Each rejected row is written whole, with its row number, reason code and
+    the offending value, so the data can be fixed in bulk: as CSV (the export
+    columns after those three) for .csv names, else as NDJSON with the row
+    under "record" (and fields past the header under "extra"). Writes are
+    buffered. Given the state() of an earlier, interrupted run, its file is
+    cut back to the size it had then and appended to.
+    """
+
+    def __init__(self, path, state=None):
+        self.path = path
+        self.ndjson = not path.lower().endswith(".csv")
+        options = {"encoding": "utf-8", "newline": "", "buffering": QUARANTINE_BUFFER}
+        if state is None:
+            size, self.count = 0, 0
+            self.file = open(path, "w", **options)
+        else:
+            size, self.count = state
+            with open(path, "r+b") as file:
+                file.truncate(size)
+            self.file = open(path, "a", **options)
+        self.started = bool(size)
+        self.writer = None if self.ndjson else csv.writer(self.file)
+
+    def write(self, row, reason, value, record, columns):
+        """Write one rejected row, record being its fields and columns the header."""
+        self.count += 1
+        if self.ndjson:
+            line = {"row": row, "reason": reason, "value": value}
+            line["record"] = dict(zip(columns, record))
+            if len(record) > len(columns):
+                line["extra"] = record[len(columns) :]
+            self.file.write(json.dumps(line, ensure_ascii=False) + "\n")
+            return
+        if not self.started:
+            self.writer.writerow([*QUARANTINE_FIELDS, *columns])
+            self.started = True
+        self.writer.writerow([row, reason, value, *record])
+
+    def state(self):
+        """Flush the file to disk and return (size, rows written), for checkpoints."""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell(), self.count
+
+    def close(self):
+        """Flush and close the file."""
+        self.file.close()
+
+
+class ValidationReport:
+    """Collects the contacts skipped while reading an export.
+
+    Rows are numbered like a spreadsheet would show them, with the header as
+    row 1. Given a Quarantine, the rejected rows themselves are written to it;
+    columns is then the header of the export being read.
+    """
+
+    def __init__(self, quarantine=None):
+        self.errors = []
+        self.valid = 0
+        self.quarantine = quarantine
+        self.columns = []
+
+    def __getstate__(self):
+        # The quarantine file stays with the run, not with checkpoints
+        return {**self.__dict__, "quarantine": None}
+
+    def add(self, row, name, value, reason, record=None):
+        """Record one skipped contact, and quarantine its fields (record)."""
+        self.errors.append({"row": row, "name": name, "value": value, "reason": reason})
+        if self.quarantine is not None and record is not None:
+            self.quarantine.write(row, reason, value, record, self.columns)
+
+    def summary(self):
+        """Return the number of skipped contacts per reason."""
+        return dict(Counter(error["reason"] for error in self.errors))
+
+    def log_lines(self):
+        """Return one log line per reason, with the first offending row."""
+        first_errors = {}
+        for error in self.errors:
+            first_errors.setdefault(error["reason"], error)
+
+        lines = []
+        for reason, count in self.summary().items():
+            first = first_errors[reason]
+            lines.append(
+                f"Skipped {count} contact{'s' if count != 1 else ''} - "
+                f"{REASONS.get(reason, reason)} "
+                f"(first at row {first['row']}: {first['name'] or '?'} "
+                f"{first['value']!r})"
+            )
+        return lines
+
+    def log_summary(self):
+        """Print the per-reason summary in a single write."""
+        lines = self.log_lines()
+        if lines:
+            print("\n".join(lines))
+
+    def to_json(self):
+        """Return the report as a JSON document."""
+        return json.dumps(
+            {
+                "valid": self.valid,
+                "invalid": len(self.errors),
+                "summary": self.summary(),
+                "errors": self.errors,
+            },
+            ensure_ascii=False,
+            indent=2,
+        )
+
+    def to_csv(self):
+        """Return the skipped contacts as CSV, one row each."""
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, REPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(self.errors)
+        return buffer.getvalue()
+
+    def write(self, report_file):
+        """Write the report in one go, as CSV for .csv files and JSON otherwise."""
+        if report_file.lower().endswith(".csv"):
+            content = self.to_csv()
+        else:
+            content = self.to_json()
+        with open(report_file, "w", encoding="utf-8", newline="") as file:
+            file.write(content)